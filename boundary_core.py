@@ -0,0 +1,143 @@
+# boundary_core.py
+# Distância (com sinal) de cada amostra aos limites que decidem sua
+# classificação SUCS/TRB, e um índice para consultar rapidamente quais
+# amostras estão a menos de δ de algum limite (amostras limítrofes).
+#
+# Convenção: distância = valor − limite (positivo = acima do limite), na
+# unidade da grandeza (pontos percentuais, LL ou IP). NaN = limite não
+# relevante para a amostra (ramo não percorrido ou dado ausente).
+
+import numpy as np
+import pandas as pd
+
+from rules_defs import SUCS_LIMITES, TRB_LIMITES
+from sucs_core import sucs_inputs_from_frame
+from trb_core import trb_inputs_from_frame
+
+
+def sucs_boundary_distances(df):
+    """
+    Distâncias aos limites SUCS para cada linha do lote:
+      ret200=50, finos=5, finos=12, G/S (pedregulho=50% da fração grossa),
+      Cu (4 para G, 6 para S), Cc=1, Cc=3, linha_A (IP − 0,73·(LL−20)), LL=50.
+    """
+    x = sucs_inputs_from_frame(df)
+    ret, pg, ps = x["pct_retido_200"], x["pct_pedregulho_coarse"], x["pct_areia_coarse"]
+    LL, LP, Cu, Cc = x["LL"], x["LP"], x["Cu"], x["Cc"]
+    ativo = ~x["turfa"]
+
+    L = SUCS_LIMITES
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fines = 100.0 - ret
+        coarse = ativo & (ret >= L["grossa_ret200_min"])
+        fine = ativo & ~(ret >= L["grossa_ret200_min"])
+        total = pg + ps
+        pgn = np.where(total > 0, 100.0 * pg / total, np.nan)
+        cu_min = np.where((total > 0) & (pg < ps), L["cu_min_S"], L["cu_min_G"])
+        grad = coarse & (fines <= L["finos_limitrofe_max"])
+        nat = (coarse & (fines >= L["finos_limpo_max"])) | (fine & ~x["organico"])
+        IP = np.maximum(0.0, LL - LP)
+
+    def so(mask, v):
+        return np.where(mask, v, np.nan)
+
+    return pd.DataFrame({
+        "ret200=50": so(ativo, ret - L["grossa_ret200_min"]),
+        "finos=5": so(coarse, fines - L["finos_limpo_max"]),
+        "finos=12": so(coarse, fines - L["finos_limitrofe_max"]),
+        "G/S": so(coarse, pgn - 50.0),
+        "Cu": so(grad, Cu - cu_min),
+        "Cc=1": so(grad, Cc - L["cc_min"]),
+        "Cc=3": so(grad, Cc - L["cc_max"]),
+        "linha_A": so(nat, IP - L["linha_A_incl"] * (LL - L["linha_A_LL0"])),
+        "LL=50": so(fine, LL - L["ll_alto_min"]),
+    }, index=df.index)
+
+
+def trb_boundary_distances(df, cols_map=None, incluir_ig=True):
+    """
+    Distâncias aos limites da tabela TRB percorridos por cada linha
+    (#200=35; no ramo granular #10=50, #40=30/50/51, #200=10/15/25, IP=6;
+    LL=40, IP=10/11; A-7: IP − (LL−30)). Com incluir_ig, acrescenta os
+    limitadores do IG (colunas "IG:...").
+    """
+    x = trb_inputs_from_frame(df, cols_map)
+    p10, p40, p200, ll, lp = x["p10"], x["p40"], x["p200"], x["ll"], x["lp"]
+    plast = ~x["is_np"]
+    ip = np.where(plast, np.maximum(0.0, ll - lp), 0.0)
+    L = TRB_LIMITES
+    gran = p200 <= L["granular_p200_max"]
+    fino = ~gran & ~np.isnan(p200)
+
+    def so(mask, v):
+        return np.where(mask, v, np.nan)
+
+    out = {
+        "P200=35": p200 - L["granular_p200_max"],
+        "P10=50": so(gran, p10 - L["a1a_p10_max"]),
+        "P40=30": so(gran, p40 - L["a1a_p40_max"]),
+        "P40=50": so(gran, p40 - L["a1b_p40_max"]),
+        "P40=51": so(gran, p40 - L["a3_p40_min"]),
+        "P200=10": so(gran, p200 - L["a3_p200_max"]),
+        "P200=15": so(gran, p200 - L["a1a_p200_max"]),
+        "P200=25": so(gran, p200 - L["a1b_p200_max"]),
+        "IP=6": so(gran & plast, ip - L["a1_ip_max"]),
+        "LL=40": so(plast, ll - L["ll_divisor"]),
+        "IP=10": so(plast, ip - L["ip_silte_max"]),
+        "IP=11": so(plast, ip - L["ip_argila_min"]),
+        "IP=LL-30": so(fino & plast & (ll > L["ll_divisor"]), ip - (ll - L["a7_desconto"])),
+    }
+    if incluir_ig:
+        out.update({
+            "IG:P200=15": p200 - 15.0, "IG:P200=55": p200 - 55.0,
+            "IG:P200=75": p200 - 75.0,
+            "IG:LL=60": so(plast, ll - 60.0),
+            "IG:IP=30": so(plast, ip - 30.0),
+        })
+    return pd.DataFrame(out, index=df.index)
+
+
+class BoundaryIndex:
+    """
+    Índice sobre uma tabela de distâncias (sucs_/trb_boundary_distances).
+    Mantém, por limite, |distância| ordenada, de modo que "quem está a menos
+    de δ do limite" é uma busca binária (O(log n) + tamanho da resposta).
+    """
+
+    def __init__(self, dist: pd.DataFrame):
+        self.index = dist.index
+        self.limites = list(dist.columns)
+        self._ordem = {}
+        self._chave = {}
+        for col in self.limites:
+            a = np.abs(dist[col].to_numpy(dtype=float))
+            ok = np.flatnonzero(~np.isnan(a))
+            o = ok[np.argsort(a[ok], kind="stable")]
+            self._ordem[col] = o
+            self._chave[col] = a[o]
+        d = np.abs(dist.to_numpy(dtype=float))
+        d = np.where(np.isnan(d), np.inf, d)
+        self.dist_min = d.min(axis=1)
+        self.limite_critico = np.where(np.isfinite(self.dist_min),
+                                       np.asarray(self.limites, dtype=object)[d.argmin(axis=1)], None)
+
+    def positions(self, delta, limites=None):
+        """Posições (0..n−1, ordenadas) das linhas a ≤ δ de algum dos limites."""
+        cols = self.limites if limites is None else limites
+        partes = [self._ordem[c][:np.searchsorted(self._chave[c], delta, side="right")] for c in cols]
+        if not partes:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(partes))
+
+    def within(self, delta, limites=None):
+        """Rótulos do índice original das linhas a ≤ δ de algum dos limites."""
+        return self.index[self.positions(delta, limites)]
+
+    def count(self, delta, limites=None):
+        """Quantidade de linhas limítrofes para δ."""
+        return len(self.positions(delta, limites))
+
+    def summary(self):
+        """DataFrame com a menor |distância| e o limite mais próximo de cada linha."""
+        return pd.DataFrame({"dist_min": self.dist_min, "limite_critico": self.limite_critico},
+                            index=self.index)
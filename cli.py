@@ -0,0 +1,548 @@
+# cli.py
+# Linha de comando (sem Streamlit) para classificação em lote.
+#
+#   python cli.py classificar dados.csv pasta/ --sistema ambos --formato parquet --saida res/ --workers 4
+#   python cli.py vigiar entrada/ --saida res/ --sistema trb
+#   python cli.py gerar 1000000 carga.csv --sistema trb --seed 1
+#   python cli.py diff campanha1.csv campanha2.csv --chave projeto,amostra --saida mudancas.csv
+#   python cli.py impacto lote.csv --sistema sucs --limite linha_A_incl=0.75
+#
+# O modo "vigiar" processa cada arquivo novo da pasta de entrada exatamente uma
+# vez: o arquivo é reservado por renomeação atômica (dois vigias na mesma pasta
+# não pegam o mesmo arquivo), o resultado é gravado em arquivo temporário e
+# renomeado no destino (nunca fica meio escrito), e o hash do conteúdo vai para
+# um registro (.processados.jsonl) junto com sistema/formato — reenviar o mesmo
+# arquivo com as mesmas opções não reprocessa. A reserva leva o dono no nome
+# (pid@máquina); ao reiniciar, o vigia só retoma reservas de processos já
+# encerrados nesta máquina, e relê o registro antes de processar.
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from export_core import FORMATOS, ChunkWriter, dimension_tables, fact_table, sibling_path
+from gradation_core import with_gradation
+from io_core import CHUNK_ROWS, ENTRADAS, read_chunks
+from sucs_core import classify_dataframe, classify_dataframe_vec
+from trb_core import classify_dataframe_trb_safe, classify_dataframe_trb_vec, normalize_np
+
+SISTEMAS = ("sucs", "trb", "ambos")
+
+PROCESSANDO = ".processando"
+PROCESSADOS = "processados"
+ERROS = "erros"
+REGISTRO = ".processados.jsonl"
+
+
+# ---------------------------------------------------------------------------
+# Leitura e classificação
+# ---------------------------------------------------------------------------
+
+# Colunas sem as quais o lote não é classificável (tuplas: basta uma delas)
+OBRIGATORIAS = {
+    "sucs": [("pct_retido_200",)],
+    "trb": [("P10",), ("P40",), ("P200",), ("LL", "NP"), ("LP", "IP", "NP")],
+}
+
+
+def check_columns(df, sistema):
+    """ValueError se faltar coluna obrigatória (ex.: arquivo de outro esquema)."""
+    faltam = [" ou ".join(op) for s in (["sucs", "trb"] if sistema == "ambos" else [sistema])
+              for op in OBRIGATORIAS[s] if not any(c in df.columns for c in op)]
+    if faltam:
+        raise ValueError(f"colunas obrigatórias ausentes para {sistema.upper()}: {', '.join(faltam)}")
+
+
+def _sucs_com_relatorio(df):
+    """classify_dataframe; se alguma linha for rejeitada (texto em campo numérico), refaz linha a linha."""
+    try:
+        return classify_dataframe(df)
+    except (TypeError, ValueError):
+        pass
+    partes = []
+    for i in range(len(df)):
+        linha = df.iloc[i:i + 1]
+        try:
+            partes.append(classify_dataframe(linha))
+        except (TypeError, ValueError) as e:
+            partes.append(linha.assign(grupo=None, relatorio=f"Linha inválida: {e}", regra_SUCS=-1))
+    return pd.concat(partes)
+
+
+def classify_chunk(df, sistema, relatorio=False):
+    """
+    Classifica um pedaço de lote. Sem relatorio usa os motores vetorizados
+    (linhas inválidas ficam com grupo vazio); com relatorio usa os classificadores
+    linha a linha (linhas inválidas também ficam com grupo vazio, com o motivo no
+    relatório). Em 'ambos' os relatórios saem em relatorio_SUCS / relatorio_TRB.
+    """
+    check_columns(df, sistema)
+    out = df
+    if sistema in ("sucs", "ambos"):
+        out = with_gradation(out)
+        out = _sucs_com_relatorio(out) if relatorio else classify_dataframe_vec(out)
+        if relatorio and sistema == "ambos":
+            out = out.rename(columns={"relatorio": "relatorio_SUCS"})
+    if sistema in ("trb", "ambos"):
+        if relatorio:
+            out = out.copy()
+            out["NP"] = normalize_np(out["NP"]) if "NP" in out.columns else False
+            out = classify_dataframe_trb_safe(out)
+            if sistema == "ambos":
+                out = out.rename(columns={"relatorio": "relatorio_TRB"})
+        else:
+            out = classify_dataframe_trb_vec(out)
+    return out
+
+
+def _atomic_target(dst):
+    pasta, nome = os.path.split(os.path.abspath(dst))
+    return os.path.join(pasta, f".{nome}.{os.getpid()}.tmp")
+
+
+def _write_atomic(dst, df, fmt):
+    tmp = _atomic_target(dst)
+    try:
+        with ChunkWriter(tmp, fmt=fmt) as w:
+            w.write(df)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def process_file(src, dst, sistema, relatorio=False, chunk_rows=CHUNK_ROWS, normalizado=False):
+    """
+    Classifica src e grava dst (formato pelo sufixo) atomicamente. Retorna o nº de linhas.
+    normalizado=True grava a tabela de fatos e as dimensões (ver export_core.write_normalized).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    tmp = _atomic_target(dst)
+    fmt = os.path.splitext(dst)[1].lower().lstrip(".")
+    sistemas = ["sucs", "trb"] if sistema == "ambos" else [sistema]
+    dims = dimension_tables(sistemas) if normalizado else {}
+    try:
+        with ChunkWriter(tmp, fmt=fmt, sheet_name="fatos" if normalizado else "dados") as w:
+            for df in read_chunks(src, chunk_rows):
+                out = classify_chunk(df, sistema, relatorio)
+                w.write(fact_table(out) if normalizado else out)
+            if fmt == "xlsx":
+                for nome, d in dims.items():
+                    w.add_sheet(nome, d)
+        if fmt != "xlsx":
+            for nome, d in dims.items():
+                _write_atomic(sibling_path(dst, nome), d, fmt)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return w.rows
+
+
+def output_name(src, saida, sistema, fmt, usados=None, sobrescrever=True):
+    """
+    <saida>/<nome>_<sistema>.<fmt>. Se o nome já estiver em `usados` (ex.: lote.csv
+    e lote.xlsx no mesmo lote) ou, com sobrescrever=False, já existir, inclui a
+    extensão de origem (lote_xlsx_trb.csv) e, se preciso, um contador. O nome
+    escolhido é acrescentado a `usados`.
+    """
+    stem, ext = os.path.splitext(os.path.basename(src))
+    ext = ext.lstrip(".").lower()
+
+    def livre(p):
+        return (usados is None or p not in usados) and (sobrescrever or not os.path.exists(p))
+
+    dst = os.path.join(saida, f"{stem}_{sistema}.{fmt}")
+    if not livre(dst):
+        base = os.path.join(saida, f"{stem}_{ext}_{sistema}" if ext else f"{stem}_{sistema}")
+        dst, k = f"{base}.{fmt}", 1
+        while not livre(dst):
+            k += 1
+            dst = f"{base}.{k}.{fmt}"
+    if usados is not None:
+        usados.add(dst)
+    return dst
+
+
+def _job(args):
+    src, dst, sistema, relatorio, chunk_rows, normalizado = args
+    t0 = time.perf_counter()
+    n = process_file(src, dst, sistema, relatorio, chunk_rows, normalizado)
+    return src, dst, n, time.perf_counter() - t0
+
+
+def run_jobs(jobs, workers=1):
+    """Executa (src, dst, sistema, relatorio, chunk_rows, normalizado) em série ou num pool de processos."""
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            yield from ex.map(_job, jobs)
+    else:
+        for j in jobs:
+            yield _job(j)
+
+
+def collect_inputs(paths):
+    arquivos = []
+    for p in paths:
+        if os.path.isdir(p):
+            arquivos += sorted(os.path.join(p, f) for f in os.listdir(p)
+                               if f.lower().endswith(ENTRADAS) and not f.startswith((".", "~$")))
+        elif os.path.isfile(p):
+            arquivos.append(p)
+        else:
+            raise FileNotFoundError(p)
+    return arquivos
+
+
+# ---------------------------------------------------------------------------
+# Modo vigia
+# ---------------------------------------------------------------------------
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_registro(path):
+    vistos = set()
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    vistos.add(json.loads(linha)["chave"])
+                except (ValueError, KeyError):
+                    continue
+    return vistos
+
+
+def _registrar(path, item):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _mover(src, pasta):
+    os.makedirs(pasta, exist_ok=True)
+    dst = os.path.join(pasta, _nome_original(src))
+    if os.path.exists(dst):
+        base, ext = os.path.splitext(dst)
+        dst = f"{base}.{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+    shutil.move(src, dst)
+    return dst
+
+
+def _dono():
+    return f"{os.getpid()}@{socket.gethostname()}"
+
+
+_RESERVA_RE = re.compile(r"^(\d+)@(.+?)--(.+)$")
+
+
+def _reservar(p, proc):
+    """Move p para a pasta de reserva com o dono no nome (pid@host--arquivo); None se outro vigia levou antes."""
+    alvo = os.path.join(proc, f"{_dono()}--{_nome_original(p)}")
+    try:
+        os.rename(p, alvo)  # reserva atômica
+    except (FileNotFoundError, FileExistsError):
+        return None
+    return alvo
+
+
+def _nome_original(p):
+    m = _RESERVA_RE.match(os.path.basename(p))
+    return m.group(3) if m else os.path.basename(p)
+
+
+def _vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _orfaos(proc, log):
+    """
+    Reservas deixadas por um vigia interrompido nesta máquina (processo já
+    encerrado). Reservas de vigias ativos, ou de outra máquina, não são tocadas.
+    """
+    host, orfaos = socket.gethostname(), []
+    for f in sorted(os.listdir(proc)):
+        m = _RESERVA_RE.match(f)
+        if m is None:
+            log(f"[vigiar] {f}: reserva sem dono em {PROCESSANDO}, ignorada")
+        elif m.group(2) == host and not _vivo(int(m.group(1))):
+            alvo = _reservar(os.path.join(proc, f), proc)
+            if alvo is not None:
+                orfaos.append(alvo)
+    return orfaos
+
+
+def _prontos(inbox, tamanhos, uma_vez):
+    """Arquivos da caixa de entrada com tamanho estável desde a última varredura."""
+    prontos, atual = [], {}
+    for f in sorted(os.listdir(inbox)):
+        p = os.path.join(inbox, f)
+        if f.startswith((".", "~$")) or not f.lower().endswith(ENTRADAS) or not os.path.isfile(p):
+            continue
+        st = os.stat(p)
+        atual[p] = (st.st_size, st.st_mtime)
+        if uma_vez or tamanhos.get(p) == atual[p]:
+            prontos.append(p)
+    return prontos, atual
+
+
+def watch(inbox, saida, sistema, fmt="csv", workers=1, relatorio=False, intervalo=2.0,
+          uma_vez=False, chunk_rows=CHUNK_ROWS, normalizado=False, log=print):
+    """
+    Vigia 'inbox' e classifica cada arquivo novo uma única vez. Arquivos
+    processados vão para inbox/processados, com falha para inbox/erros (com um
+    .erro.txt ao lado). Retorna o número de arquivos processados (útil com uma_vez).
+    """
+    proc = os.path.join(inbox, PROCESSANDO)
+    os.makedirs(proc, exist_ok=True)
+    os.makedirs(saida, exist_ok=True)
+    registro = os.path.join(saida, REGISTRO)
+    vistos = _ler_registro(registro)
+    tamanhos = {}
+    total = 0
+    # reservas de uma execução interrompida (deste host) voltam primeiro
+    pendentes = _orfaos(proc, log)
+    while True:
+        prontos, tamanhos = _prontos(inbox, tamanhos, uma_vez)
+        for p in prontos:
+            alvo = _reservar(p, proc)
+            if alvo is not None:
+                pendentes.append(alvo)
+
+        jobs, hashes, usados = [], {}, set()
+        if pendentes:
+            vistos |= _ler_registro(registro)  # outro vigia pode ter gravado no mesmo registro
+        for p in pendentes:
+            h = f"{_sha256(p)}:{sistema}:{fmt}:{int(relatorio)}:{int(normalizado)}"
+            if h in vistos:
+                log(f"[vigiar] {_nome_original(p)}: já processado (mesmo conteúdo), ignorado")
+                _mover(p, os.path.join(inbox, PROCESSADOS))
+                continue
+            hashes[p] = h
+            # saídas anteriores (outro arquivo com o mesmo nome) não são sobrescritas
+            jobs.append((p, output_name(_nome_original(p), saida, sistema, fmt, usados, sobrescrever=False),
+                         sistema, relatorio, chunk_rows, normalizado))
+        pendentes = []
+
+        for p, dst, n, dt, erro in _run_safe(jobs, workers):
+            if erro:
+                log(f"[vigiar] {_nome_original(p)}: ERRO {erro}")
+                destino = _mover(p, os.path.join(inbox, ERROS))
+                with open(destino + ".erro.txt", "w", encoding="utf-8") as f:
+                    f.write(erro + "\n")
+                continue
+            _registrar(registro, {"arquivo": _nome_original(p), "chave": hashes[p], "saida": dst,
+                                  "linhas": n, "segundos": round(dt, 3), "sistema": sistema,
+                                  "quando": time.strftime("%Y-%m-%dT%H:%M:%S")})
+            vistos.add(hashes[p])
+            _mover(p, os.path.join(inbox, PROCESSADOS))
+            total += 1
+            log(f"[vigiar] {_nome_original(p)} -> {dst} ({n} linhas, {n / max(dt, 1e-9):,.0f} linhas/s)")
+
+        if uma_vez:
+            return total
+        time.sleep(intervalo)
+
+
+def _run_safe(jobs, workers):
+    """Como run_jobs, mas um arquivo com erro não derruba os demais."""
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futs = [(j, ex.submit(_job, j)) for j in jobs]
+            for j, fut in futs:
+                try:
+                    yield (*fut.result(), None)
+                except Exception as e:
+                    yield j[0], j[1], 0, 0.0, f"{type(e).__name__}: {e}"
+    else:
+        for j in jobs:
+            try:
+                yield (*_job(j), None)
+            except Exception as e:
+                yield j[0], j[1], 0, 0.0, f"{type(e).__name__}: {e}"
+
+
+# ---------------------------------------------------------------------------
+# Entrada de linha de comando
+# ---------------------------------------------------------------------------
+
+def _comuns(p):
+    p.add_argument("--sistema", choices=SISTEMAS, default="sucs")
+    p.add_argument("--formato", choices=FORMATOS, default="csv", help="formato de saída")
+    p.add_argument("--saida", default="resultados", help="pasta de saída")
+    p.add_argument("--workers", type=int, default=1, help="processos em paralelo (um arquivo por processo)")
+    p.add_argument("--relatorio", action="store_true",
+                   help="inclui o relatório texto por linha (mais lento; padrão: motor vetorizado)")
+    p.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="linhas por pedaço de leitura")
+    p.add_argument("--normalizado", action="store_true",
+                   help="tabela de fatos compacta + dimensões com os textos por grupo/regra")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="cli.py", description="Classificação SUCS/TRB em lote, sem interface web.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    c = sub.add_parser("classificar", help="classifica arquivos ou pastas")
+    c.add_argument("entradas", nargs="+", help="arquivos .csv/.xlsx/.parquet ou pastas")
+    _comuns(c)
+
+    v = sub.add_parser("vigiar", help="processa cada arquivo novo de uma pasta de entrada")
+    v.add_argument("inbox")
+    v.add_argument("--intervalo", type=float, default=2.0, help="segundos entre varreduras")
+    v.add_argument("--uma-vez", action="store_true", help="processa o que houver e sai")
+    _comuns(v)
+
+    g = sub.add_parser("gerar", help="gera lote sintético (synth_core)")
+    g.add_argument("linhas", type=int)
+    g.add_argument("arquivo", help="destino .csv/.xlsx/.parquet")
+    g.add_argument("--sistema", choices=SISTEMAS, default="sucs")
+    g.add_argument("--seed", type=int, default=None)
+    g.add_argument("--ausentes", type=float, default=0.0)
+    g.add_argument("--invalidos", type=float, default=0.0)
+    g.add_argument("--limitrofes", type=float, default=0.0)
+
+    d = sub.add_parser("diff", help="compara dois resultados (incluídas, removidas, alteradas)")
+    d.add_argument("antes")
+    d.add_argument("depois")
+    d.add_argument("--chave", default="projeto,amostra", help="colunas de junção, separadas por vírgula")
+    d.add_argument("--saida", default=None, help="arquivo com as diferenças (.csv/.xlsx/.parquet)")
+    d.add_argument("--particoes", type=int, default=16, help="partições da junção por hash")
+
+    im = sub.add_parser("impacto", help="amostras que mudariam com outro valor de limite")
+    im.add_argument("entrada", help="lote de entrada (.csv/.xlsx/.parquet)")
+    im.add_argument("--sistema", choices=("sucs", "trb"), default="sucs")
+    im.add_argument("--limite", action="append", default=[], metavar="NOME=VALOR",
+                    help="limite de *_LIMITES (repetível), ex. linha_A_incl=0.75")
+    im.add_argument("--ig-tipico", action="append", default=[], metavar="GRUPO=IG",
+                    help="TRB: outro IG típico máximo (repetível), ex. A-4=6")
+    im.add_argument("--saida", default=None, help="arquivo com as amostras afetadas")
+
+    r = sub.add_parser("relatorios", help="gráfico de plasticidade (PNG) e relatório PDF por amostra, num ZIP")
+    r.add_argument("entrada", help="lote de entrada (.csv/.xlsx/.parquet)")
+    r.add_argument("zip", help="arquivo .zip de destino")
+    r.add_argument("--sistema", choices=("sucs", "trb"), default="sucs")
+    r.add_argument("--workers", type=int, default=None, help="processos de desenho (padrão: todos os núcleos)")
+    r.add_argument("--formatos", default="png,pdf", help="png, pdf ou png,pdf")
+
+    pf = sub.add_parser("perfil", help="amostras de um trecho (estaca/profundidade) e perfil longitudinal")
+    pf.add_argument("entrada", help="lote ou resultado com coluna de estaca (.csv/.xlsx/.parquet)")
+    pf.add_argument("--sistema", choices=SISTEMAS, default="ambos", help="classificação, se a entrada não vier classificada")
+    pf.add_argument("--projeto", default=None)
+    pf.add_argument("--estacas", default=None, metavar="INI:FIM", help="ex. 120:340 ou 120+10:340")
+    pf.add_argument("--prof", default=None, metavar="DE:ATE", help="profundidade em m, ex. 0.5:1.5")
+    pf.add_argument("--segmento", type=float, default=10.0, help="estacas por segmento do perfil")
+    pf.add_argument("--camadas", default=None, help="limites das camadas em m, ex. 0,0.5,1.5,3")
+    pf.add_argument("--saida", default=None, help="arquivo do perfil (.csv/.xlsx/.parquet)")
+    pf.add_argument("--amostras", default=None, help="arquivo com as amostras do trecho")
+
+    a = ap.parse_args(argv)
+    if a.cmd == "classificar":
+        usados = set()
+        jobs = [(f, output_name(f, a.saida, a.sistema, a.formato, usados), a.sistema, a.relatorio, a.chunk,
+                 a.normalizado) for f in collect_inputs(a.entradas)]
+        t0 = time.perf_counter()
+        total = 0
+        for src, dst, n, dt in run_jobs(jobs, a.workers):
+            total += n
+            print(f"{src} -> {dst} ({n} linhas, {dt:.1f} s)")
+        print(f"{len(jobs)} arquivo(s), {total} linhas em {time.perf_counter() - t0:.1f} s")
+    elif a.cmd == "vigiar":
+        try:
+            watch(a.inbox, a.saida, a.sistema, a.formato, a.workers, a.relatorio,
+                  a.intervalo, a.uma_vez, a.chunk, a.normalizado)
+        except KeyboardInterrupt:
+            pass
+    elif a.cmd == "relatorios":
+        from render_core import render_batch
+        formatos = tuple(f.strip() for f in a.formatos.split(",") if f.strip())
+        if not formatos or set(formatos) - {"png", "pdf"}:
+            ap.error("--formatos aceita png, pdf ou png,pdf")
+        res = pd.concat([classify_chunk(ch, a.sistema) for ch in read_chunks(a.entrada)], ignore_index=True)
+        t0 = time.perf_counter()
+        tmp = a.zip + ".tmp"
+        n = render_batch(res, a.sistema, tmp, workers=a.workers, formatos=formatos)
+        os.replace(tmp, a.zip)
+        print(f"{len(res)} amostras, {n} arquivos em {a.zip} ({time.perf_counter() - t0:.1f} s)")
+    elif a.cmd == "perfil":
+        from profile_core import StationIndex
+        faixa = lambda s: [v.strip() or None for v in s.split(":", 1)] if s else [None, None]
+        partes = []
+        for ch in read_chunks(a.entrada):
+            ja = {"sucs": "grupo" in ch.columns, "trb": "Grupo_TRB" in ch.columns,
+                  "ambos": "grupo" in ch.columns and "Grupo_TRB" in ch.columns}[a.sistema]
+            partes.append(ch if ja or "cod_SUCS" in ch.columns or "cod_TRB" in ch.columns
+                          else classify_chunk(ch, a.sistema))
+        res = pd.concat(partes, ignore_index=True)
+        t0 = time.perf_counter()
+        ix = StationIndex(res)
+        print(f"índice: {len(ix)} amostras com estaca ({ix.sem_local} sem) em {time.perf_counter() - t0:.2f} s")
+        e0, e1 = faixa(a.estacas)
+        p0, p1 = faixa(a.prof)
+        camadas = [float(v) for v in a.camadas.split(",")] if a.camadas else None
+        trecho = ix.query(res, e0, e1, p0, p1, a.projeto)
+        perfil = ix.profile(a.segmento, camadas, e0, e1, p0, p1, a.projeto)
+        print(f"{len(trecho)} amostras no trecho")
+        cols = [c for c in perfil.columns if not c.startswith(("SUCS_", "TRB_")) or c.endswith("predominante")]
+        print(perfil[cols].to_string(index=False))
+        if a.saida:
+            _write_atomic(a.saida, perfil, os.path.splitext(a.saida)[1].lower().lstrip("."))
+        if a.amostras:
+            _write_atomic(a.amostras, trecho, os.path.splitext(a.amostras)[1].lower().lstrip("."))
+    elif a.cmd == "impacto":
+        from impact_core import ImpactIndex
+        par = lambda itens, conv: {k.strip(): conv(v) for k, v in (i.split("=", 1) for i in itens)}
+        df = pd.concat(read_chunks(a.entrada), ignore_index=True)
+        t0 = time.perf_counter()
+        ix = ImpactIndex(df, a.sistema)
+        print(f"índice: {len(df)} amostras em {time.perf_counter() - t0:.2f} s")
+        r = ix.impact(par(a.limite, float), par(a.ig_tipico, int) or None)
+        print(r.summary().to_string())
+        t = r.transitions()
+        if not t.empty:
+            print(f"\nantes -> depois\n{t.to_string()}")
+        if a.saida:
+            _write_atomic(a.saida, r.changes, os.path.splitext(a.saida)[1].lower().lstrip("."))
+    elif a.cmd == "diff":
+        from diff_core import diff_files
+        t0 = time.perf_counter()
+        r = diff_files(a.antes, a.depois, [c.strip() for c in a.chave.split(",") if c.strip()], a.particoes)
+        print(r.summary().to_string())
+        for campo in ("grupo", "Grupo_TRB"):
+            t = r.transitions(campo)
+            if not t.empty:
+                print(f"\n{campo}: antes -> depois\n{t.to_string()}")
+        if a.saida:
+            _write_atomic(a.saida, r.changes, os.path.splitext(a.saida)[1].lower().lstrip("."))
+            print(f"\n{len(r.changes)} diferenças em {a.saida}")
+        print(f"{time.perf_counter() - t0:.1f} s")
+    else:
+        from synth_core import write_dataset
+        n = write_dataset(a.arquivo, a.linhas, a.sistema, seed=a.seed, ausentes=a.ausentes,
+                          invalidos=a.invalidos, limitrofes=a.limitrofes)
+        print(f"{a.arquivo}: {n} linhas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# diff_core.py
+# Comparação entre duas campanhas (ou duas rodadas) de resultados: junta por
+# projeto/amostra (ou outra chave) e lista amostras incluídas, removidas e com
+# grupo SUCS, grupo TRB ou IG alterado.
+#
+# A junção é por hash (chave -> uint64) e pela própria chave (uma colisão do
+# hash não junta amostras diferentes). Para arquivos grandes, diff_files faz
+# uma junção particionada: cada arquivo é lido em pedaços, só com as colunas
+# necessárias, e espalhado em partições por hash; depois cada par de partições
+# é comparado em memória. A memória fica limitada ao tamanho de uma partição.
+
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from io_core import read_chunks
+from summary_core import KEY_ALIASES
+
+CHAVE_PADRAO = ("projeto", "amostra")
+# coluna comparada -> alternativas aceitas no arquivo (resultado normal ou normalizado)
+CAMPOS = {
+    "grupo": ("grupo", "cod_SUCS"),
+    "Grupo_TRB": ("Grupo_TRB", "cod_TRB"),
+    "IG": ("IG",),
+}
+STATUS = ("incluída", "removida", "alterada")
+
+
+def _resolve(colunas, chave):
+    """Nome real de cada coluna de chave e de cada campo comparado presente."""
+    ks = {}
+    for k in chave:
+        col = next((c for c in KEY_ALIASES.get(k, (k,)) if c in colunas), None)
+        if col is None:
+            raise KeyError(f"coluna de chave ausente: {k!r}")
+        ks[k] = col
+    cs = {}
+    for campo, alts in CAMPOS.items():
+        col = next((c for c in alts if c in colunas), None)
+        if col is not None:
+            cs[campo] = col
+    return ks, cs
+
+
+def _compact(df, chave):
+    """Chave (texto) + hash uint64 + campos comparados, com grupos como texto."""
+    from sucs_core import SUCS_GROUPS
+    from trb_core import TRB_GROUPS
+    ks, cs = _resolve(df.columns, chave)
+    out = pd.DataFrame({k: df[c].astype("string").fillna("").str.strip() for k, c in ks.items()})
+    for campo, col in cs.items():
+        v = df[col]
+        if col.startswith("cod_"):
+            nomes = np.array(list(SUCS_GROUPS if col == "cod_SUCS" else TRB_GROUPS) + [None], dtype=object)
+            cod = pd.to_numeric(v, errors="coerce").fillna(-1).astype(int).to_numpy()
+            v = pd.Series(nomes[np.where(cod < 0, -1, cod)], index=df.index)
+        out[campo] = pd.to_numeric(v, errors="coerce").astype("Int16") if campo == "IG" else v.astype("string")
+    out["_h"] = pd.util.hash_pandas_object(out[list(chave)], index=False).to_numpy()
+    return out
+
+
+def _dedup(c, chave):
+    por = ["_h", *chave]
+    dup = int(c.duplicated(por, keep="last").sum())
+    return (c.drop_duplicates(por, keep="last") if dup else c), dup
+
+
+def _join(a, b, chave):
+    """Junta duas tabelas compactas e devolve só as linhas diferentes."""
+    campos = [c for c in CAMPOS if c in a.columns or c in b.columns]
+    m = a.merge(b, on=["_h", *chave], how="outer", suffixes=("_antes", "_depois"), indicator=True)
+    status = pd.Series(pd.NA, index=m.index, dtype="string")
+    status[m["_merge"].eq("right_only").to_numpy()] = "incluída"
+    status[m["_merge"].eq("left_only").to_numpy()] = "removida"
+    ambos = m["_merge"].eq("both").to_numpy()
+    mudou = np.zeros(len(m), dtype=bool)
+    for c in campos:
+        x = m[f"{c}_antes"] if f"{c}_antes" in m else pd.Series(pd.NA, index=m.index)
+        y = m[f"{c}_depois"] if f"{c}_depois" in m else pd.Series(pd.NA, index=m.index)
+        m[f"{c}_antes"], m[f"{c}_depois"] = x, y
+        dif = (x.isna() != y.isna()) | (x.notna() & y.notna() & (x.astype("string") != y.astype("string")))
+        mudou |= dif.fillna(False).to_numpy(dtype=bool)
+    status[ambos & mudou] = "alterada"
+    m["status"] = status
+    cols = list(chave) + ["status"] + [f"{c}_{s}" for c in campos for s in ("antes", "depois")]
+    return m.loc[m["status"].notna(), cols].reset_index(drop=True)
+
+
+class DiffResult:
+    """Linhas diferentes (changes) e contagens (summary / transitions)."""
+
+    def __init__(self, changes, n_antes, n_depois, duplicadas=(0, 0)):
+        self.changes = changes
+        self.n_antes = n_antes
+        self.n_depois = n_depois
+        self.duplicadas = duplicadas
+
+    def summary(self):
+        cont = self.changes["status"].value_counts()
+        linhas = {s: int(cont.get(s, 0)) for s in STATUS}
+        linhas.update({"amostras_antes": self.n_antes, "amostras_depois": self.n_depois,
+                       "chaves_duplicadas_antes": self.duplicadas[0],
+                       "chaves_duplicadas_depois": self.duplicadas[1]})
+        return pd.Series(linhas)
+
+    def transitions(self, campo="Grupo_TRB"):
+        """Matriz antes -> depois das amostras alteradas para 'grupo' ou 'Grupo_TRB'."""
+        c = self.changes[self.changes["status"] == "alterada"]
+        if f"{campo}_antes" not in c.columns:
+            return pd.DataFrame()
+        a = c[f"{campo}_antes"].fillna("—")
+        d = c[f"{campo}_depois"].fillna("—")
+        t = pd.crosstab(a[a != d], d[a != d])
+        t.index.name, t.columns.name = "antes", "depois"
+        return t
+
+
+def diff_frames(antes, depois, chave=CHAVE_PADRAO):
+    """Compara dois resultados já carregados (DataFrames)."""
+    chave = tuple(chave)
+    a, da = _dedup(_compact(antes, chave), chave)
+    b, db = _dedup(_compact(depois, chave), chave)
+    changes = _join(a, b, chave).sort_values(list(chave), kind="stable").reset_index(drop=True)
+    return DiffResult(changes, len(a), len(b), (da, db))
+
+
+def _colunas_usadas(chave):
+    """Todos os nomes aceitos para a chave e para os campos comparados."""
+    nomes = {c for k in chave for c in KEY_ALIASES.get(k, (k,))}
+    return nomes.union(*CAMPOS.values())
+
+
+def _particionar(path, chave, pasta, lado, particoes, chunk_rows):
+    n = 0
+    for k, df in enumerate(read_chunks(path, chunk_rows, usecols=_colunas_usadas(chave))):
+        c = _compact(df, chave)
+        n += len(c)
+        p = (c["_h"].to_numpy() % np.uint64(particoes)).astype(np.int64)
+        for i, parte in c.groupby(p, sort=False):
+            with open(os.path.join(pasta, f"{lado}{i:04d}_{k:06d}.pkl"), "wb") as f:
+                pickle.dump(parte, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return n
+
+
+def _carregar(pasta, prefixo, vazio):
+    partes = []
+    for nome in sorted(os.listdir(pasta)):
+        if nome.startswith(prefixo):
+            with open(os.path.join(pasta, nome), "rb") as f:
+                partes.append(pickle.load(f))
+    return pd.concat(partes, ignore_index=True) if partes else vazio
+
+
+def diff_files(path_antes, path_depois, chave=CHAVE_PADRAO, particoes=16, chunk_rows=200_000):
+    """
+    Compara dois arquivos de resultado (.csv, .xlsx ou .parquet; normal ou
+    normalizado) com junção particionada por hash. Só as diferenças ficam em memória.
+    """
+    chave = tuple(chave)
+    with tempfile.TemporaryDirectory(prefix="diff_") as pasta:
+        _particionar(path_antes, chave, pasta, "a", particoes, chunk_rows)
+        _particionar(path_depois, chave, pasta, "b", particoes, chunk_rows)
+        vazio = pd.DataFrame({k: pd.Series(dtype="string") for k in chave}).assign(
+            _h=pd.Series(dtype=np.uint64))
+        difs, na, nb, da, db = [], 0, 0, 0, 0
+        for i in range(particoes):
+            a, x = _dedup(_carregar(pasta, f"a{i:04d}_", vazio), chave)
+            b, y = _dedup(_carregar(pasta, f"b{i:04d}_", vazio), chave)
+            na, nb, da, db = na + len(a), nb + len(b), da + x, db + y
+            if len(a) or len(b):
+                difs.append(_join(a, b, chave))
+    changes = pd.concat(difs, ignore_index=True) if difs else pd.DataFrame(columns=list(chave) + ["status"])
+    return DiffResult(changes.sort_values(list(chave), kind="stable").reset_index(drop=True), na, nb, (da, db))
@@ -0,0 +1,261 @@
+# export_core.py
+# Escrita de resultados em pedaços (CSV, XLSX ou Parquet) com memória fixa,
+# usada pelo gerador sintético e pela linha de comando, e o formato
+# normalizado: tabela de fatos compacta (entradas, código do grupo, IG, regra,
+# sinalizadores) + tabelas de dimensão com os textos por grupo e por regra.
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+FORMATOS = ("csv", "xlsx", "parquet")
+XLSX_MAX_ROWS = 1_048_575
+
+
+def format_of(path):
+    """Formato pelo sufixo do arquivo ('csv', 'xlsx' ou 'parquet')."""
+    ext = os.path.splitext(str(path))[1].lower().lstrip(".")
+    if ext not in FORMATOS:
+        raise ValueError(f"formato não suportado: {ext or path!r} (use .csv, .xlsx ou .parquet)")
+    return ext
+
+
+class ChunkWriter:
+    """
+    Acrescenta DataFrames a um arquivo, um pedaço por vez. O cabeçalho vem do
+    primeiro pedaço; os seguintes são alinhados a ele (colunas ausentes ficam
+    vazias; colunas que não estão no cabeçalho geram ValueError). XLSX usa xlsxwriter em modo constant_memory; Parquet requer
+    pyarrow. Use como gerenciador de contexto (fecha o arquivo ao sair).
+    """
+
+    def __init__(self, path, fmt=None, sheet_name="dados"):
+        self.path = path
+        self.fmt = fmt or format_of(path)
+        self.sheet_name = sheet_name
+        self.rows = 0
+        self.columns = None
+        self._h = None
+        self._ws = None
+        if self.fmt not in FORMATOS:
+            raise ValueError(f"formato não suportado: {self.fmt!r} (use {', '.join(FORMATOS)})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_sheet(self, name, df):
+        """XLSX: acrescenta outra planilha (ex.: dimensões) depois dos dados."""
+        if self.fmt != "xlsx":
+            raise ValueError("add_sheet só se aplica a XLSX")
+        if self._h is None:
+            self._write_xlsx(df.iloc[:0])
+        ws = self._h.add_worksheet(name)
+        ws.write_row(0, 0, [str(c) for c in df.columns])
+        for i, rec in enumerate(df.itertuples(index=False, name=None), start=1):
+            ws.write_row(i, 0, [_cell(v) for v in rec])
+
+    def write(self, df):
+        if self.columns is None:
+            self.columns = list(df.columns)
+        elif list(df.columns) != self.columns:
+            novas = [c for c in df.columns if c not in self.columns]
+            if novas:
+                raise ValueError(f"colunas fora do cabeçalho do primeiro pedaço: {', '.join(map(str, novas))}")
+            df = df.reindex(columns=self.columns)
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self._h is None else "a", header=self._h is None,
+                      index=False, encoding="utf-8")
+            self._h = True
+        elif self.fmt == "parquet":
+            self._write_parquet(df)
+        else:
+            self._write_xlsx(df)
+        self.rows += len(df)
+
+    def _write_parquet(self, df):
+        try:
+            import pyarrow as pa  # type: ignore
+            import pyarrow.parquet as pq  # type: ignore
+        except Exception as e:  # pragma: no cover
+            raise ImportError("Saída Parquet requer 'pyarrow' (pip install pyarrow).") from e
+        t = pa.Table.from_pandas(df, preserve_index=False)
+        if self._h is None:
+            self._h = pq.ParquetWriter(self.path, t.schema)
+        else:
+            t = t.cast(self._h.schema)
+        self._h.write_table(t)
+
+    def _write_xlsx(self, df):
+        if self._h is None:
+            try:
+                import xlsxwriter  # type: ignore
+            except Exception as e:  # pragma: no cover
+                raise ImportError("Saída XLSX requer 'XlsxWriter' (pip install XlsxWriter).") from e
+            self._h = xlsxwriter.Workbook(self.path, {"constant_memory": True})
+            self._ws = self._h.add_worksheet(self.sheet_name)
+            self._ws.write_row(0, 0, [str(c) for c in df.columns])
+        if self.rows + len(df) > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX comporta no máximo {XLSX_MAX_ROWS} linhas de dados por planilha")
+        ws, linha = self._ws, self.rows + 1
+        for rec in df.itertuples(index=False, name=None):
+            ws.write_row(linha, 0, [_cell(v) for v in rec])
+            linha += 1
+
+    def close(self):
+        if self.fmt == "csv":
+            if self._h is None:  # nenhum pedaço: arquivo vazio, mas existente
+                open(self.path, "w").close()
+                self._h = True
+        elif self._h is not None:
+            self._h.close()
+            self._h = None
+
+
+def _cell(v):
+    if v is None:
+        return ""
+    try:
+        if v != v:  # NaN / NA
+            return ""
+    except (TypeError, ValueError):
+        return ""
+    return v
+
+
+# ---------------------------------------------------------------------------
+# Formato normalizado (fatos + dimensões)
+# ---------------------------------------------------------------------------
+
+# Colunas de texto que saem da tabela de fatos (voltam pelas dimensões ou
+# são regeradas a partir das entradas, como o relatório)
+_TEXTO = ("relatorio", "relatorio_SUCS", "relatorio_TRB", "Subleito", "Materiais constituintes", "aviso_ig")
+
+
+def systems_of(res):
+    """Sistemas presentes num resultado ('sucs' e/ou 'trb')."""
+    return [s for s, col in (("sucs", "grupo"), ("trb", "Grupo_TRB")) if col in res.columns]
+
+
+def sucs_dimension():
+    """Uma linha por grupo SUCS: código, símbolo, descrição DNIT e CBR típico."""
+    from sucs_core import SUCS_GROUPS, cbr_for_group, dnit_description_for_group
+    return pd.DataFrame({
+        "cod_SUCS": np.arange(len(SUCS_GROUPS), dtype=np.int16),
+        "grupo": list(SUCS_GROUPS),
+        "descricao_DNIT": [dnit_description_for_group(g) or "" for g in SUCS_GROUPS],
+        "CBR_SUCS": [cbr_for_group(g) or "" for g in SUCS_GROUPS],
+    })
+
+
+def trb_dimension():
+    """Uma linha por grupo TRB: código, grupo, resumo, definição, CBR, subleito, materiais e IG típico."""
+    from trb_core import GROUP_DESC, TRB_GROUPS, cbr_for_trb
+    from trb_defs import get_definicao, get_materiais, get_subleito_text, ig_tipico_max
+    return pd.DataFrame({
+        "cod_TRB": np.arange(len(TRB_GROUPS), dtype=np.int16),
+        "Grupo_TRB": list(TRB_GROUPS),
+        "resumo_TRB": [GROUP_DESC.get(g, "") for g in TRB_GROUPS],
+        "definicao_TRB": [get_definicao(g) for g in TRB_GROUPS],
+        "CBR_TRB": [cbr_for_trb(g) or "" for g in TRB_GROUPS],
+        "Subleito": [get_subleito_text(g) for g in TRB_GROUPS],
+        "Materiais constituintes": [get_materiais(g) for g in TRB_GROUPS],
+        "IG_tipico_max": np.array([ig_tipico_max(g) for g in TRB_GROUPS], dtype=np.int16),
+    })
+
+
+def rules_dimension(sistema):
+    """Uma linha por regra da tabela de decisão (texto do traço regra_SUCS / regra_TRB)."""
+    from rules_core import SUCS_PADRAO, TRB_PADRAO
+    rs = SUCS_PADRAO if sistema == "sucs" else TRB_PADRAO
+    col = "regra_SUCS" if sistema == "sucs" else "regra_TRB"
+    n = len(rs.tabela)
+    return pd.DataFrame({
+        col: np.arange(n, dtype=np.int16),
+        f"{col}_texto": [rs.describe(i) for i in range(n)],
+    })
+
+
+def dimension_tables(sistemas):
+    """{nome_da_tabela: DataFrame} com as dimensões dos sistemas pedidos."""
+    out = {}
+    if "sucs" in sistemas:
+        out["grupos_SUCS"] = sucs_dimension()
+        out["regras_SUCS"] = rules_dimension("sucs")
+    if "trb" in sistemas:
+        out["grupos_TRB"] = trb_dimension()
+        out["regras_TRB"] = rules_dimension("trb")
+    return out
+
+
+def fact_table(res):
+    """
+    Tabela de fatos de um resultado de lote: entradas, cod_SUCS/cod_TRB (int16,
+    -1 = sem grupo), IG, regra e o sinalizador aviso_IG; sem textos repetidos.
+    """
+    from sucs_core import SUCS_CODE
+    from trb_core import TRB_CODE
+    fatos = res.drop(columns=[c for c in _TEXTO if c in res.columns])
+    if "grupo" in fatos.columns:
+        cod = fatos["grupo"].map(SUCS_CODE).fillna(-1).astype(np.int16)
+        fatos.insert(fatos.columns.get_loc("grupo"), "cod_SUCS", cod)
+        fatos = fatos.drop(columns="grupo")
+    if "Grupo_TRB" in fatos.columns:
+        cod = fatos["Grupo_TRB"].map(TRB_CODE).fillna(-1).astype(np.int16)
+        fatos.insert(fatos.columns.get_loc("Grupo_TRB"), "cod_TRB", cod)
+        fatos = fatos.drop(columns="Grupo_TRB")
+    if "aviso_ig" in res.columns:
+        fatos["aviso_IG"] = res["aviso_ig"].fillna("").astype(str).str.len().gt(0).to_numpy()
+    return fatos
+
+
+def denormalize(fatos, dims=None):
+    """Junta as dimensões de volta aos fatos (símbolo do grupo e textos) pelo código."""
+    dims = dims or dimension_tables(["sucs", "trb"])
+    out = fatos
+    for nome, chave in (("grupos_SUCS", "cod_SUCS"), ("grupos_TRB", "cod_TRB"),
+                        ("regras_SUCS", "regra_SUCS"), ("regras_TRB", "regra_TRB")):
+        if chave in out.columns and nome in dims:
+            out = out.merge(dims[nome], on=chave, how="left")
+    return out
+
+
+def sibling_path(path, nome):
+    """Arquivo de dimensão ao lado dos fatos: <base>.<nome><ext>."""
+    base, ext = os.path.splitext(path)
+    return f"{base}.{nome}{ext}"
+
+
+def write_normalized(res, path, fmt=None):
+    """
+    Grava o resultado normalizado. XLSX: uma pasta com a planilha 'fatos' e uma
+    planilha por dimensão. CSV/Parquet: path recebe os fatos e cada dimensão vai
+    num arquivo ao lado (<base>.grupos_TRB.csv etc.). Retorna os caminhos escritos.
+    """
+    fmt = fmt or format_of(path)
+    dims = dimension_tables(systems_of(res))
+    with ChunkWriter(path, fmt=fmt, sheet_name="fatos") as w:
+        w.write(fact_table(res))
+        if fmt == "xlsx":
+            for nome, d in dims.items():
+                w.add_sheet(nome, d)
+    if fmt == "xlsx":
+        return [path]
+    escritos = [path]
+    for nome, d in dims.items():
+        p = sibling_path(path, nome)
+        with ChunkWriter(p, fmt=fmt) as wd:
+            wd.write(d)
+        escritos.append(p)
+    return escritos
+
+
+def normalized_xlsx_bytes(res):
+    """XLSX normalizado em memória (para download nos apps)."""
+    mem = io.BytesIO()
+    write_normalized(res, mem, fmt="xlsx")
+    mem.seek(0)
+    return mem
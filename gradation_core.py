@@ -0,0 +1,219 @@
+# gradation_core.py
+# Curva granulométrica -> D10, D30, D60, Cu e Cc, vetorizado para muitas amostras.
+# Interpolação linear em log10(abertura) entre as peneiras que envolvem cada
+# porcentagem-alvo (prática usual da curva semi-log). Sem extrapolação: se o
+# alvo cai abaixo da peneira mais fina (ou acima da mais grossa), D = NaN.
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Aberturas (mm) das peneiras usuais (ASTM E11 / ABNT NBR NM ISO 3310-1)
+SIEVE_MM = {
+    '3"': 75.0, '2"': 50.0, '1 1/2"': 37.5, '1"': 25.0, '3/4"': 19.0, '1/2"': 12.5,
+    '3/8"': 9.5, "#4": 4.75, "#8": 2.36, "#10": 2.0, "#16": 1.18, "#20": 0.85,
+    "#30": 0.6, "#40": 0.425, "#50": 0.3, "#60": 0.25, "#80": 0.18, "#100": 0.15,
+    "#140": 0.106, "#200": 0.075,
+}
+
+_RE_NUM = re.compile(r"^(?:P|#|P#|P_#?)(\d+)$", re.IGNORECASE)
+_RE_MM = re.compile(r"^(\d+(?:[.,]\d+)?)\s*mm$", re.IGNORECASE)
+
+
+def sieve_mm(col):
+    """Abertura (mm) associada a um nome de coluna ('#4', 'P200', '3/8"', '4.75mm'); None se não for peneira."""
+    nome = str(col).strip()
+    if nome in SIEVE_MM:
+        return SIEVE_MM[nome]
+    m = _RE_NUM.match(nome)
+    if m:
+        return SIEVE_MM.get(f"#{int(m.group(1))}")
+    m = _RE_MM.match(nome)
+    if m:
+        return float(m.group(1).replace(",", "."))
+    return None
+
+
+def sieve_columns(df):
+    """Colunas de % passante reconhecidas no DataFrame, como {coluna: abertura_mm}."""
+    out = {}
+    for c in df.columns:
+        mm = sieve_mm(c)
+        if mm is not None:
+            out[c] = mm
+    return out
+
+
+def characteristic_diameters(sizes_mm, passing, targets=(10.0, 30.0, 60.0)):
+    """
+    sizes_mm: (k,) aberturas; passing: (m, k) % passante por amostra.
+    Retorna array (m, len(targets)) com os diâmetros D_t (mm).
+    A curva é tornada não-decrescente com a abertura (máximo acumulado),
+    o que absorve pequenas inconsistências de ensaio. Peneiras em branco (NaN)
+    são ignoradas: interpola-se entre as informadas vizinhas ao alvo.
+    """
+    sizes = np.asarray(sizes_mm, dtype=float)
+    p = np.atleast_2d(np.asarray(passing, dtype=float))
+    ordem = np.argsort(sizes)
+    logd = np.log10(sizes[ordem])
+    branco = np.isnan(p[:, ordem])
+    p = np.fmax.accumulate(p[:, ordem], axis=1)
+    p[branco] = np.nan
+
+    m, k = p.shape
+    linhas = np.arange(m)
+    valida = ~np.isnan(p)
+    # índice da última peneira informada até cada coluna (-1 = nenhuma); peneiras
+    # em branco no meio da curva são puladas na interpolação
+    ultima = np.maximum.accumulate(np.where(valida, np.arange(k), -1), axis=1)
+    out = np.full((m, len(targets)), np.nan)
+    for t_i, t in enumerate(targets):
+        with np.errstate(invalid="ignore"):
+            acima = valida & (p >= t)
+        j = acima.argmax(axis=1)
+        tem = acima[linhas, j]
+        j0 = np.where(j > 0, ultima[linhas, np.maximum(j - 1, 0)], -1)
+        p1 = p[linhas, j]
+        p0 = p[linhas, np.maximum(j0, 0)]
+        # na menor peneira informada só vale a igualdade exata (sem extrapolar)
+        exato = p1 == t
+        ok = tem & (exato | (j0 >= 0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            f = (t - p0) / (p1 - p0)
+            logD = np.where(exato, logd[j], logd[np.maximum(j0, 0)] + f * (logd[j] - logd[np.maximum(j0, 0)]))
+        out[:, t_i] = np.where(ok, 10.0 ** logD, np.nan)
+    return out
+
+
+def cu_cc(d10, d30, d60):
+    """Cu = D60/D10 ; Cc = D30² / (D10·D60)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return d60 / d10, d30 ** 2 / (d10 * d60)
+
+
+def gradation_frame(df, cols=None):
+    """
+    D10, D30, D60, Cu, Cc para cada linha de df a partir das colunas de peneira
+    (cols = {coluna: abertura_mm}; padrão: sieve_columns(df)).
+    """
+    cols = sieve_columns(df) if cols is None else cols
+    if len(cols) < 2:
+        return pd.DataFrame(np.nan, index=df.index, columns=["D10", "D30", "D60", "Cu", "Cc"])
+    passing = df[list(cols)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    D = characteristic_diameters(list(cols.values()), passing)
+    Cu, Cc = cu_cc(D[:, 0], D[:, 1], D[:, 2])
+    return pd.DataFrame({"D10": D[:, 0], "D30": D[:, 1], "D60": D[:, 2], "Cu": Cu, "Cc": Cc},
+                        index=df.index)
+
+
+def with_gradation(df, cols=None, sobrescrever=False):
+    """
+    Completa o lote SUCS a partir das curvas: D10/D30/D60 e Cu/Cc (onde vazios,
+    ou sempre com sobrescrever=True). Se houver #4 e #200, completa também
+    pct_retido_200 e a divisão pedregulho/areia da fração > #200.
+    Sem colunas de peneira, devolve uma cópia inalterada.
+    """
+    cols = sieve_columns(df) if cols is None else cols
+    res = df.copy()
+    if len(cols) < 2:
+        return res
+    g = gradation_frame(df, cols)
+    for c in ("D10", "D30", "D60"):
+        res[c] = g[c]
+    for c in ("Cu", "Cc"):
+        atual = pd.to_numeric(res[c], errors="coerce") if c in res.columns else pd.Series(np.nan, index=res.index)
+        res[c] = g[c] if sobrescrever else atual.fillna(g[c])
+
+    por_mm = {mm: c for c, mm in cols.items()}
+    if SIEVE_MM["#4"] in por_mm and SIEVE_MM["#200"] in por_mm:
+        p4 = pd.to_numeric(df[por_mm[SIEVE_MM["#4"]]], errors="coerce")
+        p200 = pd.to_numeric(df[por_mm[SIEVE_MM["#200"]]], errors="coerce")
+        ret200 = 100.0 - p200
+        pedregulho = 100.0 - p4
+        areia = p4 - p200
+        graos = (pedregulho + areia).where(lambda s: s > 0)
+        derivados = {
+            "pct_retido_200": ret200,
+            "pct_pedregulho_coarse": 100.0 * pedregulho / graos,
+            "pct_areia_coarse": 100.0 * areia / graos,
+        }
+        for c, v in derivados.items():
+            atual = pd.to_numeric(res[c], errors="coerce") if c in res.columns else pd.Series(np.nan, index=res.index)
+            res[c] = v if sobrescrever else atual.fillna(v)
+    return res
+
+
+# ---------------------------------------------------------------------------
+# Planilha bruta do laboratório (massa retida por peneira) -> % passante
+# ---------------------------------------------------------------------------
+
+# Nomes aceitos para o fundo (material que passa na última peneira)
+_PAN = {"fundo", "pan", "prato", "0"}
+
+_SIEVE_NAME = {mm: nome for nome, mm in SIEVE_MM.items()}
+
+
+def _sieve_label(mm):
+    return _SIEVE_NAME.get(mm, f"{mm:g}mm")
+
+
+def masses_to_passing(raw, chaves=("projeto", "amostra"), peneira="peneira",
+                      massa="massa_retida", massa_total=None):
+    """
+    raw: formato longo (uma linha por amostra × peneira) com a massa retida.
+    O total de cada amostra é a soma das massas (incluindo o fundo) ou, se
+    informado, a coluna massa_total (ex.: massa seca antes da lavagem).
+    Retorna DataFrame largo: uma linha por amostra (chaves) e uma coluna de
+    % passante por peneira (rótulos como '#4', '#200', '3/8"').
+    """
+    chaves = [c for c in chaves if c in raw.columns]
+    if not chaves:
+        raise ValueError("Informe ao menos uma coluna-chave de amostra presente na planilha.")
+    nome = raw[peneira].astype(str).str.strip()
+    fundo = nome.str.lower().isin(_PAN)
+    mm = nome.map({u: sieve_mm(u) for u in nome.unique()}).astype(float)
+    desconhecidas = sorted(set(nome[mm.isna() & ~fundo]))
+    if desconhecidas:
+        raise ValueError(f"Peneiras não reconhecidas: {', '.join(desconhecidas)}")
+
+    d = raw[chaves].copy()
+    d["_mm"] = mm.fillna(0.0).to_numpy(dtype=float)
+    d["_m"] = pd.to_numeric(raw[massa], errors="coerce").fillna(0.0).to_numpy()
+    d = d.groupby(chaves + ["_mm"], sort=False, as_index=False)["_m"].sum()
+    d = d.sort_values(chaves + ["_mm"], ascending=[True] * len(chaves) + [False], kind="stable")
+
+    g = d.groupby(chaves, sort=False)["_m"]
+    if massa_total is None:
+        total = g.transform("sum")
+    else:
+        tot = raw[chaves].assign(_t=pd.to_numeric(raw[massa_total], errors="coerce"))
+        tot = tot.groupby(chaves, sort=False)["_t"].first()
+        total = d[chaves].join(tot, on=chaves)["_t"]
+    d["_p"] = (100.0 * (1.0 - g.cumsum() / total)).clip(0.0, 100.0)
+
+    wide = d[d["_mm"] > 0].pivot(index=chaves, columns="_mm", values="_p")
+    wide = wide[sorted(wide.columns, reverse=True)]
+    wide.columns = [_sieve_label(c) for c in wide.columns]
+    return wide.reset_index()
+
+
+def masses_to_inputs(raw, chaves=("projeto", "amostra"), peneira="peneira",
+                     massa="massa_retida", massa_total=None):
+    """
+    Converte a planilha bruta nas entradas dos dois classificadores, de uma vez:
+      - SUCS: pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse, D10/D30/D60, Cu, Cc
+      - TRB:  P10, P40, P200
+    Retorna (df_sucs, df_trb); peneiras ausentes na amostra ficam NaN.
+    """
+    wide = masses_to_passing(raw, chaves, peneira, massa, massa_total)
+    keys = [c for c in chaves if c in wide.columns]
+    sucs = with_gradation(wide)
+    sucs_cols = ["pct_retido_200", "pct_pedregulho_coarse", "pct_areia_coarse",
+                 "D10", "D30", "D60", "Cu", "Cc"]
+    df_sucs = sucs.reindex(columns=keys + sucs_cols)
+
+    df_trb = wide[keys].copy()
+    for col, nome in (("P10", "#10"), ("P40", "#40"), ("P200", "#200")):
+        df_trb[col] = wide[nome] if nome in wide.columns else np.nan
+    return df_sucs, df_trb
@@ -0,0 +1,170 @@
+# grid_core.py
+# Grades de consulta pré-calculadas (resolução configurável, ex.: 0,1 p.p.).
+# Para entradas sobre a grade, a classificação vira indexação de array em
+# tempo constante, sem avaliar as regras. As grades podem ser gravadas em
+# .npy e reabertas como memória mapeada (np.load(mmap_mode="r")).
+#
+# - SUCS fino: código do grupo em função de (organico, LL, IP).
+# - TRB: a tabela 5-D (#10, #40, #200, LL, IP) a 0,1 p.p. seria inviável;
+#   como as regras só comparam cada grandeza com poucos limites, cada eixo
+#   é mapeado para uma faixa (valores indistinguíveis pelos predicados do
+#   conjunto de regras) e uma tabela pequena resolve o grupo.
+#   O IG usa uma grade 3-D só no trecho útil dos limitadores
+#   (#200 15–75, LL 40–60, IP 10–30): fora dele o valor é o da borda.
+
+import json
+import os
+
+import numpy as np
+
+from rules_core import TRB_PADRAO
+from sucs_core import SUCS_CODE, SUCS_GROUPS, classify_sucs_arrays
+from trb_core import group_index_arrays, trb_rule_codes
+
+
+def _eixo(inicio, fim, passo):
+    n = int(round((fim - inicio) / passo)) + 1
+    return inicio + passo * np.arange(n)
+
+
+class LookupGrid:
+    """Grade regular N-D: para cada eixo, início e passo; tabela com o valor em cada nó."""
+
+    def __init__(self, eixos, inicio, passo, tabela):
+        self.eixos = tuple(eixos)
+        self.inicio = tuple(float(v) for v in inicio)
+        self.passo = tuple(float(v) for v in passo)
+        self.tabela = tabela
+
+    def indices(self, *valores):
+        """Índices do nó mais próximo (valores fora da grade vão para a borda)."""
+        out = []
+        for v, i0, dx, n in zip(valores, self.inicio, self.passo, self.tabela.shape):
+            i = np.rint((np.nan_to_num(np.asarray(v, dtype=float)) - i0) / dx)
+            out.append(np.clip(i, 0, n - 1).astype(np.intp))
+        return tuple(out)
+
+    def lookup(self, *valores):
+        return self.tabela[self.indices(*valores)]
+
+    def save(self, path):
+        """Grava <path>.npy (tabela) e <path>.json (eixos)."""
+        np.save(path + ".npy", np.ascontiguousarray(self.tabela))
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"eixos": self.eixos, "inicio": self.inicio, "passo": self.passo}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        tabela = np.load(path + ".npy", mmap_mode="r" if mmap else None)
+        return cls(meta["eixos"], meta["inicio"], meta["passo"], tabela)
+
+
+# ---------------------------------------------------------------------------
+# SUCS — solos finos
+# ---------------------------------------------------------------------------
+
+def build_sucs_fine_grid(res=0.1, ll_max=200.0, ip_max=150.0, ruleset=None):
+    """Grade (organico, LL, IP) -> código SUCS para solos finos (< 50% retido na #200)."""
+    ll = _eixo(0.0, ll_max, res)[:, None]
+    ip = _eixo(0.0, ip_max, res)[None, :]
+    camadas = [classify_sucs_arrays(0.0, 0.0, 0.0, ll, ll - ip, organico=org, ruleset=ruleset)
+               for org in (False, True)]
+    return LookupGrid(("organico", "LL", "IP"), (0.0, 0.0, 0.0), (1.0, res, res),
+                      np.stack(camadas).astype(np.int8))
+
+
+def sucs_fine_lookup(grid, LL, LP, organico=False):
+    """Códigos SUCS (solos finos) via grade; LL/LP ausentes dão O? ou M?/C? como em classify_sucs."""
+    LL = np.asarray(LL, dtype=float); LP = np.asarray(LP, dtype=float)
+    organico = np.asarray(organico, dtype=bool)
+    IP = np.maximum(0.0, LL - LP)
+    codes = grid.lookup(organico, LL, IP).astype(np.int16)
+    codes = np.where(~organico & (np.isnan(LL) | np.isnan(LP)), SUCS_CODE["M?/C?"], codes)
+    return np.where(organico & np.isnan(LL), SUCS_CODE["O?"], codes)
+
+
+def plasticity_region_map(res=0.25, ll_max=100.0, ip_max=60.0):
+    """
+    Regiões ML/CL/MH/CH do gráfico de plasticidade (solo inorgânico), prontas
+    para imshow: retorna (tabela[IP, LL] de códigos, extent, rótulos).
+    """
+    g = build_sucs_fine_grid(res, ll_max, ip_max)
+    tabela = np.asarray(g.tabela[0]).T
+    extent = (-res / 2, ll_max + res / 2, -res / 2, ip_max + res / 2)
+    return tabela, extent, SUCS_GROUPS
+
+
+# ---------------------------------------------------------------------------
+# TRB
+# ---------------------------------------------------------------------------
+
+class TRBGrid:
+    """Consulta TRB por faixas: eixos 1-D (#10, #40, #200), grade 2-D (LL, IP), tabela de grupos e grade do IG."""
+
+    COMPONENTES = ("P10", "P40", "P200", "LLIP", "grupo", "IG")
+
+    def __init__(self, grades):
+        self.grades = grades
+
+    @classmethod
+    def build(cls, res=0.1, ll_max=200.0, ruleset=None):
+        rs = TRB_PADRAO if ruleset is None else ruleset
+        g = {}
+        reps = {}
+        for eixo in ("P10", "P40", "P200"):
+            v = _eixo(0.0, 100.0, res)
+            u, ids = np.unique(rs.signature({eixo: v}, (eixo,)), return_inverse=True)
+            _, primeiro = np.unique(ids, return_index=True)
+            g[eixo] = LookupGrid((eixo,), (0.0,), (res,), ids.astype(np.int8))
+            reps[eixo] = v[primeiro]
+
+        ll = _eixo(0.0, ll_max, res)[:, None]
+        ip = _eixo(0.0, ll_max, res)[None, :]
+        LL2, IP2 = np.broadcast_arrays(ll, ip)
+        u, ids = np.unique(rs.signature({"LL": LL2, "IP": IP2}, ("LL", "IP")).ravel(), return_inverse=True)
+        _, primeiro = np.unique(ids, return_index=True)
+        g["LLIP"] = LookupGrid(("LL", "IP"), (0.0, 0.0), (res, res),
+                               ids.reshape(LL2.shape).astype(np.int16))
+        rep_ll = LL2.ravel()[primeiro]
+        rep_ip = IP2.ravel()[primeiro]
+
+        a, b, c, d = np.meshgrid(reps["P10"], reps["P40"], reps["P200"], np.arange(len(u)), indexing="ij")
+        tabela = trb_rule_codes(a, b, c, rep_ll[d], rep_ip[d], rs)
+        g["grupo"] = LookupGrid(("P10", "P40", "P200", "LLIP"), (0, 0, 0, 0), (1, 1, 1, 1),
+                                tabela.astype(np.int8))
+
+        p200 = _eixo(15.0, 75.0, res)[:, None, None]
+        llg = _eixo(40.0, 60.0, res)[None, :, None]
+        ipg = _eixo(10.0, 30.0, res)[None, None, :]
+        g["IG"] = LookupGrid(("P200", "LL", "IP"), (15.0, 40.0, 10.0), (res, res, res),
+                             group_index_arrays(p200, llg, ipg).astype(np.int8))
+        return cls(g)
+
+    def lookup(self, p10, p40, p200, ll, lp, is_np=False):
+        """Mesma saída de classify_trb_arrays (códigos, -1 inválido; IG), por indexação."""
+        p10, p40, p200, ll, lp = np.broadcast_arrays(
+            *[np.asarray(x, dtype=float) for x in (p10, p40, p200, ll, lp)])
+        is_np = np.broadcast_to(np.asarray(is_np, dtype=bool), p10.shape)
+        with np.errstate(invalid="ignore"):
+            ll = np.where(is_np & np.isnan(ll), 0.0, ll)
+            ip = np.where(is_np, 0.0, np.maximum(0.0, ll - lp))
+            valid = ((0.0 <= p200) & (p200 <= p40) & (p40 <= p10) & (p10 <= 100.0)
+                     & ~np.isnan(ll) & ~np.isnan(ip))
+        g = self.grades
+        codes = g["grupo"].tabela[g["P10"].lookup(p10), g["P40"].lookup(p40),
+                                  g["P200"].lookup(p200), g["LLIP"].lookup(ll, ip)]
+        ig = g["IG"].lookup(p200, ll, ip)
+        return (np.where(valid, codes, -1).astype(np.int16),
+                np.where(valid, ig, 0).astype(np.int16))
+
+    def save(self, pasta):
+        os.makedirs(pasta, exist_ok=True)
+        for nome in self.COMPONENTES:
+            self.grades[nome].save(os.path.join(pasta, nome))
+
+    @classmethod
+    def load(cls, pasta, mmap=True):
+        return cls({nome: LookupGrid.load(os.path.join(pasta, nome), mmap)
+                    for nome in cls.COMPONENTES})
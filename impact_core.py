@@ -0,0 +1,211 @@
+# impact_core.py
+# Impacto de uma mudança de limite sem reclassificar o lote inteiro.
+#
+# Cada predicado das tabelas de decisão compara uma coordenada da amostra
+# (um campo, ou campo2 − campo) com um limite de *_LIMITES. Se o limite passa
+# de v0 para v1, só pode mudar de grupo quem tem essa coordenada entre v0 e v1.
+# ImpactIndex mantém cada coordenada ordenada (argsort, uma vez); a consulta é
+# uma busca binária por limite alterado, e só os candidatos são reclassificados
+# com compile_ruleset(sistema, limites_novos). A linha A (inclinação e LL de
+# origem) usa a coordenada em que o sinal de IP − incl·(LL − LL0) troca.
+# No TRB também se avalia IG_TIPICO_MAX (aviso de IG acima do típico).
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from rules_core import _SISTEMAS, compile_ruleset, sucs_fields, trb_fields
+from summary_core import KEY_ALIASES
+from trb_defs import IG_TIPICO_MAX
+
+_EPS = 1e-9
+
+
+def limit_coordinates(sistema):
+    """limite -> conjunto de coordenadas comparadas com ele: ('campo', c) ou ('dif', c2, c) = c2 − c."""
+    _, limites, predicados, _, _ = _SISTEMAS[sistema]
+    coords = {k: set() for k in limites}
+    for campo, _, valor in predicados.values():
+        if isinstance(valor, str):
+            coords[valor].add(("campo", campo))
+        elif isinstance(valor, tuple):
+            coords[valor[1]].add(("dif", valor[0], campo))
+    if sistema == "sucs":
+        coords["linha_A_incl"].add(("linha_A_incl",))
+        coords["linha_A_LL0"].add(("linha_A_LL0",))
+    return coords
+
+
+class _Sorted:
+    """Valores de uma coordenada em ordem (NaN fora) + posições originais."""
+
+    def __init__(self, valores):
+        v = np.asarray(valores, dtype=float)
+        ok = np.flatnonzero(~np.isnan(v))
+        o = ok[np.argsort(v[ok], kind="stable")]
+        self.ordem = o
+        self.valores = v[o]
+
+    def between(self, a, b):
+        lo, hi = min(a, b), max(a, b)
+        tol = _EPS * max(1.0, abs(lo), abs(hi))
+        i = np.searchsorted(self.valores, lo - tol, side="left")
+        j = np.searchsorted(self.valores, hi + tol, side="right")
+        return self.ordem[i:j]
+
+
+class ImpactResult:
+    def __init__(self, changes, n_candidatos, n_total, segundos):
+        self.changes = changes
+        self.n_candidatos = n_candidatos
+        self.n_total = n_total
+        self.segundos = segundos
+
+    def summary(self):
+        return pd.Series({"amostras": self.n_total, "candidatas": self.n_candidatos,
+                          "mudam": len(self.changes), "segundos": round(self.segundos, 4)}, dtype=object)
+
+    def transitions(self):
+        """Matriz grupo antes -> depois das amostras que mudam de grupo."""
+        c = self.changes
+        if c.empty:
+            return pd.DataFrame()
+        m = c["grupo_antes"] != c["grupo_depois"]
+        t = pd.crosstab(c.loc[m, "grupo_antes"].fillna("—"), c.loc[m, "grupo_depois"].fillna("—"))
+        t.index.name, t.columns.name = "antes", "depois"
+        return t
+
+
+class ImpactIndex:
+    """
+    Índice de um lote guardado para análise de mudanças de limite.
+
+    df:      lote de entrada (colunas do CSV-modelo SUCS ou TRB)
+    sistema: 'sucs' ou 'trb'
+    limites: limites vigentes (padrão: *_LIMITES)
+    """
+
+    def __init__(self, df, sistema, cols_map=None, limites=None):
+        from sucs_core import sucs_inputs_from_frame
+        from trb_core import group_index_arrays, trb_inputs_from_frame
+        if sistema not in ("sucs", "trb"):
+            raise ValueError(f"sistema desconhecido: {sistema!r} (use 'sucs' ou 'trb')")
+        self.sistema = sistema
+        self.rs = compile_ruleset(sistema, limites)
+        self.n = len(df)
+        self.valido = np.ones(self.n, dtype=bool)
+        if sistema == "sucs":
+            self.campos = sucs_fields(**sucs_inputs_from_frame(df))
+        else:
+            x = trb_inputs_from_frame(df, cols_map)
+            with np.errstate(invalid="ignore"):
+                ll = np.where(x["is_np"] & np.isnan(x["ll"]), 0.0, x["ll"])
+                ip = np.where(x["is_np"], 0.0, np.maximum(0.0, ll - x["lp"]))
+                self.valido = ((0.0 <= x["p200"]) & (x["p200"] <= x["p40"]) & (x["p40"] <= x["p10"])
+                               & (x["p10"] <= 100.0) & ~np.isnan(ll) & ~np.isnan(ip))
+                self.ig = np.where(self.valido, group_index_arrays(x["p200"], ll, ip), -1).astype(np.int16)
+            self.campos = trb_fields(x["p10"], x["p40"], x["p200"], ll, ip)
+        self.codigos = self._classificar(self.rs, np.arange(self.n))
+        self._coords = limit_coordinates(sistema)
+        self._idx = {}
+        self._ig_idx = None
+        self.chaves = {}
+        for k in ("projeto", "amostra"):
+            col = next((c for c in KEY_ALIASES[k] if c in df.columns), None)
+            if col:
+                self.chaves[k] = df[col].to_numpy()
+
+    # -- classificação de um subconjunto -----------------------------------
+    def _classificar(self, rs, pos):
+        sub = {k: v[pos] for k, v in self.campos.items()}
+        with np.errstate(invalid="ignore"):
+            regra = rs.trace(sub)
+        regra = np.where(self.valido[pos], regra, -1)
+        return rs.group_of_rule(regra).astype(np.int16)
+
+    # -- coordenadas ordenadas ---------------------------------------------
+    def _ordenado(self, coord, limites):
+        if coord[0] == "linha_A_incl":  # troca de sinal em incl = IP / (LL − LL0)
+            chave = (coord[0], limites["linha_A_LL0"])
+        elif coord[0] == "linha_A_LL0":  # troca de sinal em LL0 = LL − IP / incl
+            chave = (coord[0], limites["linha_A_incl"])
+        else:
+            chave = coord
+        if chave not in self._idx:
+            f = self.campos
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if coord[0] == "campo":
+                    v = f[coord[1]]
+                elif coord[0] == "dif":
+                    v = f[coord[1]] - f[coord[2]]
+                elif coord[0] == "linha_A_incl":
+                    d = f["LL"] - chave[1]
+                    v = np.where(d != 0, f["IP"] / d, np.nan)
+                else:
+                    v = f["LL"] - f["IP"] / chave[1] if chave[1] else np.full(self.n, np.nan)
+            self._idx[chave] = _Sorted(v)
+        return self._idx[chave]
+
+    def candidates(self, mudancas):
+        """Posições cujas coordenadas ficam entre o limite atual e o proposto."""
+        atual = dict(self.rs.limites)
+        partes = []
+        for k, novo in mudancas.items():
+            if k not in atual:
+                raise ValueError(f"Limite desconhecido para {self.sistema.upper()}: {k}")
+            novo = float(novo)
+            for coord in self._coords[k]:
+                partes.append(self._ordenado(coord, atual).between(atual[k], novo))
+            atual[k] = novo  # mudanças combinadas: percorre um limite de cada vez
+        return np.unique(np.concatenate(partes)) if partes else np.zeros(0, dtype=np.intp)
+
+    def _ig_candidates(self, ig_tipico_max):
+        """TRB: amostras do grupo cujo IG fica entre o típico atual e o proposto."""
+        from trb_core import TRB_CODE
+        if self._ig_idx is None:
+            chave = np.where(self.codigos >= 0, self.codigos.astype(np.int64) * 64 + self.ig, np.nan)
+            self._ig_idx = _Sorted(chave)
+        partes = []
+        for g, novo in ig_tipico_max.items():
+            if g not in TRB_CODE:
+                raise ValueError(f"grupo TRB desconhecido: {g!r}")
+            base = TRB_CODE[g] * 64
+            a, b = sorted((IG_TIPICO_MAX.get(g, 20), int(novo)))
+            partes.append(self._ig_idx.between(base + a + 1, base + b))
+        return np.concatenate(partes) if partes else np.zeros(0, dtype=np.intp)
+
+    # -- análise ------------------------------------------------------------
+    def impact(self, mudancas=None, ig_tipico_max=None):
+        """
+        Amostras que mudam com os limites propostos (ex.: {"linha_A_incl": 0.75})
+        e, no TRB, com outro IG típico máximo por grupo (ex.: {"A-4": 10}).
+        """
+        t0 = time.perf_counter()
+        mudancas = dict(mudancas or {})
+        ig_tipico_max = dict(ig_tipico_max or {})
+        if ig_tipico_max and self.sistema != "trb":
+            raise ValueError("ig_tipico_max só se aplica ao TRB")
+        cand = self.candidates(mudancas)
+        if ig_tipico_max:
+            cand = np.union1d(cand, self._ig_candidates(ig_tipico_max))
+        novo_rs = compile_ruleset(self.sistema, {**self.rs.limites, **mudancas})
+        antes = self.codigos[cand]
+        depois = self._classificar(novo_rs, cand)
+        grupos = np.asarray(self.rs.grupos + (None,), dtype=object)
+        out = {"linha": cand}
+        out.update({k: v[cand] for k, v in self.chaves.items()})
+        out["grupo_antes"] = grupos[antes]
+        out["grupo_depois"] = grupos[depois]
+        muda = antes != depois
+        if self.sistema == "trb":
+            ig = self.ig[cand]
+            # IG típico máximo por código de grupo (última posição: inválido)
+            tmax_antes = np.array([IG_TIPICO_MAX.get(g, 20) for g in self.rs.grupos] + [20])
+            tmax_depois = np.array([ig_tipico_max.get(g, IG_TIPICO_MAX.get(g, 20)) for g in self.rs.grupos] + [20])
+            out["IG"] = ig
+            out["aviso_antes"] = (antes >= 0) & (ig > tmax_antes[antes])
+            out["aviso_depois"] = (depois >= 0) & (ig > tmax_depois[depois])
+            muda |= out["aviso_antes"] != out["aviso_depois"]
+        changes = pd.DataFrame(out)[muda].reset_index(drop=True)
+        return ImpactResult(changes, len(cand), self.n, time.perf_counter() - t0)
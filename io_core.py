@@ -0,0 +1,50 @@
+# io_core.py
+# Leitura de lotes em pedaços (CSV, XLSX com todas as planilhas, Parquet),
+# usada pela linha de comando e pelos módulos que varrem arquivos grandes
+# (ex.: diff_core) sem carregar tudo na memória.
+
+import os
+
+import pandas as pd
+
+from xlsx_core import SHEET_COL, iter_sheet_chunks
+
+ENTRADAS = (".csv", ".xlsx", ".parquet")
+CHUNK_ROWS = 100_000
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS, usecols=None):
+    """
+    Lê CSV (separador , ou ;), XLSX (todas as planilhas) ou Parquet em pedaços.
+    usecols: colunas desejadas (lista ou função nome -> bool). CSV e Parquet só
+    leem essas colunas; no XLSX (lido linha a linha) as demais são descartadas
+    a cada pedaço. A coluna 'planilha' do XLSX entra se for pedida ou se
+    usecols=None.
+    """
+    manter = None
+    if usecols is not None:
+        manter = usecols if callable(usecols) else set(usecols).__contains__
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "rb") as f:
+            head = f.read(4096).decode("utf-8-sig", errors="ignore")
+        sep = ";" if head.count(";") > head.count(",") else ","
+        yield from pd.read_csv(path, sep=sep, encoding="utf-8-sig", chunksize=chunk_rows, usecols=manter)
+    elif ext == ".xlsx":
+        for nome, df in iter_sheet_chunks(path, chunk_rows=chunk_rows):
+            if manter is not None:
+                df = df[[c for c in df.columns if manter(c)]]
+            if manter is None or manter(SHEET_COL):
+                df.insert(0, SHEET_COL, nome)
+            yield df
+    elif ext == ".parquet":
+        try:
+            import pyarrow.parquet as pq  # type: ignore
+        except Exception as e:  # pragma: no cover
+            raise ImportError("Entrada Parquet requer 'pyarrow' (pip install pyarrow).") from e
+        arq = pq.ParquetFile(path)
+        cols = None if manter is None else [c for c in arq.schema_arrow.names if manter(c)]
+        for lote in arq.iter_batches(batch_size=chunk_rows, columns=cols):
+            yield lote.to_pandas()
+    else:
+        raise ValueError(f"entrada não suportada: {path} (use {', '.join(ENTRADAS)})")
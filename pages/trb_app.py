@@ -1,8 +1,18 @@
 # pages/trb_app.py
 import io
+import os
 import pandas as pd
 import streamlit as st
-from trb_core import classify_trb, classify_dataframe_trb, GROUP_DESC, ig_label
+from trb_core import (classify_trb, classify_dataframe_trb_safe, classify_dataframe_trb_vec, GROUP_DESC, ig_label,
+                      normalize_np)
+from summary_core import RunningSummary
+from xlsx_core import read_xlsx, classify_xlsx
+from view_core import ResultsView, show_results
+from export_core import XLSX_MAX_ROWS, ChunkWriter, normalized_xlsx_bytes
+from profile_core import StationIndex, has_location, show_profile
+from render_core import render_batch, row_report
+from telemetry_core import (JobTelemetry, Limits, estimate_upload, iter_upload_chunks, publish,
+                            publish_export, session_id, show_admin_panel)
 
 # Callback para marcar que o usuário interagiu com o checkbox NP
 def _np_mark_user_set():
@@ -113,7 +123,7 @@ with st.sidebar:
 
 
 col1, col2 = st.columns([2, 1])
-def build_results_xlsx_trb(df: pd.DataFrame) -> io.BytesIO:
+def build_results_xlsx_trb(df: pd.DataFrame, resumo: RunningSummary = None) -> io.BytesIO:
     preferred = ["Nome do projeto","Técnico responsável","Código da amostra",
                  "P10","P40","P200","LL","LP","IP_calc","Grupo_TRB","IG","Subleito","Materiais constituintes","aviso_ig","relatorio"]
     cols = [c for c in preferred if c in df.columns] + [c for c in df.columns if c not in preferred]
@@ -144,18 +154,15 @@ def build_results_xlsx_trb(df: pd.DataFrame) -> io.BytesIO:
                     "type": "text", "criteria": "not containing", "value": "", "format": warn
                 })
             if "Grupo_TRB" in df.columns and "IG" in df.columns:
-                res = (
-                    df.groupby("Grupo_TRB")["IG"]
-                      .agg(["count","min","max","mean"])
-                      .sort_index()
-                      .rename(columns={"count":"n","min":"IG_min","max":"IG_max","mean":"IG_médio"})
-                )
-                res.to_excel(xw, index=True, sheet_name="Resumo")
+                if resumo is None:
+                    resumo = RunningSummary().update(df)
+                res = resumo.trb_table()
+                res.to_excel(xw, index=False, sheet_name="Resumo")
                 ws2 = xw.sheets["Resumo"]
                 ws2.set_row(0, None, hdr)
-                ws2.set_column(0, 0, 14)
-                for c in range(1, 5):
-                    ws2.set_column(c, c, 12)
+                ws2.set_column(0, 1, 20)
+                ws2.set_column(2, 2, 14)
+                ws2.set_column(3, len(res.columns) - 1, 11)
     except Exception:
         with pd.ExcelWriter(mem, engine=_resolve_xlsx_engine()) as xw:
             df.to_excel(xw, index=False, sheet_name="Resultados")
@@ -224,40 +231,148 @@ st.divider()
 st.subheader("Lote (CSV / Excel)")
     
     
-up = st.file_uploader("Enviar CSV (ou Excel .xlsx)", type=["csv","xlsx"])
+up = st.file_uploader("Enviar CSV (ou Excel .xlsx — todas as planilhas)", type=["csv","xlsx"])
+paralelo = st.checkbox("Classificar as planilhas do XLSX em paralelo", value=False,
+                       help="Cada planilha (furo/trecho) vai para um processo; o resultado traz a coluna 'planilha'.")
+
+
+def _preparar_lote(df, normalizar_np=True):
+    """Normaliza NP (exceto se já classificado por planilha em xlsx_core) e injeta metadados da sidebar."""
+    if normalizar_np:
+        df["NP"] = normalize_np(df["NP"]) if "NP" in df.columns else False
+
+    for col, val in [("Nome do projeto", projeto), ("Técnico responsável", tecnico), ("Código da amostra", amostra)]:
+        if col not in df.columns and val:
+            df[col] = val
+    return df
+
+
+limites = Limits.from_env()
+show_admin_panel(limites)
 if up is not None:
     try:
         name = up.name.lower()
-        if name.endswith(".xlsx"):
-            df = pd.read_excel(up)
-        else:
-            head = up.getvalue()[:4096].decode("utf-8-sig", errors="ignore")
-            sep = ";" if head.count(";") > head.count(",") else ","
-            up.seek(0)
-            df = pd.read_csv(up, sep=sep, encoding="utf-8-sig")
-
-        # Normaliza NP e injeta metadados da sidebar (se não vierem)
-        if "NP" in df.columns:
-            df["NP"] = df["NP"].astype(str).str.strip().str.lower().map({
-                "true": True, "false": False, "1": True, "0": False,
-                "sim": True, "não": False, "nao": False, "np": True
-            }).fillna(False)
+        chave_view = (up.name, up.size, paralelo, projeto, tecnico, amostra)
+        tel = None
+        if st.session_state.get("view_trb_chave") == chave_view:
+            out = st.session_state["view_trb"].df  # já classificado nesta sessão
         else:
-            df["NP"] = False
+            dados = up.getvalue()
+            modo, motivo = limites.decide(*estimate_upload(up.name, dados))
+            tel = JobTelemetry("trb", session_id(st.session_state), up.name, up.size)
+            tel.set_mode(modo, motivo)
+            if modo == "rejeitar":
+                tel.dados["status"] = "rejeitado"
+                publish(tel, st.session_state, chave_view)
+                raise ValueError(f"Arquivo grande demais para o servidor ({motivo}). Use a linha de comando: "
+                                 "python cli.py classificar arquivo --sistema trb")
+            resumo_arquivo, csv_pedacos = None, None
+            with tel:
+                if modo == "pedacos":
+                    # Lote grande: motor vetorizado por pedaços, sem a coluna 'relatorio'
+                    # (o relatório de uma linha é gerado ao inspecioná-la). Resumo e CSV
+                    # são acumulados pedaço a pedaço; só a grade junta o resultado inteiro.
+                    st.info(f"Lote grande ({motivo}): classificação em pedaços de {limites.linhas_pedaco} linhas.")
+                    partes, resumo_arquivo, csv_buf = [], RunningSummary(), io.BytesIO()
+                    with ChunkWriter(csv_buf, "csv") as csv_w:
+                        for ch in tel.timed_chunks(iter_upload_chunks(up.name, dados, limites.linhas_pedaco)):
+                            with tel.etapa("classificacao"):
+                                r = classify_dataframe_trb_vec(_preparar_lote(ch))
+                            resumo_arquivo.update(r)
+                            csv_w.write(r)
+                            partes.append(r)
+                    csv_pedacos = csv_buf.getvalue()
+                    out = pd.concat(partes, ignore_index=True)
+                    del partes, csv_buf
+                elif name.endswith(".xlsx") and paralelo:
+                    with tel.etapa("classificacao"):  # leitura e classificação nos processos
+                        out = _preparar_lote(classify_xlsx(up, "trb", workers=os.cpu_count()), normalizar_np=False)
+                    tel.dados["linhas"] = len(out)
+                else:
+                    with tel.etapa("leitura"):
+                        if name.endswith(".xlsx"):
+                            df = read_xlsx(up)
+                        else:
+                            head = dados[:4096].decode("utf-8-sig", errors="ignore")
+                            sep = ";" if head.count(";") > head.count(",") else ","
+                            df = pd.read_csv(io.BytesIO(dados), sep=sep, encoding="utf-8-sig")
+                    tel.input(df)
+                    with tel.etapa("classificacao"):
+                        out = classify_dataframe_trb_safe(_preparar_lote(df))
+                    del df
+            tel.result(out)
 
-        for col, val in [("Nome do projeto", projeto), ("Técnico responsável", tecnico), ("Código da amostra", amostra)]:
-            if col not in df.columns and val:
-                df[col] = val
+            # Grade paginada no servidor; o relatório só é enviado para a linha inspecionada
+            st.session_state["view_trb"] = ResultsView(
+                out, "Grupo_TRB", ig_col="IG", aviso_col="aviso_ig",
+                report_fn=None if "relatorio" in out.columns else (lambda r: row_report("trb", r)))
+            st.session_state["view_trb_chave"] = chave_view
+            st.session_state.pop("export_trb", None)
+            st.session_state["csv_trb_pedacos"] = csv_pedacos
+            st.session_state["perfil_trb"] = StationIndex(out) if has_location(out) else None
+            # resumo só deste arquivo
+            st.session_state["resumo_trb_arquivo"] = resumo_arquivo or RunningSummary().update(out)
+        show_results(st.session_state["view_trb"], key="trb_lote", label_rotulo="Código da amostra")
+        if st.session_state.get("perfil_trb") is not None:
+            with st.expander("Trecho e perfil longitudinal (estaca × profundidade)"):
+                show_profile(st.session_state["perfil_trb"], out, key="trb_perfil", sistema="TRB")
 
-        out = classify_dataframe_trb(df)
-        st.dataframe(out, use_container_width=True)
+        # Resumo acumulado na sessão: cada arquivo novo só agrega as próprias linhas
+        resumo = st.session_state.setdefault("resumo_trb", RunningSummary())
+        vistos = st.session_state.setdefault("resumo_trb_vistos", set())
+        resumo_arquivo = st.session_state["resumo_trb_arquivo"]
+        if (up.name, up.size) not in vistos:
+            resumo.merge(resumo_arquivo)
+            vistos.add((up.name, up.size))
+        with st.expander(f"Resumo acumulado da sessão ({resumo.linhas} amostras, {len(vistos)} arquivo(s))"):
+            st.dataframe(resumo.trb_table(), use_container_width=True)
+            if st.button("Zerar resumo", key="zerar_resumo_trb"):
+                st.session_state["resumo_trb"] = RunningSummary()
+                st.session_state["resumo_trb_vistos"] = set()
 
-        xlsx_out = build_results_xlsx_trb(out)
-        st.download_button("Baixar resultados (XLSX)", data=xlsx_out,
-                           file_name="resultado_trb.xlsx",
-                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # Arquivos de exportação: gerados uma vez por arquivo enviado, não a cada rerun
+        export_trb = st.session_state.get("export_trb")
+        if export_trb is None or export_trb[0] != chave_view:
+            csv_bytes = st.session_state.pop("csv_trb_pedacos", None)  # já gravado pedaço a pedaço
+            if csv_bytes is None:
+                out_csv = io.BytesIO(); out.to_csv(out_csv, index=False, encoding="utf-8")
+                csv_bytes = out_csv.getvalue()
+                del out_csv
+            export_trb = (chave_view, {"csv": csv_bytes})
+            del csv_bytes
+            if len(out) <= XLSX_MAX_ROWS:  # acima disso o XLSX não comporta o lote
+                export_trb[1]["xlsx"] = build_results_xlsx_trb(out, resumo=resumo_arquivo).getvalue()
+                export_trb[1]["xlsx_normalizado"] = normalized_xlsx_bytes(out).getvalue()
+            st.session_state["export_trb"] = export_trb
+            if tel is not None:
+                for nome, dados in export_trb[1].items():
+                    tel.export(nome, dados)
+        if tel is not None:
+            publish(tel, st.session_state, chave_view)
+        if "xlsx" in export_trb[1]:
+            st.download_button("Baixar resultados (XLSX)", data=export_trb[1]["xlsx"],
+                               file_name="resultado_trb.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        st.download_button("Baixar resultados (CSV)", data=export_trb[1]["csv"], file_name="resultado_trb.csv",
+                           mime="text/csv")
+        if "xlsx_normalizado" in export_trb[1]:
+            st.download_button("Baixar resultados normalizados (XLSX: fatos + textos por grupo)",
+                               data=export_trb[1]["xlsx_normalizado"], file_name="resultado_trb_normalizado.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        else:
+            st.caption(f"XLSX indisponível: mais de {XLSX_MAX_ROWS:,} linhas. Use o CSV ou "
+                       "python cli.py classificar arquivo --sistema trb --formato parquet --normalizado")
 
-        out_csv = io.BytesIO(); out.to_csv(out_csv, index=False, encoding="utf-8"); out_csv.seek(0)
-        st.download_button("Baixar resultados (CSV)", data=out_csv, file_name="resultado_trb.csv", mime="text/csv")
+        # Gráfico + relatório PDF por amostra, gerados em paralelo e empacotados num ZIP
+        if st.button("Gerar gráficos e relatórios PDF por amostra (ZIP)", key="zip_trb_gerar"):
+            barra = st.progress(0.0)
+            zbuf = io.BytesIO()
+            render_batch(out, "trb", zbuf, progresso=lambda k, n: barra.progress(k / max(n, 1)))
+            st.session_state["zip_trb"] = (chave_view, zbuf.getvalue())
+            publish_export(st.session_state, chave_view, "zip_relatorios", zbuf)
+        zip_trb = st.session_state.get("zip_trb")
+        if zip_trb and zip_trb[0] == chave_view:
+            st.download_button("Baixar gráficos e relatórios (ZIP)", zip_trb[1],
+                               file_name="relatorios_trb.zip", mime="application/zip")
     except Exception as e:
         st.error(str(e))
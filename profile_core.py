@@ -0,0 +1,307 @@
+# profile_core.py
+# Localização das amostras ao longo do traçado: estaca e intervalo de
+# profundidade (colunas opcionais no lote). StationIndex ordena o resultado
+# por (projeto, estaca) uma vez; uma consulta "estacas 120–340, de 0,5 a 1,5 m"
+# faz duas buscas binárias por projeto (O(log n)) e filtra a profundidade só
+# nas amostras desse trecho. profile() agrega por segmento (e camada): nº de
+# amostras, contagem e grupo SUCS/TRB predominante, IG médio e máximo.
+
+import re
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from summary_core import KEY_ALIASES
+
+ESTACA_M = 20.0  # comprimento de uma estaca (m)
+
+# Colunas de localização aceitas
+LOCATION_ALIASES = {
+    "estaca": ("estaca", "Estaca"),
+    "km": ("km", "Km", "KM"),
+    "prof_ini": ("prof_ini", "Profundidade inicial (m)", "de_m"),
+    "prof_fim": ("prof_fim", "Profundidade final (m)", "ate_m"),
+    "profundidade": ("profundidade", "Profundidade (m)"),
+}
+
+_ESTACA_RE = re.compile(r"^\s*(?:e(?:st(?:aca)?)?\.?\s*)?(\d+(?:[.,]\d+)?)\s*(?:\+\s*(\d+(?:[.,]\d+)?))?\s*$",
+                        re.IGNORECASE)
+
+
+def _col(df, chave):
+    return next((c for c in LOCATION_ALIASES[chave] if c in df.columns), None)
+
+
+def parse_station(v):
+    """Estaca em unidades de estaca: 120, '120+10,00' (= 120,5), 'E120+10'; NaN se vazia ou inválida."""
+    if v is None:
+        return np.nan
+    if isinstance(v, (int, float, np.integer, np.floating)):
+        return float(v)
+    m = _ESTACA_RE.match(str(v))
+    if not m:
+        return np.nan
+    est = float(m.group(1).replace(",", "."))
+    if m.group(2):
+        est += float(m.group(2).replace(",", ".")) / ESTACA_M
+    return est
+
+
+def station_array(df):
+    """Estacas do lote (float; NaN sem localização) ou None se não houver coluna de estaca/km."""
+    col = _col(df, "estaca")
+    if col is not None:
+        s = df[col]
+        num = pd.to_numeric(s, errors="coerce")
+        texto = num.isna() & s.notna()
+        if texto.any():  # formato 'estaca+metros'
+            num = num.astype(float)
+            num[texto] = [parse_station(v) for v in s[texto]]
+        return num.to_numpy(dtype=float)
+    col = _col(df, "km")
+    if col is not None:
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float) * 1000.0 / ESTACA_M
+    return None
+
+
+def depth_arrays(df):
+    """(prof_ini, prof_fim) em m. Só 'profundidade': intervalo de um ponto. Sem colunas: NaN."""
+    num = lambda c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+    ci, cf, cp = _col(df, "prof_ini"), _col(df, "prof_fim"), _col(df, "profundidade")
+    if ci is not None or cf is not None:
+        ini = num(ci) if ci is not None else num(cf)
+        fim = num(cf) if cf is not None else ini
+        return np.fmin(ini, fim), np.fmax(ini, fim)
+    if cp is not None:
+        p = num(cp)
+        return p, p.copy()
+    nan = np.full(len(df), np.nan)
+    return nan, nan.copy()
+
+
+def has_location(df):
+    return station_array(df.iloc[:0]) is not None
+
+
+def _groups(res):
+    """{'SUCS': (códigos int16, rótulos), 'TRB': ...} a partir de grupo/Grupo_TRB ou cod_SUCS/cod_TRB."""
+    from sucs_core import SUCS_CODE, SUCS_GROUPS
+    from trb_core import TRB_CODE, TRB_GROUPS
+    out = {}
+    for nome, col, cod, mapa, rotulos in (("SUCS", "grupo", "cod_SUCS", SUCS_CODE, SUCS_GROUPS),
+                                          ("TRB", "Grupo_TRB", "cod_TRB", TRB_CODE, TRB_GROUPS)):
+        if col in res.columns:
+            out[nome] = (res[col].map(mapa).fillna(-1).to_numpy(dtype=np.int16), tuple(rotulos))
+        elif cod in res.columns:
+            out[nome] = (pd.to_numeric(res[cod], errors="coerce").fillna(-1).to_numpy(dtype=np.int16),
+                         tuple(rotulos))
+    return out
+
+
+class StationIndex:
+    """
+    Índice por projeto e estaca de um resultado classificado (SUCS e/ou TRB).
+
+    res: resultado com coluna de estaca (ou km) e, opcionalmente, profundidade
+         (prof_ini/prof_fim ou profundidade); linhas sem estaca ficam de fora
+         e são contadas em sem_local.
+    """
+
+    def __init__(self, res):
+        est = station_array(res)
+        if est is None:
+            raise ValueError("o lote não tem coluna de estaca (estaca ou km)")
+        ini, fim = depth_arrays(res)
+        pcol = next((c for c in KEY_ALIASES["projeto"] if c in res.columns), None)
+        proj = res[pcol].fillna("").astype(str).to_numpy() if pcol else np.full(len(res), "", dtype=object)
+        ok = np.flatnonzero(~np.isnan(est))
+        self.n = len(res)
+        self.sem_local = self.n - len(ok)
+        codigos, projetos = pd.factorize(proj[ok], sort=True)
+        self.projetos = pd.Index(projetos)
+        ordem = np.lexsort((est[ok], codigos))
+        self.linha = ok[ordem]  # posição no resultado original
+        self.estaca = est[self.linha]
+        self.prof_ini = ini[self.linha]
+        self.prof_fim = fim[self.linha]
+        self._proj = codigos[ordem]
+        self._limites = np.searchsorted(self._proj, np.arange(len(self.projetos) + 1))
+        self.grupos = {k: (c[self.linha], r) for k, (c, r) in _groups(res).items()}
+        self.ig = (pd.to_numeric(res["IG"], errors="coerce").to_numpy(dtype=float)[self.linha]
+                   if "IG" in res.columns else None)
+
+    def __len__(self):
+        return len(self.linha)
+
+    def _faixas(self, projeto, estaca_min, estaca_max):
+        if projeto is None:
+            ps = range(len(self.projetos))
+        else:
+            p = self.projetos.get_indexer([str(projeto)])[0]
+            ps = [p] if p >= 0 else []
+        a = -np.inf if estaca_min is None else parse_station(estaca_min)
+        b = np.inf if estaca_max is None else parse_station(estaca_max)
+        if np.isnan(a) or np.isnan(b):
+            raise ValueError(f"estaca inválida: {estaca_min!r} / {estaca_max!r} (use 120 ou 120+10,00)")
+        for p in ps:
+            lo, hi = self._limites[p], self._limites[p + 1]
+            bloco = self.estaca[lo:hi]
+            yield lo + np.searchsorted(bloco, a, side="left"), lo + np.searchsorted(bloco, b, side="right")
+
+    def positions(self, estaca_min=None, estaca_max=None, prof_min=None, prof_max=None, projeto=None):
+        """
+        Posições no índice (ordem projeto/estaca) das amostras com estaca em
+        [estaca_min, estaca_max] e intervalo de profundidade que cruza
+        [prof_min, prof_max]. Sem profundidade informada a amostra só entra se
+        a consulta não filtrar profundidade.
+        """
+        partes = [np.arange(i, j) for i, j in self._faixas(projeto, estaca_min, estaca_max) if j > i]
+        pos = np.concatenate(partes) if partes else np.zeros(0, dtype=np.intp)
+        if prof_min is not None or prof_max is not None:
+            lo = -np.inf if prof_min is None else float(prof_min)
+            hi = np.inf if prof_max is None else float(prof_max)
+            with np.errstate(invalid="ignore"):
+                pos = pos[(self.prof_ini[pos] <= hi) & (self.prof_fim[pos] >= lo)]
+        return pos
+
+    def query(self, res, estaca_min=None, estaca_max=None, prof_min=None, prof_max=None, projeto=None):
+        """Linhas de 'res' (o resultado indexado) no trecho e faixa de profundidade pedidos, por estaca."""
+        pos = self.positions(estaca_min, estaca_max, prof_min, prof_max, projeto)
+        return res.iloc[self.linha[pos]]
+
+    def profile(self, segmento=10.0, camadas=None, estaca_min=None, estaca_max=None,
+                prof_min=None, prof_max=None, projeto=None):
+        """
+        Perfil longitudinal: uma linha por projeto × segmento de 'segmento'
+        estacas (alinhados a múltiplos de 'segmento') e, com camadas=[0, 0.5,
+        1.5, ...] (m), por camada do ponto médio da profundidade. Colunas: n,
+        contagem por grupo (SUCS_CL, TRB_A-2-4, ...), grupo predominante e sua
+        fração, e IG médio/máximo quando houver TRB.
+        """
+        if segmento <= 0:
+            raise ValueError("segmento deve ser positivo")
+        pos = self.positions(estaca_min, estaca_max, prof_min, prof_max, projeto)
+        seg = np.floor(self.estaca[pos] / segmento) * segmento
+        chave = {"projeto": np.asarray(self.projetos)[self._proj[pos]], "estaca_ini": seg}
+        por = ["projeto", "estaca_ini"]
+        if camadas is not None:
+            bordas = np.asarray(sorted(camadas), dtype=float)
+            if len(bordas) < 2:
+                raise ValueError("camadas precisa de ao menos duas profundidades")
+            meio = (self.prof_ini[pos] + self.prof_fim[pos]) / 2
+            k = np.searchsorted(bordas, meio, side="right") - 1
+            fora = np.isnan(meio) | (k < 0) | (k >= len(bordas) - 1)
+            rot = np.array([f"{bordas[i]:g}–{bordas[i + 1]:g} m" for i in range(len(bordas) - 1)] + ["—"],
+                           dtype=object)
+            chave["camada"] = pd.Categorical.from_codes(np.where(fora, len(bordas) - 1, k), rot)
+            por.append("camada")
+        base = pd.DataFrame(chave)
+        if base.empty:
+            return pd.DataFrame(columns=por[:2] + ["estaca_fim"] + por[2:] + ["n"])
+        gb = base.groupby(por, sort=True, observed=True)
+        gid = gb.ngroup().to_numpy()
+        out = gb.size().rename("n").to_frame()
+        ng = len(out)
+        for nome, (cod, rotulos) in self.grupos.items():
+            k = len(rotulos)  # código -1 (sem grupo) vai para a última coluna
+            c = cod[pos].astype(np.int64)
+            cont = np.bincount(gid * (k + 1) + np.where(c < 0, k, c), minlength=ng * (k + 1)).reshape(ng, k + 1)
+            usados = np.flatnonzero(cont.any(axis=0))
+            for j in usados:
+                out[f"{nome}_{rotulos[j] if j < k else '—'}"] = cont[:, j]
+            validos = cont[:, :k]
+            dom, tot = validos.argmax(axis=1), validos.max(axis=1)
+            out[f"{nome}_predominante"] = np.where(tot > 0, np.asarray(rotulos, dtype=object)[dom], "")
+            out[f"{nome}_fracao"] = np.round(tot / out["n"].to_numpy(), 3)
+        if self.ig is not None:
+            ig = self.ig[pos]
+            ok = ~np.isnan(ig)
+            soma = np.bincount(gid[ok], weights=ig[ok], minlength=ng)
+            cont = np.bincount(gid[ok], minlength=ng)
+            igmax = np.full(ng, -np.inf)
+            np.maximum.at(igmax, gid[ok], ig[ok])
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out["IG_medio"] = np.round(soma / cont, 2)
+            out["IG_max"] = np.where(cont > 0, igmax, np.nan)
+        out = out.reset_index()
+        out.insert(2, "estaca_fim", out["estaca_ini"] + segmento)
+        return out
+
+
+def plot_profile(ax, perfil, sistema="SUCS"):
+    """Barras empilhadas da fração de cada grupo por segmento (e IG médio no eixo secundário, se houver)."""
+    pref = f"{sistema}_"
+    cols = [c for c in perfil.columns if c.startswith(pref) and c not in (f"{pref}predominante", f"{pref}fracao")]
+    if not cols or perfil.empty:
+        return ax
+    x = perfil["estaca_ini"].to_numpy(dtype=float)
+    larg = float(perfil["estaca_fim"].iloc[0] - perfil["estaca_ini"].iloc[0])
+    frac = perfil[cols].to_numpy(dtype=float) / perfil["n"].to_numpy(dtype=float)[:, None]
+    fundo = np.zeros(len(perfil))
+    cores = matplotlib.colormaps["tab20"]
+    for j, c in enumerate(cols):
+        if frac[:, j].any():
+            ax.bar(x, frac[:, j], width=larg, bottom=fundo, align="edge", label=c[len(pref):],
+                   color="#bbbbbb" if c.endswith("_—") else cores(j % 20))
+            fundo += frac[:, j]
+    ax.set_xlabel("Estaca")
+    ax.set_ylabel(f"Fração das amostras ({sistema})")
+    ax.set_ylim(0, 1)
+    ax.legend(fontsize=7, ncol=4, loc="upper left", bbox_to_anchor=(0, -0.15))
+    if "IG_medio" in perfil.columns and sistema == "TRB":
+        ax2 = ax.twinx()
+        ax2.plot(x + larg / 2, perfil["IG_medio"], "k.-", label="IG médio")
+        ax2.set_ylabel("IG médio")
+        ax2.set_ylim(0, max(1.0, float(np.nanmax(perfil["IG_medio"].to_numpy(dtype=float), initial=0)) * 1.1))
+    return ax
+
+
+def show_profile(ix, res, key, sistema="SUCS"):
+    """Consulta por trecho/profundidade e perfil longitudinal (Streamlit)."""
+    import streamlit as st
+    from matplotlib.figure import Figure
+
+    if len(ix) == 0:
+        st.caption("Nenhuma amostra com estaca válida.")
+        return
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        projetos = list(ix.projetos)
+        projeto = st.selectbox("Projeto", ["(todos)"] + projetos, key=f"{key}_proj") if len(projetos) > 1 else None
+        projeto = None if projeto == "(todos)" else projeto
+    e0, e1 = float(np.floor(ix.estaca.min())), float(np.ceil(ix.estaca.max()))
+    with c2:
+        est_min = st.number_input("Estaca inicial", value=e0, key=f"{key}_e0")
+        est_max = st.number_input("Estaca final", value=e1, key=f"{key}_e1")
+    tem_prof = not np.isnan(ix.prof_ini).all()
+    prof_min = prof_max = None
+    with c3:
+        if tem_prof:
+            p0, p1 = float(np.nanmin(ix.prof_ini)), float(np.nanmax(ix.prof_fim))
+            prof_min = st.number_input("Profundidade de (m)", value=p0, step=0.1, key=f"{key}_p0")
+            prof_max = st.number_input("até (m)", value=p1, step=0.1, key=f"{key}_p1")
+            if (prof_min, prof_max) == (p0, p1):
+                prof_min = prof_max = None  # faixa completa = sem filtro (mantém linhas sem profundidade)
+    with c4:
+        segmento = st.number_input("Segmento (estacas)", 1.0, value=max(1.0, float(np.ceil((e1 - e0) / 40))),
+                                   key=f"{key}_seg")
+        camadas = st.text_input("Camadas (m, ex.: 0, 0.5, 1.5)", key=f"{key}_cam") if tem_prof else ""
+    try:
+        bordas = [float(v) for v in camadas.replace(";", ",").split(",") if v.strip()] or None
+        trecho = ix.query(res, est_min, est_max, prof_min, prof_max, projeto)
+        perfil = ix.profile(segmento, bordas, est_min, est_max, prof_min, prof_max, projeto)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.caption(f"{len(trecho)} amostras no trecho ({ix.sem_local} sem estaca no lote)")
+    st.dataframe(trecho.drop(columns=[c for c in ("relatorio",) if c in trecho.columns]).head(1000),
+                 use_container_width=True)
+    if bordas is None and not perfil.empty and (projeto is not None or len(ix.projetos) == 1):
+        fig = Figure(figsize=(9, 4))
+        plot_profile(fig.add_subplot(111), perfil, sistema)
+        fig.tight_layout()
+        st.pyplot(fig)
+    st.dataframe(perfil, use_container_width=True)
+    st.download_button("Baixar perfil (CSV)", perfil.to_csv(index=False), file_name=f"perfil_{sistema.lower()}.csv",
+                       key=f"{key}_dl")
@@ -0,0 +1,244 @@
+# render_core.py
+# Gráfico de plasticidade e relatório em PDF por amostra, em lote.
+#
+# Os elementos fixos do gráfico (regiões ML/CL/MH/CH, linha A, guias) são
+# desenhados uma única vez por processo; para cada amostra só o ponto, os
+# limites dos eixos e o texto mudam antes de salvar. As amostras são divididas
+# entre processos (cada um com sua figura) e os arquivos são gravados num ZIP
+# à medida que ficam prontos.
+
+import io
+import os
+import re
+import textwrap
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.colors import ListedColormap
+from matplotlib.figure import Figure
+
+from grid_core import plasticity_region_map
+from sucs_core import LINE_A_LL0, LINE_A_SLOPE
+
+# Cores das regiões do gráfico de plasticidade (solo inorgânico)
+REGION_COLORS = {"ML": "#fde0c5", "CL": "#c6dbef", "MH": "#fdd0a2", "CH": "#9ecae1"}
+REGION_LABELS = {"ML": (40, 3), "CL": (40, 22), "MH": (55, 5), "CH": (55, 32)}
+IP_GUIDE = 5.0
+_LL_MAX, _IP_MAX = 200.0, 150.0
+
+
+def region_map():
+    """Grade de regiões usada no sombreamento (mesma resolução do app)."""
+    return plasticity_region_map(res=0.25, ll_max=_LL_MAX, ip_max=_IP_MAX)
+
+
+class PlasticityChart:
+    """
+    Gráfico de plasticidade com os elementos fixos desenhados uma vez;
+    update(LL, IP) só move o ponto e ajusta os eixos.
+    """
+
+    def __init__(self, ax, regioes=None, titulo="Gráfico de Plasticidade (linha A e ponto da amostra)"):
+        self.ax = ax
+        reg, extent, rotulos = regioes if regioes is not None else region_map()
+        ax.imshow(reg, extent=extent, origin="lower", aspect="auto", interpolation="nearest",
+                  cmap=ListedColormap([REGION_COLORS.get(g, "white") for g in rotulos]),
+                  vmin=0, vmax=len(rotulos) - 1, alpha=0.6, zorder=0)
+        for g, (x, y) in REGION_LABELS.items():
+            ax.text(x, y, g, ha="center", va="center", fontsize=9, color="#555555")
+        # Linha A (IP = 0,73*(LL-20)) — desenhada desde LL=0
+        ax.plot([0, _LL_MAX], [LINE_A_SLOPE * (0 - LINE_A_LL0), LINE_A_SLOPE * (_LL_MAX - LINE_A_LL0)])
+        # Segmento horizontal tracejado: IP = 5 até intersectar a linha A
+        ax.hlines(IP_GUIDE, 0, IP_GUIDE / LINE_A_SLOPE + LINE_A_LL0, linestyles="--", linewidth=1)
+        ax.axvline(30, linestyle="--", linewidth=1)
+        ax.axvline(50, linestyle="--", linewidth=1)
+        self._rot30 = ax.text(30, 0, "LL=30", rotation=90, va="top", ha="right", fontsize=9)
+        self._rot50 = ax.text(50, 0, "LL=50", rotation=90, va="top", ha="right", fontsize=9)
+        # ponto acima de tudo: a imagem é a mesma com ou sem fundo em cache
+        (self._ponto,) = ax.plot([], [], "o", color="C1", zorder=4)
+        ax.set_xlabel("LL")
+        ax.set_ylabel("IP")
+        ax.set_title(titulo)
+        self._fundos = {}  # (x_max, y_max) -> fundo renderizado (ver png)
+
+    @staticmethod
+    def _limites(LL, IP):
+        x_max = max(60, LL + 10)
+        return x_max, max(40, IP + 10, LINE_A_SLOPE * (x_max - LINE_A_LL0) + 5, IP_GUIDE + 10)
+
+    def _eixos(self, x_max, y_max):
+        self.ax.set_xlim(0, x_max)
+        self.ax.set_ylim(0, y_max)
+        self._rot30.set_y(y_max * 0.95)
+        self._rot50.set_y(y_max * 0.95)
+
+    def update(self, LL, IP):
+        LL, IP = _num(LL), _num(IP)
+        self._eixos(*self._limites(LL, IP))
+        self._ponto.set_data([LL], [IP])
+        return self
+
+    def png(self, LL, IP):
+        """
+        PNG da amostra. O fundo (tudo menos o ponto) é renderizado uma vez por
+        par de limites de eixo e reaproveitado; a maioria das amostras (LL < 50)
+        cai no mesmo enquadramento 60 × 40.
+        """
+        from PIL import Image
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = self.ax.figure
+        canvas = fig.canvas if isinstance(fig.canvas, FigureCanvasAgg) else FigureCanvasAgg(fig)
+        LL, IP = _num(LL), _num(IP)
+        chave = tuple(round(v, 6) for v in self._limites(LL, IP))
+        self._eixos(*chave)  # o ponto é transformado pelos limites atuais
+        fundo = self._fundos.get(chave)
+        if fundo is None:
+            if len(self._fundos) >= 64:
+                self._fundos.clear()
+            self._ponto.set_visible(False)
+            canvas.draw()
+            self._ponto.set_visible(True)
+            fundo = self._fundos[chave] = canvas.copy_from_bbox(fig.bbox)
+        else:
+            canvas.restore_region(fundo)
+        self._ponto.set_data([LL], [IP])
+        self.ax.draw_artist(self._ponto)
+        w, h = canvas.get_width_height()
+        buf = io.BytesIO()
+        Image.frombuffer("RGBA", (w, h), canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(buf, format="PNG")
+        return buf.getvalue()
+
+
+def _num(v):
+    return 0.0 if v is None or v != v else float(v)
+
+
+class ReportPage:
+    """Página A4: relatório em texto (monoespaçado) em cima, gráfico de plasticidade embaixo."""
+
+    def __init__(self, regioes=None, largura=95, max_linhas=45):
+        self.fig = Figure(figsize=(8.27, 11.69))
+        self.largura = largura
+        self.max_linhas = max_linhas
+        ax_txt = self.fig.add_axes([0.06, 0.45, 0.88, 0.52])
+        ax_txt.axis("off")
+        self._texto = ax_txt.text(0, 1, "", va="top", ha="left", family="monospace", fontsize=8)
+        self.chart = PlasticityChart(self.fig.add_axes([0.1, 0.05, 0.84, 0.36]), regioes)
+
+    def render(self, relatorio, LL, IP):
+        linhas = []
+        for ln in str(relatorio or "").splitlines():
+            linhas += textwrap.wrap(ln, self.largura) or [""]
+        if len(linhas) > self.max_linhas:
+            linhas = linhas[:self.max_linhas - 1] + ["[…]"]
+        self._texto.set_text("\n".join(linhas))
+        self.chart.update(LL, IP)
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format="pdf")
+        return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Lote
+# ---------------------------------------------------------------------------
+
+_W = {}  # figuras reaproveitadas dentro de cada processo
+
+
+def _init_worker():
+    regioes = region_map()
+    fig = Figure(figsize=(6, 4.5), dpi=110)
+    _W["chart"] = PlasticityChart(fig.add_subplot(111), regioes)
+    fig.tight_layout()
+    _W["page"] = ReportPage(regioes)
+
+
+def row_report(sistema, row):
+    """Relatório de uma linha sem a coluna 'relatorio' (saída do motor vetorizado)."""
+    import pandas as pd
+    if sistema == "sucs":
+        from sucs_core import classify_dataframe
+        return classify_dataframe(pd.DataFrame([row]))["relatorio"].iloc[0]
+    from trb_core import classify_dataframe_trb, normalize_np
+    df = pd.DataFrame([row])
+    if "NP" in df.columns:
+        df["NP"] = normalize_np(df["NP"])
+    return classify_dataframe_trb(df)["relatorio"].iloc[0]
+
+
+def _render(tarefa):
+    nome, sistema, LL, IP, relatorio, row, formatos = tarefa
+    if not _W:
+        _init_worker()
+    out = []
+    if "png" in formatos:
+        out.append((f"graficos/{nome}.png", _W["chart"].png(LL, IP)))
+    if "pdf" in formatos:
+        if relatorio is None:
+            try:
+                relatorio = row_report(sistema, row)
+            except Exception as e:  # amostra inválida: o PDF registra o motivo
+                relatorio = f"Não foi possível gerar o relatório: {e}"
+        out.append((f"relatorios/{nome}.pdf", _W["page"].render(relatorio, LL, IP)))
+    return out
+
+
+def _nome(i, row):
+    cod = row.get("amostra", row.get("Código da amostra"))
+    cod = "" if cod is None or cod != cod else re.sub(r"[^\w.-]+", "_", str(cod)).strip("_")
+    return f"{i + 1:05d}" + (f"_{cod}" if cod else "")
+
+
+def sample_tasks(res, sistema, formatos=("png", "pdf")):
+    """Uma tarefa por linha do resultado: nome do arquivo, LL, IP e relatório (se já houver)."""
+    if sistema not in ("sucs", "trb"):
+        raise ValueError(f"sistema desconhecido: {sistema!r} (use 'sucs' ou 'trb')")
+    import pandas as pd
+    num = lambda c: pd.to_numeric(res[c], errors="coerce").to_numpy(dtype=float) if c in res.columns \
+        else np.full(len(res), np.nan)
+    LL = num("LL")
+    IP = num("IP_calc") if "IP_calc" in res.columns else np.maximum(0.0, LL - num("LP"))
+    tem_rel = "relatorio" in res.columns
+    for i, row in enumerate(res.to_dict("records")):
+        rel = row.get("relatorio") if tem_rel else None
+        yield (_nome(i, row), sistema, LL[i], IP[i], rel if isinstance(rel, str) else None,
+               None if isinstance(rel, str) else row, tuple(formatos))
+
+
+def render_batch(res, sistema, destino, workers=None, formatos=("png", "pdf"), chunksize=8, progresso=None):
+    """
+    Gera, para cada linha de 'res', o gráfico de plasticidade (PNG) e o
+    relatório com gráfico (PDF) e grava tudo no ZIP 'destino' (caminho ou
+    arquivo aberto). workers=None usa todos os núcleos; progresso(feitas, total)
+    é chamado a cada amostra gravada. Retorna o nº de arquivos no ZIP.
+    """
+    workers = workers or os.cpu_count() or 1
+    tarefas = sample_tasks(res, sistema, formatos)
+    cont = {"arquivos": 0, "amostras": 0, "total": len(res)}
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_STORED) as zf:
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+                # janelas de tarefas: memória limitada mesmo em lotes grandes
+                janela = workers * chunksize * 4
+                bloco = []
+                for t in tarefas:
+                    bloco.append(t)
+                    if len(bloco) == janela:
+                        _gravar(zf, ex.map(_render, bloco, chunksize=chunksize), cont, progresso)
+                        bloco = []
+                if bloco:
+                    _gravar(zf, ex.map(_render, bloco, chunksize=chunksize), cont, progresso)
+        else:
+            _gravar(zf, map(_render, tarefas), cont, progresso)
+    return cont["arquivos"]
+
+
+def _gravar(zf, resultados, cont, progresso):
+    for arquivos in resultados:
+        for nome, dados in arquivos:
+            zf.writestr(nome, dados)
+        cont["arquivos"] += len(arquivos)
+        cont["amostras"] += 1
+        if progresso is not None:
+            progresso(cont["amostras"], cont["total"])
@@ -0,0 +1,257 @@
+# rules_core.py
+# Compila as tabelas de regras de rules_defs.py num avaliador rápido.
+#
+# Cada predicado distinto (campo, operador, valor já resolvido) vira um bit;
+# a tabela de decisão (primeira regra verdadeira) é pré-calculada para todas
+# as combinações de bits. Classificar um lote custa então uma comparação por
+# predicado e uma indexação — independente do número de regras. Vários
+# conjuntos de regras sobre o mesmo lote compartilham os predicados iguais.
+#
+# O traço de decisão de cada linha é o índice da regra acionada (int16):
+# filtra-se/agrega-se por caminho de decisão sem texto, e a descrição
+# legível é gerada só quando pedida (describe/describe_codes).
+
+import operator
+
+import numpy as np
+
+from rules_defs import (
+    SUCS_GROUPS, SUCS_LIMITES, SUCS_PREDICADOS, SUCS_PREDICADOS_TEXTO, SUCS_REGRAS,
+    TRB_GROUPS, TRB_LIMITES, TRB_PREDICADOS, TRB_PREDICADOS_TEXTO, TRB_REGRAS,
+)
+
+_OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq}
+
+# Campos derivados que dependem de limites: nome -> (campos-base, limites, função)
+_DERIVADOS = {
+    "IP_sobre_A": (("IP", "LL"), ("linha_A_incl", "linha_A_LL0"),
+                   lambda f, incl, ll0: f["IP"] - incl * (f["LL"] - ll0)),
+}
+
+_SISTEMAS = {
+    "sucs": (SUCS_GROUPS, SUCS_LIMITES, SUCS_PREDICADOS, SUCS_REGRAS, SUCS_PREDICADOS_TEXTO),
+    "trb": (TRB_GROUPS, TRB_LIMITES, TRB_PREDICADOS, TRB_REGRAS, TRB_PREDICADOS_TEXTO),
+}
+
+# Acima disso a tabela 2^k ficaria grande demais; avalia-se regra a regra
+_LUT_MAX_BITS = 22
+
+
+def sucs_fields(pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse,
+                LL, LP, Cu=np.nan, Cc=np.nan, organico=False, turfa=False):
+    """Campos usados pelos predicados SUCS (NaN = não informado)."""
+    ret, pg, ps, LL, LP, Cu, Cc = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in
+          (pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse, LL, LP, Cu, Cc)])
+    return {
+        "ret200": ret,
+        "finos": 100.0 - ret,
+        "areia_predominante": ((pg + ps) > 0) & (pg < ps),
+        "LL": LL,
+        "IP": np.maximum(0.0, LL - LP),
+        "Cu": Cu,
+        "Cc": Cc,
+        "organico": np.broadcast_to(np.asarray(organico, dtype=bool), ret.shape),
+        "turfa": np.broadcast_to(np.asarray(turfa, dtype=bool), ret.shape),
+    }
+
+
+def trb_fields(p10, p40, p200, ll, ip):
+    """Campos usados pelos predicados TRB (IP já com NP = 0)."""
+    p10, p40, p200, ll, ip = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (p10, p40, p200, ll, ip)])
+    return {"P10": p10, "P40": p40, "P200": p200, "LL": ll, "IP": ip}
+
+
+class CompiledRuleSet:
+    """Conjunto de regras compilado (um sistema + um jogo de limites)."""
+
+    def __init__(self, sistema, nome, grupos, limites, predicados, regras, textos=None):
+        self.sistema = sistema
+        self.nome = nome
+        self.grupos = tuple(grupos)
+        self.limites = dict(limites)
+        self.textos = dict(textos or {})
+        self.tabela = [(g, tuple(preds)) for g, preds in regras]
+        code = {g: i for i, g in enumerate(self.grupos)}
+
+        self.chaves = []  # predicados resolvidos, na ordem dos bits
+        pos = {}
+
+        def bit(nome_pred):
+            chave = self._resolver(predicados[nome_pred])
+            if chave not in pos:
+                pos[chave] = len(self.chaves)
+                self.chaves.append(chave)
+            return pos[chave]
+
+        self.regras = []
+        for grupo, preds in regras:
+            conds = tuple((bit(p.lstrip("!")), p.startswith("!")) for p in preds)
+            self.regras.append((code[grupo], conds))
+
+        # Código do grupo por regra (com -1 ao final para "nenhuma regra")
+        self._grupo_da_regra = np.array([c for c, _ in self.regras] + [-1], dtype=np.int16)
+
+        self._lut = None
+        k = len(self.chaves)
+        if k <= _LUT_MAX_BITS:
+            padroes = np.arange(1 << k, dtype=np.uint32)
+            lut = np.full(1 << k, -1, dtype=np.int16)
+            livre = np.ones(1 << k, dtype=bool)
+            for r, (_, conds) in enumerate(self.regras):
+                m = livre.copy()
+                for i, neg in conds:
+                    b = ((padroes >> np.uint32(i)) & np.uint32(1)).astype(bool)
+                    m &= ~b if neg else b
+                lut[m] = r
+                livre &= ~m
+            self._lut = lut
+
+    def _resolver(self, pred):
+        campo, op, valor = pred
+        if campo in _DERIVADOS:
+            campo = (campo,) + tuple(self.limites[l] for l in _DERIVADOS[campo][1])
+        if isinstance(valor, str):
+            valor = self.limites[valor]
+        elif isinstance(valor, tuple):
+            valor = (valor[0], self.limites[valor[1]])
+        elif valor is not None:
+            valor = float(valor) if not isinstance(valor, bool) else valor
+        return (campo, op, valor)
+
+    @staticmethod
+    def _campo(campos, campo, cache):
+        if isinstance(campo, str):
+            return campos[campo]
+        if campo not in cache:
+            cache[campo] = _DERIVADOS[campo[0]][2](campos, *campo[1:])
+        return cache[campo]
+
+    @classmethod
+    def _predicado(cls, chave, campos, cache):
+        if chave in cache:
+            return cache[chave]
+        campo, op, valor = chave
+        x = cls._campo(campos, campo, cache)
+        if op == "def":
+            r = x == x  # falso para NaN
+        else:
+            y = campos[valor[0]] - valor[1] if isinstance(valor, tuple) else valor
+            r = _OPS[op](x, y)
+        cache[chave] = r
+        return r
+
+    def base_fields(self, chave):
+        """Campos de entrada dos quais o predicado depende."""
+        campo, _, valor = chave
+        out = set(_DERIVADOS[campo[0]][0]) if isinstance(campo, tuple) else {campo}
+        if isinstance(valor, tuple):
+            out.add(valor[0])
+        return out
+
+    def trace(self, campos, cache=None):
+        """Índice da regra acionada (int16; -1 = nenhuma) para arrays de campos."""
+        cache = {} if cache is None else cache
+        with np.errstate(invalid="ignore"):
+            preds = [np.asarray(self._predicado(c, campos, cache)) for c in self.chaves]
+        shape = np.broadcast_shapes(*[np.shape(v) for v in campos.values()])
+        if self._lut is not None:
+            key = np.zeros(shape, dtype=np.uint32)
+            for i, p in enumerate(preds):
+                key |= p.astype(np.uint32) << np.uint32(i)
+            return self._lut[key]
+        conds = []
+        for _, cs in self.regras:
+            m = np.ones(shape, dtype=bool)
+            for i, neg in cs:
+                m = m & (~preds[i] if neg else preds[i])
+            conds.append(m)
+        return np.select(conds, np.arange(len(conds)), default=-1).astype(np.int16)
+
+    def classify(self, campos, cache=None):
+        """Códigos (índices em self.grupos) para arrays de campos (sucs_fields/trb_fields)."""
+        return self.group_of_rule(self.trace(campos, cache))
+
+    def group_of_rule(self, regra):
+        """Código do grupo correspondente a cada índice de regra."""
+        return self._grupo_da_regra[np.asarray(regra, dtype=np.intp)]
+
+    def describe(self, regra):
+        """Descrição legível de uma regra: 'grupo: predicado; predicado; ...'."""
+        if regra < 0:
+            return "nenhuma regra"
+        grupo, preds = self.tabela[regra]
+        partes = []
+        for p in preds:
+            txt = self.textos.get(p.lstrip("!"), p.lstrip("!")).format(**self.limites)
+            partes.append(("não " + txt) if p.startswith("!") else txt)
+        return f"{grupo}: " + ("; ".join(partes) if partes else "demais casos")
+
+    def describe_codes(self, regras):
+        """Descrições para um array de índices de regra (cada texto é gerado uma só vez)."""
+        textos = np.asarray([self.describe(i) for i in range(len(self.tabela))] + [self.describe(-1)],
+                            dtype=object)
+        return textos[np.asarray(regras, dtype=np.intp)]
+
+    def rules_using(self, *predicados):
+        """Índices das regras cujo caminho testa algum dos predicados (pelo nome, com ou sem '!')."""
+        alvo = {p.lstrip("!") for p in predicados}
+        return np.array([r for r, (_, preds) in enumerate(self.tabela)
+                         if alvo & {p.lstrip("!") for p in preds}], dtype=np.int16)
+
+    def rules_for_group(self, grupo):
+        """Índices das regras que levam ao grupo."""
+        return np.array([r for r, (g, _) in enumerate(self.tabela) if g == grupo], dtype=np.int16)
+
+    def trace_one(self, **campos):
+        """Índice da regra acionada para uma única amostra (avaliação preguiçosa); -1 se nenhuma."""
+        cache = {}
+        for r, (_, conds) in enumerate(self.regras):
+            if all(bool(self._predicado(self.chaves[i], campos, cache)) != neg for i, neg in conds):
+                return r
+        return -1
+
+    def classify_one(self, **campos):
+        """Grupo (str) para uma única amostra."""
+        r = self.trace_one(**campos)
+        return self.grupos[self.regras[r][0]] if r >= 0 else None
+
+    def signature(self, campos, sobre):
+        """
+        Assinatura inteira dos predicados que dependem só dos campos em `sobre`
+        (dois valores com a mesma assinatura são indistinguíveis pelas regras).
+        """
+        sig = None
+        cache = {}
+        for chave in self.chaves:
+            if self.base_fields(chave) <= set(sobre):
+                b = np.asarray(self._predicado(chave, campos, cache)).astype(np.int64)
+                sig = b if sig is None else sig * 2 + b
+        return np.zeros(np.broadcast_shapes(*[np.shape(campos[c]) for c in sobre]), dtype=np.int64) \
+            if sig is None else sig
+
+
+def compile_ruleset(sistema, limites=None, regras=None, nome=None):
+    """
+    Compila as regras de 'sucs' ou 'trb'. `limites` altera valores de
+    *_LIMITES (ex.: outra edição da norma); `regras` substitui a tabela.
+    """
+    grupos, base, predicados, regras_padrao, textos = _SISTEMAS[sistema]
+    lim = dict(base)
+    for k, v in (limites or {}).items():
+        if k not in lim:
+            raise ValueError(f"Limite desconhecido para {sistema.upper()}: {k}")
+        lim[k] = float(v)
+    return CompiledRuleSet(sistema, nome or "padrao", grupos, lim, predicados,
+                           regras_padrao if regras is None else regras, textos)
+
+
+def evaluate_many(rulesets, campos):
+    """Avalia vários conjuntos de regras (mesmo sistema) sobre o mesmo lote numa passada: {nome: códigos}."""
+    cache = {}
+    return {rs.nome: rs.classify(campos, cache) for rs in rulesets}
+
+
+SUCS_PADRAO = compile_ruleset("sucs")
+TRB_PADRAO = compile_ruleset("trb")
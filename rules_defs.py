@@ -0,0 +1,199 @@
+# rules_defs.py
+# Regras SUCS e TRB expressas como dados (limites, predicados e tabela de
+# decisão), no mesmo espírito de trb_defs.py. São compiladas por rules_core.
+#
+# - *_LIMITES: valores numéricos das normas (troque-os para testar outras
+#   edições/variantes, ex.: rules_core.compile_ruleset("trb", {"ll_divisor": 41})).
+# - *_PREDICADOS: nome -> (campo, operador, valor). O valor pode ser um número,
+#   o nome de um limite, None (operador "def": campo informado) ou
+#   (campo, limite) = campo − limite.
+# - *_REGRAS: lista ordenada (grupo, [predicados]); vale a primeira regra cujos
+#   predicados são todos verdadeiros ("!" nega o predicado). A última regra,
+#   sem predicados, é o caso residual.
+
+# ---------------------------------------------------------------------------
+# SUCS
+# ---------------------------------------------------------------------------
+
+def _sucs_groups():
+    grupos = ["Pt", "OL", "OH", "O?", "ML", "CL", "MH", "CH", "M?/C?"]
+    for c in "GS":
+        grupos += [c + "W", c + "P", c + "?", c + "M", c + "C"]
+        for base in (c, c + "W", c + "P"):
+            for second in (c, c + "M", c + "C"):
+                grupos.append(f"{base}-{second}")
+    return tuple(grupos)
+
+SUCS_GROUPS = _sucs_groups()
+
+SUCS_LIMITES = {
+    "grossa_ret200_min": 50.0,     # ≥ 50% retido na #200 -> granulação grossa
+    "finos_limpo_max": 5.0,        # finos < 5% -> GW/GP/SW/SP
+    "finos_limitrofe_max": 12.0,   # 5% ≤ finos ≤ 12% -> símbolo duplo
+    "cu_min_G": 4.0,
+    "cu_min_S": 6.0,
+    "cc_min": 1.0,
+    "cc_max": 3.0,
+    "linha_A_incl": 0.73,          # linha A: IP = 0,73·(LL − 20)
+    "linha_A_LL0": 20.0,
+    "ll_alto_min": 50.0,           # LL < 50 -> L; senão H
+}
+
+SUCS_PREDICADOS = {
+    "turfa":      ("turfa", "==", True),
+    "organico":   ("organico", "==", True),
+    "grossa":     ("ret200", ">=", "grossa_ret200_min"),
+    "finos<5":    ("finos", "<", "finos_limpo_max"),
+    "finos<=12":  ("finos", "<=", "finos_limitrofe_max"),
+    "areia":      ("areia_predominante", "==", True),
+    "Cu?":        ("Cu", "def", None),
+    "Cc?":        ("Cc", "def", None),
+    "Cu_G":       ("Cu", ">=", "cu_min_G"),
+    "Cu_S":       ("Cu", ">=", "cu_min_S"),
+    "Cc>=min":    ("Cc", ">=", "cc_min"),
+    "Cc<=max":    ("Cc", "<=", "cc_max"),
+    "LL/LP?":     ("IP", "def", None),
+    "acima_A":    ("IP_sobre_A", ">=", 0.0),
+    "LL?":        ("LL", "def", None),
+    "LL<50":      ("LL", "<", "ll_alto_min"),
+}
+
+# Leitura humana dos predicados (traços de decisão), formatada com os limites
+SUCS_PREDICADOS_TEXTO = {
+    "turfa": "turfa",
+    "organico": "orgânico",
+    "grossa": "≥{grossa_ret200_min:g}% retido na #200",
+    "finos<5": "finos <{finos_limpo_max:g}%",
+    "finos<=12": "finos ≤{finos_limitrofe_max:g}%",
+    "areia": "areia predominante",
+    "Cu?": "Cu informado",
+    "Cc?": "Cc informado",
+    "Cu_G": "Cu≥{cu_min_G:g}",
+    "Cu_S": "Cu≥{cu_min_S:g}",
+    "Cc>=min": "Cc≥{cc_min:g}",
+    "Cc<=max": "Cc≤{cc_max:g}",
+    "LL/LP?": "LL/LP informados",
+    "acima_A": "acima da linha A",
+    "LL?": "LL informado",
+    "LL<50": "LL<{ll_alto_min:g}",
+}
+
+def _sucs_rules():
+    regras = [("Pt", ["turfa"])]
+    for c, nao in (("G", "!areia"), ("S", "areia")):
+        W = ["Cu?", "Cc?", f"Cu_{c}", "Cc>=min", "Cc<=max"]
+        P = ["Cu?", "Cc?"]
+        limpo = ["grossa", "finos<5", nao]
+        regras += [(c + "W", limpo + W), (c + "P", limpo + P), (c + "?", limpo)]
+        dual = ["grossa", "finos<=12", nao]
+        for base, grad in ((c + "W", W), (c + "P", P), (c, [])):
+            regras += [(f"{base}-{c}C", dual + grad + ["acima_A"]),
+                       (f"{base}-{c}M", dual + grad + ["LL/LP?"]),
+                       (f"{base}-{c}", dual + grad)]
+        regras += [(c + "C", ["grossa", nao, "acima_A"]),
+                   (c + "M", ["grossa", nao, "LL/LP?"]),
+                   (c + "?", ["grossa", nao])]
+    regras += [
+        ("O?", ["organico", "!LL?"]),
+        ("OL", ["organico", "LL<50"]),
+        ("OH", ["organico"]),
+        ("CL", ["acima_A", "LL<50"]),
+        ("CH", ["acima_A"]),
+        ("ML", ["LL/LP?", "LL<50"]),
+        ("MH", ["LL/LP?"]),
+        ("M?/C?", []),
+    ]
+    return regras
+
+SUCS_REGRAS = _sucs_rules()
+
+# ---------------------------------------------------------------------------
+# TRB (HRB/AASHTO) — eliminação da esquerda para a direita
+# ---------------------------------------------------------------------------
+
+TRB_GROUPS = ("A-1-a", "A-1-b", "A-3", "A-2-4", "A-2-5", "A-2-6", "A-2-7",
+              "A-4", "A-5", "A-6", "A-7-5", "A-7-6")
+
+TRB_LIMITES = {
+    "granular_p200_max": 35.0,
+    "a1a_p10_max": 50.0,
+    "a1a_p40_max": 30.0,
+    "a1a_p200_max": 15.0,
+    "a1b_p40_max": 50.0,
+    "a1b_p200_max": 25.0,
+    "a1_ll_max": 40.0,
+    "a1_ip_max": 6.0,
+    "a3_p40_min": 51.0,
+    "a3_p200_max": 10.0,
+    "ll_divisor": 40.0,        # LL ≤ 40 (siltoso/argiloso de LL baixo)
+    "ip_silte_max": 10.0,
+    "ip_argila_min": 11.0,
+    "a7_desconto": 30.0,       # A-7-5: IP ≤ LL − 30
+}
+
+TRB_PREDICADOS = {
+    "granular":  ("P200", "<=", "granular_p200_max"),
+    "a1a_p10":   ("P10", "<=", "a1a_p10_max"),
+    "a1a_p40":   ("P40", "<=", "a1a_p40_max"),
+    "a1a_p200":  ("P200", "<=", "a1a_p200_max"),
+    "a1b_p40":   ("P40", "<=", "a1b_p40_max"),
+    "a1b_p200":  ("P200", "<=", "a1b_p200_max"),
+    "a1_ll":     ("LL", "<=", "a1_ll_max"),
+    "a1_ip":     ("IP", "<=", "a1_ip_max"),
+    "a3_p40":    ("P40", ">=", "a3_p40_min"),
+    "a3_p200":   ("P200", "<=", "a3_p200_max"),
+    "NP":        ("IP", "==", 0.0),
+    "LL_baixo":  ("LL", "<=", "ll_divisor"),
+    "IP_silte":  ("IP", "<=", "ip_silte_max"),
+    "IP_argila": ("IP", ">=", "ip_argila_min"),
+    "a7_5":      ("IP", "<=", ("LL", "a7_desconto")),
+}
+
+TRB_PREDICADOS_TEXTO = {
+    "granular": "#200≤{granular_p200_max:g}",
+    "a1a_p10": "#10≤{a1a_p10_max:g}",
+    "a1a_p40": "#40≤{a1a_p40_max:g}",
+    "a1a_p200": "#200≤{a1a_p200_max:g}",
+    "a1b_p40": "#40≤{a1b_p40_max:g}",
+    "a1b_p200": "#200≤{a1b_p200_max:g}",
+    "a1_ll": "LL≤{a1_ll_max:g}",
+    "a1_ip": "IP≤{a1_ip_max:g}",
+    "a3_p40": "#40≥{a3_p40_min:g}",
+    "a3_p200": "#200≤{a3_p200_max:g}",
+    "NP": "IP=NP",
+    "LL_baixo": "LL≤{ll_divisor:g}",
+    "IP_silte": "IP≤{ip_silte_max:g}",
+    "IP_argila": "IP≥{ip_argila_min:g}",
+    "a7_5": "IP ≤ LL−{a7_desconto:g}",
+}
+
+TRB_REGRAS = [
+    ("A-1-a", ["granular", "a1a_p10", "a1a_p40", "a1a_p200", "a1_ll", "a1_ip"]),
+    ("A-1-b", ["granular", "a1b_p40", "a1b_p200", "a1_ll", "a1_ip"]),
+    ("A-3",   ["granular", "a3_p40", "a3_p200", "NP"]),
+    ("A-2-4", ["granular", "IP_silte", "LL_baixo"]),
+    ("A-2-5", ["granular", "IP_silte", "!LL_baixo"]),
+    ("A-2-6", ["granular", "IP_argila", "LL_baixo"]),
+    ("A-2-7", ["granular"]),
+    ("A-4",   ["LL_baixo", "IP_silte"]),
+    ("A-5",   ["!LL_baixo", "IP_silte"]),
+    ("A-6",   ["LL_baixo", "IP_argila"]),
+    ("A-7-5", ["a7_5"]),
+    ("A-7-6", []),
+]
+
+# Texto da regra acionada (relatório TRB), formatado com os limites
+TRB_TEXTOS = {
+    "A-1-a": "Atende #10≤{a1a_p10_max:g}, #40≤{a1a_p40_max:g}, #200≤{a1a_p200_max:g}, LL≤{a1_ll_max:g}, IP≤{a1_ip_max:g}",
+    "A-1-b": "Atende #40≤{a1b_p40_max:g}, #200≤{a1b_p200_max:g}, LL≤{a1_ll_max:g}, IP≤{a1_ip_max:g}",
+    "A-3":   "Areia fina NP: #40≥{a3_p40_min:g}, #200≤{a3_p200_max:g}, IP=NP",
+    "A-2-4": "IP≤{ip_silte_max:g} e LL≤{ll_divisor:g}",
+    "A-2-5": "IP≤{ip_silte_max:g} e LL>{ll_divisor:g}",
+    "A-2-6": "IP≥{ip_argila_min:g} e LL≤{ll_divisor:g}",
+    "A-2-7": "IP≥{ip_argila_min:g} e LL>{ll_divisor:g}",
+    "A-4":   "LL≤{ll_divisor:g} e IP≤{ip_silte_max:g}",
+    "A-5":   "LL>{ll_divisor:g} e IP≤{ip_silte_max:g}",
+    "A-6":   "LL≤{ll_divisor:g} e IP≥{ip_argila_min:g}",
+    "A-7-5": "LL>{ll_divisor:g}, IP≥{ip_argila_min:g} e IP ≤ LL−{a7_desconto:g}",
+    "A-7-6": "LL>{ll_divisor:g}, IP≥{ip_argila_min:g} e IP > LL−{a7_desconto:g}",
+}
@@ -12,7 +12,22 @@ import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 
-from sucs_core import classify_sucs, classify_dataframe, LINE_A_SLOPE
+from sucs_core import classify_sucs, classify_dataframe, classify_dataframe_vec
+from gradation_core import with_gradation
+from summary_core import RunningSummary
+from xlsx_core import read_xlsx
+from view_core import ResultsView, show_results
+from export_core import XLSX_MAX_ROWS, ChunkWriter, normalized_xlsx_bytes
+from profile_core import StationIndex, has_location, show_profile
+from render_core import PlasticityChart, region_map, render_batch, row_report
+from telemetry_core import (JobTelemetry, Limits, estimate_upload, iter_upload_chunks, publish,
+                            publish_export, session_id, show_admin_panel)
+
+
+@st.cache_resource
+def _plasticity_regions():
+    """Grade de regiões ML/CL/MH/CH (calculada uma vez por processo)."""
+    return region_map()
 
 
 def build_excel_template_bytes():
@@ -223,40 +238,9 @@ with col2:
     LP = st.number_input("Limite de Plasticidade (LP)", 0.0, 200.0, step=0.1)
     IP = max(0.0, LL - LP)
     st.metric("IP = LL − LP", f"{IP:.2f}")
-    # Gráfico de plasticidade simples
+    # Gráfico de plasticidade simples (mesmo desenho dos relatórios em lote)
     fig, ax = plt.subplots()
-    # Linha A (IP = 0,73*(LL-20)) — desenhada desde LL=0
-    x_max = max(60, LL + 10)
-    xs = [0, x_max]
-    ys = [LINE_A_SLOPE*(xs[0]-20), LINE_A_SLOPE*(xs[1]-20)]
-    ax.plot(xs, ys)  # linha A
-    # Segmento horizontal tracejado: IP = 5 até intersectar a linha A
-    IP_GUIDE = 5.0
-    x_int = (IP_GUIDE / LINE_A_SLOPE) + 20.0
-    ax.hlines(IP_GUIDE, 0, min(x_int, x_max), linestyles='--', linewidth=1)
-
-
-    # Guias verticais pedidas
-    ax.axvline(30, linestyle='--', linewidth=1)
-    ax.axvline(50, linestyle='--', linewidth=1)
-
-    # Ponto (LL, IP)
-    ax.scatter([LL], [IP])
-
-    # Limites dos eixos: começar em 0 para não exibir IP negativo
-    y_line_end = LINE_A_SLOPE*(x_max - 20)
-    y_max = max(40, IP + 10, y_line_end + 5, 5 + 10)  # garante espaço para a guia IP=5
-    ax.set_xlim(0, x_max)
-    ax.set_ylim(0, y_max)
-
-    # Rótulos das guias após definir limites
-    ylim = ax.get_ylim()
-    ax.text(30, ylim[1]*0.95, "LL=30", rotation=90, va='top', ha='right', fontsize=9)
-    ax.text(50, ylim[1]*0.95, "LL=50", rotation=90, va='top', ha='right', fontsize=9)
-
-    ax.set_xlabel("LL")
-    ax.set_ylabel("IP")
-    ax.set_title("Gráfico de Plasticidade (linha A e ponto da amostra)")
+    PlasticityChart(ax, _plasticity_regions()).update(LL, IP)
     st.pyplot(fig)
 
 with col3:
@@ -313,13 +297,114 @@ if st.button("Classificar (formulário acima)"):
     st.download_button("Baixar relatório (.txt)", relatorio, file_name=f"sucs_{amostra or 'amostra'}.txt")
 
 st.divider()
-st.subheader("Classificação em lote (CSV)")
+st.subheader("Classificação em lote (CSV / Excel)")
 st.caption("Colunas esperadas: projeto,tecnico,amostra,pct_retido_200,pct_pedregulho_coarse,pct_areia_coarse,LL,LP,Cu,Cc,organico,turfa")
-uploaded = st.file_uploader("Envie o CSV", type=["csv"])
+st.caption("Opcional: colunas de % passante por peneira (ex.: #4, #10, #40, #200, 3/8\") — D10/D30/D60 e Cu/Cc "
+           "são obtidos da curva quando vierem em branco.")
+uploaded = st.file_uploader("Envie o CSV (ou Excel .xlsx — todas as planilhas)", type=["csv", "xlsx"])
+limites = Limits.from_env()
+show_admin_panel(limites)
 if uploaded is not None:
-    df = pd.read_csv(uploaded)
-    res = classify_dataframe(df)
-    st.dataframe(res, use_container_width=True)
-    buf = io.StringIO()
-    res.to_csv(buf, index=False)
-    st.download_button("Baixar resultados (CSV)", buf.getvalue(), file_name="resultados_sucs.csv")
+    chave_up = (uploaded.name, uploaded.size)
+    tel = None
+    if st.session_state.get("view_sucs_chave") == chave_up:
+        res = st.session_state["view_sucs"].df  # já classificado nesta sessão
+    else:
+        dados = uploaded.getvalue()
+        modo, motivo = limites.decide(*estimate_upload(uploaded.name, dados))
+        tel = JobTelemetry("sucs", session_id(st.session_state), uploaded.name, uploaded.size)
+        tel.set_mode(modo, motivo)
+        res, resumo_arquivo, csv_pedacos = None, None, None
+        if modo == "rejeitar":
+            tel.dados["status"] = "rejeitado"
+            publish(tel, st.session_state, chave_up)
+            st.error(f"Arquivo grande demais para o servidor ({motivo}). Use a linha de comando: "
+                     "python cli.py classificar arquivo --sistema sucs")
+        elif modo == "pedacos":
+            # Lote grande: motor vetorizado por pedaços, sem a coluna 'relatorio'
+            # (o relatório de uma linha é gerado ao inspecioná-la). Resumo e CSV
+            # são acumulados pedaço a pedaço; só a grade junta o resultado inteiro.
+            st.info(f"Lote grande ({motivo}): classificação em pedaços de {limites.linhas_pedaco} linhas.")
+            with tel:
+                partes, resumo_arquivo, csv_buf = [], RunningSummary(), io.BytesIO()
+                with ChunkWriter(csv_buf, "csv") as csv_w:
+                    for ch in tel.timed_chunks(iter_upload_chunks(uploaded.name, dados, limites.linhas_pedaco)):
+                        with tel.etapa("classificacao"):
+                            r = classify_dataframe_vec(with_gradation(ch))
+                        resumo_arquivo.update(r)
+                        csv_w.write(r)
+                        partes.append(r)
+                csv_pedacos = csv_buf.getvalue()
+                res = pd.concat(partes, ignore_index=True)
+                del partes, csv_buf
+        else:
+            with tel:
+                with tel.etapa("leitura"):
+                    df = read_xlsx(uploaded) if uploaded.name.lower().endswith(".xlsx") else pd.read_csv(uploaded)
+                tel.input(df)
+                with tel.etapa("classificacao"):
+                    res = classify_dataframe(with_gradation(df))
+                del df
+        if res is not None:
+            tel.result(res)
+            st.session_state["view_sucs"] = ResultsView(
+                res, "grupo", report_fn=None if "relatorio" in res.columns else (lambda r: row_report("sucs", r)))
+            st.session_state["view_sucs_chave"] = chave_up
+            st.session_state.pop("export_sucs", None)
+            st.session_state["csv_sucs_pedacos"] = csv_pedacos
+            # resumo só deste arquivo
+            st.session_state["resumo_sucs_arquivo"] = resumo_arquivo or RunningSummary().update(res)
+            st.session_state["perfil_sucs"] = StationIndex(res) if has_location(res) else None
+if uploaded is not None and res is not None:
+    show_results(st.session_state["view_sucs"], key="sucs_lote", label_rotulo="amostra")
+    if st.session_state.get("perfil_sucs") is not None:
+        with st.expander("Trecho e perfil longitudinal (estaca × profundidade)"):
+            show_profile(st.session_state["perfil_sucs"], res, key="sucs_perfil", sistema="SUCS")
+    resumo = st.session_state.setdefault("resumo_sucs", RunningSummary())
+    vistos = st.session_state.setdefault("resumo_sucs_vistos", set())
+    if chave_up not in vistos:
+        resumo.merge(st.session_state["resumo_sucs_arquivo"])
+        vistos.add(chave_up)
+    with st.expander(f"Resumo acumulado da sessão ({resumo.linhas} amostras, {len(vistos)} arquivo(s))"):
+        st.dataframe(resumo.sucs_table(), use_container_width=True)
+        if st.button("Zerar resumo", key="zerar_resumo_sucs"):
+            st.session_state["resumo_sucs"] = RunningSummary()
+            st.session_state["resumo_sucs_vistos"] = set()
+    # Arquivos de exportação: gerados uma vez por arquivo enviado, não a cada rerun
+    export_sucs = st.session_state.get("export_sucs")
+    if export_sucs is None or export_sucs[0] != chave_up:
+        csv_bytes = st.session_state.pop("csv_sucs_pedacos", None)  # já gravado pedaço a pedaço
+        if csv_bytes is None:
+            buf = io.StringIO()
+            res.to_csv(buf, index=False)
+            csv_bytes = buf.getvalue().encode("utf-8")
+            del buf
+        export_sucs = (chave_up, {"csv": csv_bytes})
+        del csv_bytes
+        if len(res) <= XLSX_MAX_ROWS:  # acima disso o XLSX não comporta o lote
+            export_sucs[1]["xlsx_normalizado"] = normalized_xlsx_bytes(res).getvalue()
+        st.session_state["export_sucs"] = export_sucs
+        if tel is not None:
+            for nome, dados in export_sucs[1].items():
+                tel.export(nome, dados)
+    if tel is not None:
+        publish(tel, st.session_state, chave_up)
+    st.download_button("Baixar resultados (CSV)", export_sucs[1]["csv"], file_name="resultados_sucs.csv")
+    if "xlsx_normalizado" in export_sucs[1]:
+        st.download_button("Baixar resultados normalizados (XLSX: fatos + textos por grupo)",
+                           export_sucs[1]["xlsx_normalizado"], file_name="resultados_sucs_normalizado.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    else:
+        st.caption(f"XLSX indisponível: mais de {XLSX_MAX_ROWS:,} linhas. Use o CSV ou "
+                   "python cli.py classificar arquivo --sistema sucs --formato parquet --normalizado")
+    # Gráfico + relatório PDF por amostra, gerados em paralelo e empacotados num ZIP
+    if st.button("Gerar gráficos e relatórios PDF por amostra (ZIP)", key="zip_sucs_gerar"):
+        barra = st.progress(0.0)
+        zbuf = io.BytesIO()
+        render_batch(res, "sucs", zbuf, progresso=lambda k, n: barra.progress(k / max(n, 1)))
+        st.session_state["zip_sucs"] = (chave_up, zbuf.getvalue())
+        publish_export(st.session_state, chave_up, "zip_relatorios", zbuf)
+    zip_sucs = st.session_state.get("zip_sucs")
+    if zip_sucs and zip_sucs[0] == chave_up:
+        st.download_button("Baixar gráficos e relatórios (ZIP)", zip_sucs[1],
+                           file_name="relatorios_sucs.zip", mime="application/zip")
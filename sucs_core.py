@@ -4,8 +4,15 @@
 # Pode ser importado tanto por scripts de terminal quanto pelo app Streamlit.
 
 from datetime import datetime
+import math
 
-LINE_A_SLOPE = 0.73  # IP = 0.73*(LL - 20)
+import numpy as np
+
+from rules_defs import SUCS_GROUPS, SUCS_LIMITES
+from rules_core import SUCS_PADRAO, sucs_fields
+
+LINE_A_SLOPE = SUCS_LIMITES["linha_A_incl"]  # IP = 0.73*(LL - 20)
+LINE_A_LL0 = SUCS_LIMITES["linha_A_LL0"]
 
 
 # Mapa SUCS → faixa típica de CBR (ISC)
@@ -92,6 +99,16 @@ def _finalize(grp, report):
     if cbr:
         report.append(f"CBR típico (ISC): {cbr}%")
     return grp, "\n".join(report)
+def _to_float(x):
+    """Converte para float; None, NaN (célula vazia no lote) ou texto inválido -> None."""
+    if x is None:
+        return None
+    try:
+        x = float(x)
+    except Exception:
+        return None
+    return None if math.isnan(x) else x
+
 def well_graded_letter(coarse_symbol, Cu, Cc):
     """
     Decide W/P quando finos < 5%.
@@ -99,24 +116,20 @@ def well_graded_letter(coarse_symbol, Cu, Cc):
     - Cascalhos (G): Cu >= 4 e 1 <= Cc <= 3 -> W; senão P
     Retorna 'W', 'P' ou None (se Cu/Cc não informados)
     """
+    Cu = _to_float(Cu); Cc = _to_float(Cc)
     if Cu is None or Cc is None:
         return None
-    try:
-        Cu = float(Cu); Cc = float(Cc)
-    except Exception:
-        return None
-    if coarse_symbol == "S":
-        return "W" if (Cu >= 6 and 1 <= Cc <= 3) else "P"
-    return "W" if (Cu >= 4 and 1 <= Cc <= 3) else "P"
+    L = SUCS_LIMITES
+    cu_min = L["cu_min_S"] if coarse_symbol == "S" else L["cu_min_G"]
+    return "W" if (Cu >= cu_min and L["cc_min"] <= Cc <= L["cc_max"]) else "P"
 
 def fines_nature(LL, LP):
     """'M' (siltoso) abaixo da linha A; 'C' (argiloso) acima da linha A. Retorna None se faltar dado."""
-    try:
-        LL = float(LL); LP = float(LP)
-    except Exception:
+    LL = _to_float(LL); LP = _to_float(LP)
+    if LL is None or LP is None:
         return None
     IP = max(0.0, LL - LP)
-    lineA = LINE_A_SLOPE * (LL - 20.0)
+    lineA = LINE_A_SLOPE * (LL - LINE_A_LL0)
     return "C" if IP >= lineA else "M"
 
 def classify_sucs(data):
@@ -130,6 +143,11 @@ def classify_sucs(data):
       organico (bool), turfa (bool)
     Retorna (grupo, relatorio_txt)
     """
+    return _classify_sucs(data)[:2]
+
+
+def _classify_sucs(data):
+    """classify_sucs + índice da regra acionada em SUCS_REGRAS: (grupo, relatorio_txt, regra)."""
     report = []
     projeto = data.get("projeto","")
     tecnico = data.get("tecnico","")
@@ -140,20 +158,27 @@ def classify_sucs(data):
 
     pct_ret_200 = float(data.get("pct_retido_200", 0.0))
     pct_finos = max(0.0, 100.0 - pct_ret_200)
+    pg = float(data.get("pct_pedregulho_coarse", 0.0))
+    ps = float(data.get("pct_areia_coarse", 0.0))
 
-    LL = data.get("LL", None)
-    LP = data.get("LP", None)
+    LL = _to_float(data.get("LL", None))
+    LP = _to_float(data.get("LP", None))
     IP = None
     if LL is not None and LP is not None:
-        try:
-            LL = float(LL); LP = float(LP)
-            IP = max(0.0, LL - LP)
-        except Exception:
-            LL = LP = None
+        IP = max(0.0, LL - LP)
+    Cu = _to_float(data.get("Cu", None))
+    Cc = _to_float(data.get("Cc", None))
 
     organico = bool(data.get("organico", False))
     turfa = bool(data.get("turfa", False))
 
+    # O grupo vem das mesmas regras do motor vetorizado (rules_defs.SUCS_REGRAS);
+    # o relatório só descreve o caminho percorrido.
+    nan = lambda v: np.nan if v is None else v
+    regra = SUCS_PADRAO.trace_one(**sucs_fields(pct_ret_200, pg, ps, nan(LL), nan(LP),
+                                                nan(Cu), nan(Cc), organico, turfa))
+    grp = SUCS_PADRAO.tabela[regra][0]
+
     report.append("Entradas")
     report.append(f"  % retido na #200: {pct_ret_200:.2f}%  |  % de finos: {pct_finos:.2f}%")
     if LL is not None and LP is not None:
@@ -161,87 +186,127 @@ def classify_sucs(data):
     else:
         report.append("  LL/LP: não informados")
 
-    # Turfa tem prioridade
-    if turfa:
+    L = SUCS_LIMITES
+    if grp == "Pt":
         report.append("Observação: material altamente orgânico (turfa).")
-        return _finalize("Pt", report)
-
-    # Split grossa vs fina
-    if pct_ret_200 >= 50.0:
+    elif pct_ret_200 >= L["grossa_ret200_min"]:
         # Fração grossa -> G vs S pela fração > #200 (pedregulho vs areia)
-        pg = float(data.get("pct_pedregulho_coarse", 0.0))
-        ps = float(data.get("pct_areia_coarse", 0.0))
         total = pg + ps
         if total > 0:
             pgn = 100.0 * pg / total
             psn = 100.0 * ps / total
         else:
             pgn = psn = 50.0
-        coarse_symbol = "G" if pgn >= psn else "S"
+        coarse_symbol = grp[0]
         report.append(f"  Fração grossa predominante: {'cascalho (G)' if coarse_symbol=='G' else 'areia (S)'} "
                       f"(> #200: pedregulho {pgn:.1f}%, areia {psn:.1f}%)")
-
-        if pct_finos < 5.0:
-            Cu = data.get("Cu", None)
-            Cc = data.get("Cc", None)
-            W_or_P = well_graded_letter(coarse_symbol, Cu, Cc)
-            if W_or_P is None:
-                grp = coarse_symbol + "?"
+        if pct_finos < L["finos_limpo_max"]:
+            if grp.endswith("?"):
                 report.append("  Finos < 5%: seria GW/GP ou SW/SP; informe Cu/Cc para decidir W/P.")
             else:
-                grp = coarse_symbol + W_or_P
-                report.append(f"  Finos < 5% e graduação {'boa' if W_or_P=='W' else 'má'} -> {grp}")
-            return _finalize(grp, report)
-
-        if 5.0 <= pct_finos <= 12.0:
-            nat = fines_nature(LL, LP)
-            Cu = data.get("Cu", None); Cc = data.get("Cc", None)
-            W_or_P = well_graded_letter(coarse_symbol, Cu, Cc)
-            base = coarse_symbol if W_or_P is None else coarse_symbol + W_or_P
-            second = coarse_symbol if nat is None else coarse_symbol + ("M" if nat=="M" else "C")
-            grp = f"{base}-{second}".replace("GG","G").replace("SS","S")
+                report.append(f"  Finos < 5% e graduação {'boa' if grp[1]=='W' else 'má'} -> {grp}")
+        elif pct_finos <= L["finos_limitrofe_max"]:
             report.append(f"  Finos 5–12% (limítrofe): {grp}")
-            return _finalize(grp, report)
-
-        # >12% finos
-        nat = fines_nature(LL, LP)
-        if nat is None:
-            grp = coarse_symbol + "?"
+        elif grp.endswith("?"):
             report.append("  Finos > 12%: LL/LP ausentes para natureza dos finos (M/C).")
         else:
-            grp = (coarse_symbol + nat).replace("GG","G").replace("SS","S")
-            report.append(f"  Finos > 12% e finos {'siltosos' if nat=='M' else 'argilosos'} -> {grp}")
-        return _finalize(grp, report)
-
+            report.append(f"  Finos > 12% e finos {'siltosos' if grp[1]=='M' else 'argilosos'} -> {grp}")
+    elif grp in ("OL", "OH", "O?"):
+        report.append(f"  Solo com aspecto orgânico -> {grp}")
+    elif grp == "M?/C?":
+        report.append("  LL/LP ausentes: não é possível posicionar no gráfico de plasticidade.")
     else:
-        # Fração fina (solos finos)
-        if organico:
-            if LL is None:
-                grp = "O?"
-            else:
-                grp = "OL" if LL < 50.0 else "OH"
-            report.append(f"  Solo com aspecto orgânico -> {grp}")
-            return _finalize(grp, report)
-
-        nat = fines_nature(LL, LP)  # 'M' ou 'C'
-        if nat is None or LL is None:
-            report.append("  LL/LP ausentes: não é possível posicionar no gráfico de plasticidade.")
-            return _finalize("M?/C?", report)
-        L_or_H = "L" if LL < 50.0 else "H"
-        grp = (("M" if nat=="M" else "C") + L_or_H)
-        report.append(f"  Solo fino: {'silte' if nat=='M' else 'argila'}; LL {'< 50' if L_or_H=='L' else '≥ 50'} -> {grp}")
-        return _finalize(grp, report)
+        report.append(f"  Solo fino: {'silte' if grp[0]=='M' else 'argila'}; "
+                      f"LL {'< 50' if grp[1]=='L' else '≥ 50'} -> {grp}")
+    return _finalize(grp, report) + (regra,)
 
 def classify_dataframe(df):
-    """Aplica classify_sucs linha a linha e retorna df com colunas 'grupo' e 'relatorio'."""
+    """Aplica classify_sucs linha a linha e retorna df com colunas 'grupo', 'relatorio' e 'regra_SUCS' (traço)."""
     out_groups = []
     out_reports = []
+    out_regras = []
     for _, row in df.iterrows():
         data = row.to_dict()
-        grp, rep = classify_sucs(data)
+        grp, rep, regra = _classify_sucs(data)
         out_groups.append(grp)
         out_reports.append(rep)
+        out_regras.append(regra)
     res = df.copy()
     res["grupo"] = out_groups
     res["relatorio"] = out_reports
+    res["regra_SUCS"] = np.asarray(out_regras, dtype=np.int16)
+    return res
+
+
+# ---------------------------------------------------------------------------
+# Motor vetorizado (NumPy): mesma árvore de decisão de classify_sucs, sem
+# relatório, para lotes grandes e simulações. Os grupos saem como códigos
+# inteiros (índices em SUCS_GROUPS); NaN nas entradas = "não informado".
+# As regras vêm de rules_defs.py, compiladas em rules_core.
+# ---------------------------------------------------------------------------
+
+SUCS_CODE = {g: i for i, g in enumerate(SUCS_GROUPS)}
+
+
+def classify_sucs_arrays(pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse,
+                         LL, LP, Cu=np.nan, Cc=np.nan, organico=False, turfa=False, ruleset=None):
+    """
+    Versão vetorizada de classify_sucs. Aceita escalares ou arrays (com broadcast)
+    e retorna um array int16 de códigos em SUCS_GROUPS.
+    ruleset: conjunto compilado (rules_core.compile_ruleset("sucs", ...)); padrão = regras vigentes.
+    """
+    rs = SUCS_PADRAO if ruleset is None else ruleset
+    campos = sucs_fields(pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse,
+                         LL, LP, Cu, Cc, organico, turfa)
+    return rs.classify(campos).astype(np.int16)
+
+
+def trace_sucs_arrays(pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse,
+                      LL, LP, Cu=np.nan, Cc=np.nan, organico=False, turfa=False, ruleset=None):
+    """
+    Traço de decisão vetorizado: índice (int16) da regra acionada em SUCS_REGRAS.
+    Ex.: quem usou Cu/Cc -> np.isin(traco, SUCS_PADRAO.rules_using("Cu?"));
+    texto legível -> SUCS_PADRAO.describe_codes(traco).
+    """
+    rs = SUCS_PADRAO if ruleset is None else ruleset
+    campos = sucs_fields(pct_retido_200, pct_pedregulho_coarse, pct_areia_coarse,
+                         LL, LP, Cu, Cc, organico, turfa)
+    return rs.trace(campos)
+
+
+def sucs_group_names(codes):
+    """Converte códigos de classify_sucs_arrays nos símbolos SUCS (array de objetos)."""
+    return np.asarray(SUCS_GROUPS, dtype=object)[np.asarray(codes, dtype=np.intp)]
+
+
+def sucs_inputs_from_frame(df):
+    """Extrai do DataFrame de lote (colunas do CSV-modelo) os arrays de entrada de classify_sucs_arrays."""
+    import pandas as pd
+
+    def num(col, default):
+        if col not in df.columns:
+            return np.full(len(df), default, dtype=float)
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+    def flag(col):
+        if col not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        return df[col].fillna(False).astype(bool).to_numpy()
+
+    return dict(
+        pct_retido_200=num("pct_retido_200", 0.0),
+        pct_pedregulho_coarse=num("pct_pedregulho_coarse", 0.0),
+        pct_areia_coarse=num("pct_areia_coarse", 0.0),
+        LL=num("LL", np.nan), LP=num("LP", np.nan),
+        Cu=num("Cu", np.nan), Cc=num("Cc", np.nan),
+        organico=flag("organico"), turfa=flag("turfa"),
+    )
+
+
+def classify_dataframe_vec(df):
+    """Como classify_dataframe, porém vetorizado e sem a coluna 'relatorio' (lotes grandes)."""
+    regra = trace_sucs_arrays(**sucs_inputs_from_frame(df))
+    res = df.copy()
+    res["grupo"] = sucs_group_names(SUCS_PADRAO.group_of_rule(regra))
+    res["regra_SUCS"] = regra
     return res
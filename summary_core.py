@@ -0,0 +1,155 @@
+# summary_core.py
+# Resumos incrementais por projeto/técnico/grupo (SUCS e TRB).
+# Os agregados são somáveis (contagens, mín/máx, soma e histograma do IG),
+# então cada lote/upload novo só agrega as próprias linhas e é fundido ao
+# estado acumulado, cujo tamanho depende do número de grupos — não do número
+# de amostras. Os quantis do IG saem exatos do histograma (IG inteiro 0–20).
+
+import numpy as np
+import pandas as pd
+
+from boundary_core import sucs_boundary_distances, trb_boundary_distances
+
+# Colunas de identificação aceitas (lote SUCS e lote TRB)
+KEY_ALIASES = {
+    "projeto": ("projeto", "Nome do projeto"),
+    "tecnico": ("tecnico", "Técnico responsável"),
+    "amostra": ("amostra", "Código da amostra"),
+}
+
+_IG_BINS = 21
+_H = [f"h{k}" for k in range(_IG_BINS)]
+
+_AGG = {"n": "sum", "limitrofes": "sum", "ig_min": "min", "ig_max": "max", "ig_soma": "sum",
+        **{h: "sum" for h in _H}}
+
+
+def _keys(df, chaves):
+    out = {}
+    for k in chaves:
+        col = next((c for c in KEY_ALIASES.get(k, (k,)) if c in df.columns), None)
+        out[k] = df[col].fillna("").astype(str) if col else pd.Series("", index=df.index)
+    return pd.DataFrame(out, index=df.index)
+
+
+def _limitrofes(dist, delta):
+    if dist is None or dist.empty:
+        return np.zeros(0, dtype=bool)
+    d = np.abs(dist.to_numpy(dtype=float))
+    return (np.where(np.isnan(d), np.inf, d) <= delta).any(axis=1)
+
+
+def _merge(a, b):
+    if a is None:
+        return None if b is None else b.sort_index()
+    if b is None:
+        return a
+    return pd.concat([a, b]).groupby(level=list(range(a.index.nlevels)), sort=True).agg(
+        {c: _AGG.get(c, "sum") for c in a.columns})
+
+
+class RunningSummary:
+    """
+    Agregados acumulados. Use update(df) com resultados de classify_dataframe*
+    (coluna 'grupo'), classify_dataframe_trb* ('Grupo_TRB'/'IG') ou ambos na
+    mesma linha (gera também a tabela cruzada SUCS × TRB).
+    """
+
+    def __init__(self, chaves=("projeto", "tecnico"), delta=1.0):
+        self.chaves = tuple(chaves)
+        self.delta = float(delta)
+        self._sucs = None
+        self._trb = None
+        self._cruz = None
+        self.linhas = 0
+
+    # -- atualização -------------------------------------------------------
+    def _parcial(self, k, grupo, ig, lim):
+        d = k.assign(grupo=grupo.fillna("?").astype(str).to_numpy(), n=1,
+                     limitrofes=lim.astype(int))
+        if ig is not None:
+            igv = pd.to_numeric(ig, errors="coerce")
+            ok = igv.notna().to_numpy()
+            igi = np.clip(igv.fillna(0).to_numpy(dtype=int), 0, _IG_BINS - 1)
+            d["ig_min"] = igv.to_numpy(dtype=float)
+            d["ig_max"] = igv.to_numpy(dtype=float)
+            d["ig_soma"] = igv.fillna(0).to_numpy(dtype=float)
+            onehot = np.zeros((len(d), _IG_BINS), dtype=np.int64)
+            onehot[np.flatnonzero(ok), igi[ok]] = 1
+            d[_H] = onehot
+        return d.groupby(list(self.chaves) + ["grupo"], sort=False).agg(
+            {c: _AGG[c] for c in d.columns if c in _AGG})
+
+    def update(self, df):
+        """Agrega um novo lote (ou pedaço de lote) ao estado acumulado."""
+        if df is None or len(df) == 0:
+            return self
+        k = _keys(df, self.chaves)
+        sem_limitrofes = np.zeros(len(df), dtype=bool)
+        if "grupo" in df.columns:
+            # sem as entradas (ex.: só o resultado) não há distância aos limites
+            lim = _limitrofes(sucs_boundary_distances(df), self.delta) \
+                if "pct_retido_200" in df.columns else sem_limitrofes
+            self._sucs = _merge(self._sucs, self._parcial(k, df["grupo"], None, lim))
+        if "Grupo_TRB" in df.columns:
+            lim = _limitrofes(trb_boundary_distances(df, incluir_ig=False), self.delta) \
+                if {"P10", "P40", "P200"} <= set(df.columns) else sem_limitrofes
+            self._trb = _merge(self._trb, self._parcial(k, df["Grupo_TRB"], df.get("IG"), lim))
+        if "grupo" in df.columns and "Grupo_TRB" in df.columns:
+            c = k.assign(SUCS=df["grupo"].fillna("?").astype(str).to_numpy(),
+                         TRB=df["Grupo_TRB"].fillna("?").astype(str).to_numpy(), n=1)
+            self._cruz = _merge(self._cruz, c.groupby(list(self.chaves) + ["SUCS", "TRB"], sort=False)[["n"]].sum())
+        self.linhas += len(df)
+        return self
+
+    def merge(self, other):
+        """Funde outro resumo (ex.: calculado em outro processo) neste."""
+        self._sucs = _merge(self._sucs, other._sucs)
+        self._trb = _merge(self._trb, other._trb)
+        self._cruz = _merge(self._cruz, other._cruz)
+        self.linhas += other.linhas
+        return self
+
+    # -- leitura -----------------------------------------------------------
+    def sucs_table(self):
+        """n e limítrofes por projeto/técnico/grupo SUCS."""
+        if self._sucs is None:
+            return pd.DataFrame(columns=list(self.chaves) + ["grupo", "n", "limitrofes"])
+        return self._sucs[["n", "limitrofes"]].reset_index()
+
+    def trb_table(self, quantis=(0.5, 0.9)):
+        """n, IG mín/máx/médio, quantis do IG e limítrofes por projeto/técnico/grupo TRB."""
+        cols = list(self.chaves) + ["Grupo_TRB", "n", "IG_min", "IG_max", "IG_médio"]
+        if self._trb is None:
+            return pd.DataFrame(columns=cols)
+        t = self._trb
+        h = t[_H].to_numpy()
+        n_ig = h.sum(axis=1)
+        out = t[["n"]].copy()
+        out["IG_min"] = t["ig_min"]
+        out["IG_max"] = t["ig_max"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["IG_médio"] = t["ig_soma"] / n_ig
+        cdf = h.cumsum(axis=1)
+        for q in quantis:
+            out[f"IG_p{int(q * 100)}"] = np.where(n_ig > 0, (cdf < q * n_ig[:, None]).sum(axis=1), np.nan)
+        out["limitrofes"] = t["limitrofes"]
+        return out.reset_index().rename(columns={"grupo": "Grupo_TRB"})
+
+    def crosstab(self, por_chave=False):
+        """Tabela cruzada SUCS × TRB (contagens); por_chave=True mantém projeto/técnico no índice."""
+        if self._cruz is None:
+            return pd.DataFrame()
+        s = self._cruz["n"]
+        if not por_chave:
+            s = s.groupby(level=["SUCS", "TRB"]).sum()
+            return s.unstack("TRB", fill_value=0)
+        return s.unstack("TRB", fill_value=0)
+
+    def totals_by_group(self, sistema="trb"):
+        """Totais por grupo somando todas as chaves (para painéis)."""
+        t = self.trb_table() if sistema == "trb" else self.sucs_table()
+        col = "Grupo_TRB" if sistema == "trb" else "grupo"
+        if t.empty:
+            return t
+        return t.groupby(col)[["n", "limitrofes"]].sum()
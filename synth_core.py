@@ -0,0 +1,248 @@
+# synth_core.py
+# Gerador de dados sintéticos (reprodutível por semente) nos esquemas de lote
+# SUCS e TRB, para testes de carga e de escala. Cada amostra nasce de um solo
+# "latente" (curva granulométrica + plasticidade coerentes entre si) e é
+# projetada no esquema pedido; assim o mesmo lote pode alimentar SUCS e TRB.
+#
+# Controles: mistura de famílias de solo, taxa de valores ausentes, inválidos
+# e limítrofes (entradas encostadas num limite de decisão). A escrita é feita
+# em pedaços (CSV, XLSX ou Parquet) para chegar a 10^7 linhas com memória fixa.
+
+import numpy as np
+import pandas as pd
+
+from export_core import XLSX_MAX_ROWS, ChunkWriter, format_of
+from rules_defs import SUCS_LIMITES, TRB_LIMITES
+
+# Família -> peso padrão na mistura
+FAMILIAS = {
+    "pedregulho": 0.15,
+    "areia": 0.30,
+    "silte": 0.20,
+    "argila": 0.28,
+    "organico": 0.07,
+}
+
+SUCS_COLS = ["projeto", "tecnico", "amostra", "pct_retido_200", "pct_pedregulho_coarse",
+             "pct_areia_coarse", "LL", "LP", "Cu", "Cc", "organico", "turfa"]
+TRB_COLS = ["Nome do projeto", "Técnico responsável", "Código da amostra",
+            "P10", "P40", "P200", "LL", "LP", "NP"]
+
+CHUNK_ROWS = 200_000
+
+_A = SUCS_LIMITES["linha_A_incl"]
+_A0 = SUCS_LIMITES["linha_A_LL0"]
+
+
+def _mistura(mix):
+    pesos = dict(FAMILIAS)
+    if mix:
+        desconhecidas = set(mix) - set(FAMILIAS)
+        if desconhecidas:
+            raise ValueError(f"famílias desconhecidas: {sorted(desconhecidas)} (use {list(FAMILIAS)})")
+        pesos = {k: float(mix.get(k, 0.0)) for k in FAMILIAS}
+    p = np.array(list(pesos.values()), dtype=float)
+    if p.sum() <= 0:
+        raise ValueError("mix precisa de ao menos um peso positivo")
+    return list(pesos), p / p.sum()
+
+
+def latent_soils(n, rng, mix=None):
+    """
+    n solos latentes: % passante em #4, #10, #40 e #200 (monótonos), LL, IP,
+    Cu/Cc (só grossos com poucos finos), orgânico/turfa e a família sorteada.
+    """
+    nomes, p = _mistura(mix)
+    fam = rng.choice(len(nomes), size=n, p=p)
+    u = rng.random
+
+    p200 = np.empty(n)
+    p4 = np.empty(n)
+    ll = np.empty(n)
+    ip = np.empty(n)
+
+    def sel(nome):
+        return np.flatnonzero(fam == nomes.index(nome))
+
+    # grossos: finos baixos; pedregulho com #4 baixo, areia com #4 alto
+    for nome, f200, f4 in (("pedregulho", (0, 30), (0.05, 0.55)), ("areia", (0, 40), (0.6, 0.99))):
+        i = sel(nome)
+        p200[i] = f200[0] + (f200[1] - f200[0]) * rng.beta(1.2, 3.0, i.size)
+        p4[i] = p200[i] + (100 - p200[i]) * rng.uniform(*f4, i.size)
+        ll[i] = np.clip(rng.normal(30, 8, i.size), 15, 70)
+        ip[i] = np.clip(_A * (ll[i] - _A0) + rng.normal(0, 5, i.size), 0, None)
+    # finos
+    for nome, f200, llm, lls, lado in (("silte", (51, 99), 38, 10, -1),
+                                        ("argila", (51, 99), 45, 15, +1),
+                                        ("organico", (60, 99), 65, 15, -1)):
+        i = sel(nome)
+        p200[i] = rng.uniform(*f200, i.size)
+        p4[i] = p200[i] + (100 - p200[i]) * rng.uniform(0.7, 1.0, i.size)
+        ll[i] = np.clip(rng.normal(llm, lls, i.size), 18, 160)
+        ip[i] = np.clip(_A * (ll[i] - _A0) + lado * np.abs(rng.normal(5, 4, i.size)), 0, ll[i] - 5)
+
+    p10 = p200 + (p4 - p200) * rng.uniform(0.7, 0.99, n)
+    p40 = p200 + (p10 - p200) * rng.uniform(0.3, 0.95, n)
+
+    # graduação: Cu/Cc só faz sentido para grossos limpos/limítrofes
+    grosso = p200 < SUCS_LIMITES["finos_limitrofe_max"]
+    bem = u(n) < 0.45
+    cu = np.where(bem, rng.lognormal(np.log(12), 0.5, n), rng.lognormal(np.log(3), 0.4, n))
+    cc = np.where(bem, rng.uniform(SUCS_LIMITES["cc_min"], SUCS_LIMITES["cc_max"], n),
+                  np.where(u(n) < 0.5, rng.uniform(0.2, 0.95, n), rng.uniform(3.1, 6, n)))
+    cu = np.where(grosso, np.round(cu, 1), np.nan)
+    cc = np.where(grosso, np.round(cc, 2), np.nan)
+
+    organico = fam == nomes.index("organico")
+    turfa = organico & (u(n) < 0.15)
+    np_ = (ip < 1.0) & (u(n) < 0.8)  # não plástico
+    ip = np.where(np_, 0.0, ip)
+
+    r1 = lambda x: np.round(x, 1)
+    return pd.DataFrame({
+        "familia": np.array(nomes, dtype=object)[fam],
+        "P4": r1(p4), "P10": r1(p10), "P40": r1(p40), "P200": r1(p200),
+        "LL": r1(ll), "IP": r1(ip), "NP": np_,
+        "Cu": cu, "Cc": cc, "organico": organico, "turfa": turfa,
+    })
+
+
+def _limitrofes(lat, rng, taxa, sistema):
+    """Encosta uma entrada de parte das linhas num limite de decisão (± 0,5)."""
+    n = len(lat)
+    m = rng.random(n) < taxa
+    if not m.any():
+        return
+    i = np.flatnonzero(m)
+    ruido = rng.uniform(-0.5, 0.5, i.size)
+    cortes = []
+    if sistema in ("sucs", "ambos"):
+        L = SUCS_LIMITES
+        cortes += [("P200", 100 - L["grossa_ret200_min"]), ("P200", L["finos_limpo_max"]),
+                   ("P200", L["finos_limitrofe_max"]), ("LL", L["ll_alto_min"]), ("IP", None)]
+    if sistema in ("trb", "ambos"):
+        L = TRB_LIMITES
+        cortes += [("P200", L["granular_p200_max"]), ("LL", L["a1_ll_max"]),
+                   ("IP", (L["ip_silte_max"] + L["ip_argila_min"]) / 2), ("P200", L["a3_p200_max"])]
+    alvo = rng.integers(0, len(cortes), i.size)
+    for k, (col, v) in enumerate(cortes):
+        j = i[alvo == k]
+        if col == "IP" and v is None:  # sobre a linha A
+            v = _A * (lat["LL"].to_numpy()[j] - _A0)
+        lat.loc[j, col] = np.clip(np.round(v + ruido[alvo == k], 1), 0, 100 if col.startswith("P") else None)
+        lat.loc[j, "NP"] = False
+    # mantém as peneiras em ordem depois de mexer no #200
+    for a, b in (("P40", "P200"), ("P10", "P40"), ("P4", "P10")):
+        lat[a] = np.maximum(lat[a], lat[b])
+
+
+def _projetar(lat, sistema, ids, projeto, tecnico):
+    if sistema in ("sucs", "ambos"):
+        grossa = 100 - lat["P200"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pg = np.where(grossa > 0, (100 - lat["P4"]) / grossa * 100, 0)
+        pg = np.round(np.clip(pg, 0, 100), 1)
+        ret = np.round(grossa, 1)
+        fino = ret < SUCS_LIMITES["grossa_ret200_min"]  # mesmo critério (≥ 50% retido = grossa) do SUCS
+        sucs = pd.DataFrame({
+            "projeto": projeto, "tecnico": tecnico, "amostra": ids,
+            "pct_retido_200": ret,
+            "pct_pedregulho_coarse": np.where(fino, 0, pg),
+            "pct_areia_coarse": np.where(fino, 0, np.round(100 - pg, 1)),
+            "LL": lat["LL"], "LP": np.round(lat["LL"] - lat["IP"], 1),
+            "Cu": lat["Cu"], "Cc": lat["Cc"],
+            "organico": lat["organico"], "turfa": lat["turfa"],
+        })
+    if sistema in ("trb", "ambos"):
+        trb = pd.DataFrame({
+            "Nome do projeto": projeto, "Técnico responsável": tecnico, "Código da amostra": ids,
+            "P10": lat["P10"], "P40": lat["P40"], "P200": lat["P200"],
+            "LL": np.where(lat["NP"], 0.0, lat["LL"]),
+            "LP": np.where(lat["NP"], 0.0, np.round(lat["LL"] - lat["IP"], 1)),
+            "NP": lat["NP"],
+        })
+    if sistema == "sucs":
+        return sucs
+    if sistema == "trb":
+        return trb
+    return pd.concat([sucs, trb[["P10", "P40", "P200", "NP"]]], axis=1)
+
+
+def _sujar(df, rng, sistema, ausentes, invalidos):
+    """Aplica inválidos (peneiras fora de ordem, LP > LL, % fora de 0–100) e ausentes (NaN)."""
+    n = len(df)
+    num = {"sucs": ["LL", "LP", "Cu", "Cc", "pct_retido_200"],
+           "trb": ["P10", "P40", "P200", "LL", "LP"],
+           "ambos": ["LL", "LP", "Cu", "Cc", "pct_retido_200", "P10", "P40", "P200"]}[sistema]
+    num = [c for c in num if c in df.columns]
+    # tipos de inconsistência possíveis no esquema: 0 = #200 > #40, 1 = LP > LL, 2 = % fora de 0–100
+    tipos = [1, 2] if sistema == "sucs" else [0, 1, 2]
+    fora = {"sucs": ["pct_retido_200"], "trb": ["P200"], "ambos": ["pct_retido_200", "P200"]}[sistema]
+    i = np.flatnonzero(rng.random(n) < invalidos) if invalidos > 0 else np.empty(0, dtype=int)
+    if i.size:
+        tipo = rng.choice(tipos, i.size)
+        j = i[tipo == 0]  # (troca simples falharia com #40 = #200)
+        if j.size:
+            df.loc[j, "P200"] = np.minimum(100.0, df.loc[j, "P40"].to_numpy() + rng.uniform(1, 10, j.size)).round(1)
+            df.loc[j, "P40"] = np.minimum(df.loc[j, "P40"].to_numpy(), df.loc[j, "P200"].to_numpy() - 0.1).round(1)
+        j = i[tipo == 1]
+        if "NP" in df.columns:
+            df.loc[j, "NP"] = False
+        df.loc[j, "LP"] = df.loc[j, "LL"] + rng.uniform(1, 10, j.size).round(1)
+        j = i[tipo == 2]
+        col = np.asarray(fora, dtype=object)[rng.integers(0, len(fora), j.size)]
+        val = np.where(rng.random(j.size) < 0.5, -rng.uniform(1, 10, j.size), 100 + rng.uniform(1, 10, j.size)).round(1)
+        for c in fora:
+            df.loc[j[col == c], c] = val[col == c]
+    if ausentes > 0:
+        intactas = np.ones(n, dtype=bool)
+        intactas[i] = False  # não apaga a inconsistência das linhas inválidas
+        for c in num:
+            m = (rng.random(n) < ausentes) & intactas
+            if m.any():
+                df[c] = df[c].astype(float).mask(m)
+    return df
+
+
+def generate(n, sistema="sucs", seed=None, mix=None, ausentes=0.0, invalidos=0.0, limitrofes=0.0,
+             projeto="Sintético", tecnico="Gerador", inicio=0, _rng=None):
+    """
+    Gera n amostras no esquema 'sucs', 'trb' ou 'ambos' (colunas dos dois).
+
+    mix:        pesos por família (ver FAMILIAS), ex. {"argila": 3, "areia": 1}
+    ausentes:   fração esperada de entradas numéricas em branco (fora das linhas inválidas)
+    invalidos:  fração de linhas com dado inconsistente
+    limitrofes: fração de linhas com uma entrada a ±0,5 de um limite de decisão
+    """
+    if sistema not in ("sucs", "trb", "ambos"):
+        raise ValueError(f"sistema desconhecido: {sistema!r} (use 'sucs', 'trb' ou 'ambos')")
+    rng = _rng if _rng is not None else np.random.default_rng(seed)
+    lat = latent_soils(n, rng, mix)
+    _limitrofes(lat, rng, limitrofes, sistema)
+    ids = np.char.add("S", np.char.zfill(np.arange(inicio + 1, inicio + n + 1).astype(str), 8))
+    df = _projetar(lat, sistema, ids, projeto, tecnico)
+    return _sujar(df, rng, sistema, ausentes, invalidos)
+
+
+def iter_chunks(n, sistema="sucs", seed=None, chunk_rows=CHUNK_ROWS, **kw):
+    """Gera o mesmo conjunto em pedaços; cada pedaço tem seu fluxo aleatório derivado da semente."""
+    filhos = np.random.SeedSequence(seed).spawn(-(-n // chunk_rows) or 1)
+    for k, ss in enumerate(filhos):
+        ini = k * chunk_rows
+        m = min(chunk_rows, n - ini)
+        if m <= 0:
+            break
+        yield generate(m, sistema, inicio=ini, _rng=np.random.default_rng(ss), **kw)
+
+
+def write_dataset(path, n, sistema="sucs", seed=None, chunk_rows=CHUNK_ROWS, **kw):
+    """
+    Escreve n linhas em path (.csv, .xlsx ou .parquet) pedaço a pedaço
+    (ver export_core.ChunkWriter). Retorna o número de linhas escritas.
+    """
+    if format_of(path) == "xlsx" and n > XLSX_MAX_ROWS:
+        raise ValueError(f"XLSX comporta no máximo {XLSX_MAX_ROWS} linhas de dados por planilha")
+    with ChunkWriter(path) as w:
+        for df in iter_chunks(n, sistema, seed, chunk_rows, **kw):
+            w.write(df)
+    return w.rows
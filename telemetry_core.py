@@ -0,0 +1,393 @@
+# telemetry_core.py
+# Telemetria de recursos por upload e por sessão nos apps (pico de RSS,
+# memória dos DataFrames de entrada e resultado, taxa de classificação,
+# tamanho das exportações) e limites de carga: acima de um nº de linhas ou de
+# memória estimada o lote segue pelo caminho em pedaços (motor vetorizado,
+# relatório sob demanda); muito acima, o upload é recusado antes de ser lido.
+#
+# Cada job gera uma linha de log JSON (logger "soilclass.telemetria") e fica
+# num registro em memória do processo, visto no painel de administração.
+# Limites via variáveis de ambiente SOILCLASS_* (ver Limits.from_env).
+
+import io
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import pandas as pd
+
+LOGGER = "soilclass.telemetria"
+REGISTRO_MAX = 500
+_REGISTRO = deque(maxlen=REGISTRO_MAX)  # jobs de todas as sessões deste processo
+_LOCK = threading.Lock()
+
+MB = 1024 * 1024
+# memória de DataFrame por byte do arquivo (estimativa antes da leitura)
+FATOR_CSV = 4.0
+BYTES_CELULA_XLSX = 48
+
+
+# ---------------------------------------------------------------------------
+# Memória do processo
+# ---------------------------------------------------------------------------
+
+def current_rss():
+    """RSS atual do processo em bytes (None se a plataforma não informar)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil  # type: ignore
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return None
+
+
+def peak_rss():
+    """Maior RSS do processo desde o início, em bytes (None sem o módulo resource)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024  # Linux informa em KiB
+
+
+def frame_bytes(df):
+    """Memória de um DataFrame em bytes, incluindo o conteúdo das strings."""
+    return int(df.memory_usage(deep=True, index=True).sum()) if df is not None else 0
+
+
+class _RssSampler(threading.Thread):
+    """Amostra o RSS em intervalos curtos; o pico do processo (ru_maxrss) não separa jobs."""
+
+    def __init__(self, intervalo=0.02):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.inicio = current_rss()
+        self.pico = self.inicio or 0
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            r = current_rss()
+            if r is not None and r > self.pico:
+                self.pico = r
+
+    def stop(self):
+        self._parar.set()
+        self.join()
+        r = current_rss()
+        if r is not None and r > self.pico:
+            self.pico = r
+        return self.pico
+
+
+# ---------------------------------------------------------------------------
+# Limites
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Limits:
+    """
+    Limites por upload. Acima de max_linhas ou max_mem_mb (memória estimada da
+    entrada): caminho em pedaços de linhas_pedaco. Acima de rejeitar_linhas ou
+    rejeitar_mem_mb: upload recusado. 0 desliga o limite.
+    """
+    max_linhas: int = 200_000
+    max_mem_mb: float = 512.0
+    rejeitar_linhas: int = 5_000_000
+    rejeitar_mem_mb: float = 4096.0
+    linhas_pedaco: int = 50_000
+
+    @classmethod
+    def from_env(cls, env=None):
+        """SOILCLASS_MAX_LINHAS, SOILCLASS_MAX_MEM_MB, SOILCLASS_REJEITAR_LINHAS, SOILCLASS_REJEITAR_MEM_MB, SOILCLASS_LINHAS_PEDACO."""
+        env = os.environ if env is None else env
+        kw = {}
+        for campo, tipo in (("max_linhas", int), ("max_mem_mb", float), ("rejeitar_linhas", int),
+                            ("rejeitar_mem_mb", float), ("linhas_pedaco", int)):
+            v = env.get(f"SOILCLASS_{campo.upper()}")
+            if v not in (None, ""):
+                try:
+                    kw[campo] = tipo(v)
+                except ValueError:
+                    raise ValueError(f"SOILCLASS_{campo.upper()} inválido: {v!r}") from None
+        lim = cls(**kw)
+        if lim.linhas_pedaco <= 0:
+            raise ValueError("SOILCLASS_LINHAS_PEDACO deve ser positivo")
+        return lim
+
+    def decide(self, linhas, mem_bytes):
+        """('completo' | 'pedacos' | 'rejeitar', motivo) para a estimativa do upload."""
+        mem_mb = (mem_bytes or 0) / MB
+        if self.rejeitar_linhas and linhas > self.rejeitar_linhas:
+            return "rejeitar", f"{linhas} linhas (limite {self.rejeitar_linhas})"
+        if self.rejeitar_mem_mb and mem_mb > self.rejeitar_mem_mb:
+            return "rejeitar", f"~{mem_mb:.0f} MB estimados (limite {self.rejeitar_mem_mb:.0f} MB)"
+        if self.max_linhas and linhas > self.max_linhas:
+            return "pedacos", f"{linhas} linhas > {self.max_linhas}"
+        if self.max_mem_mb and mem_mb > self.max_mem_mb:
+            return "pedacos", f"~{mem_mb:.0f} MB estimados > {self.max_mem_mb:.0f} MB"
+        return "completo", ""
+
+
+def estimate_upload(nome, dados):
+    """
+    (linhas, memória estimada em bytes) de um upload, sem montar o DataFrame:
+    CSV conta quebras de linha; XLSX lê as dimensões de cada planilha e, se
+    faltarem (ou vierem só como "A1", comum em arquivos gerados por outros
+    programas), conta as linhas lendo a planilha.
+    """
+    if str(nome).lower().endswith(".xlsx"):
+        from xlsx_core import _open
+        wb = _open(bytes(dados))
+        try:
+            linhas = celulas = 0
+            for ws in wb.worksheets:
+                r, c = ws.max_row or 0, ws.max_column or 0
+                if r <= 1 or c == 0:
+                    ws.reset_dimensions()  # sem isso iter_rows para na dimensão declarada
+                    r = c = 0
+                    for row in ws.iter_rows(values_only=True):
+                        r += 1
+                        c = max(c, len(row))
+                linhas += max(0, r - 1)
+                celulas += max(0, r - 1) * c
+        finally:
+            wb.close()
+        return linhas, celulas * BYTES_CELULA_XLSX
+    n = dados.count(b"\n")
+    if dados and not dados.endswith(b"\n"):
+        n += 1
+    return max(0, n - 1), int(len(dados) * FATOR_CSV)
+
+
+def iter_upload_chunks(nome, dados, chunk_rows):
+    """Lê um upload (CSV com separador , ou ;, ou XLSX com todas as planilhas) em pedaços."""
+    if str(nome).lower().endswith(".xlsx"):
+        from xlsx_core import SHEET_COL, iter_sheet_chunks
+        for planilha, df in iter_sheet_chunks(bytes(dados), chunk_rows=chunk_rows):
+            df.insert(0, SHEET_COL, planilha)
+            yield df
+        return
+    head = bytes(dados[:4096]).decode("utf-8-sig", errors="ignore")
+    sep = ";" if head.count(";") > head.count(",") else ","
+    yield from pd.read_csv(io.BytesIO(dados), sep=sep, encoding="utf-8-sig", chunksize=chunk_rows)
+
+
+# ---------------------------------------------------------------------------
+# Job
+# ---------------------------------------------------------------------------
+
+def _logger():
+    log = logging.getLogger(LOGGER)
+    if not log.handlers:  # o Streamlit não configura o root para INFO
+        h = logging.StreamHandler(sys.stderr)
+        h.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(h)
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+
+class JobTelemetry:
+    """
+    Medições de um upload. Use como gerenciador de contexto (o amostrador de
+    RSS roda enquanto o job está aberto; um erro dentro do bloco é logado na
+    saída) e marque as etapas com etapa(nome):
+
+        with JobTelemetry("trb", sessao, up.name, up.size) as tel:
+            with tel.etapa("leitura"):
+                df = ...
+            tel.input(df)
+        tel.export("csv", dados)
+        publish(tel, st.session_state, chave)
+    """
+
+    def __init__(self, app, sessao, arquivo, tamanho, modo="completo"):
+        self.dados = {
+            "job": uuid.uuid4().hex[:12], "app": app, "sessao": sessao, "arquivo": arquivo,
+            "upload_bytes": int(tamanho or 0), "modo": modo, "motivo": "", "status": "ok",
+            "linhas": 0, "pedacos": 0, "mem_entrada_bytes": 0, "mem_resultado_bytes": 0,
+            "etapas_s": {}, "exportacoes_bytes": {},
+        }
+        self._amostrador = None
+        self._t0 = None
+
+    def __enter__(self):
+        return self.start()
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._amostrador = _RssSampler()
+        self._amostrador.start()
+        return self
+
+    def __exit__(self, tipo, exc, tb):
+        self.close()
+        if exc is not None:  # job interrompido: registra e loga já, com o erro
+            self.dados["status"] = f"erro: {type(exc).__name__}: {exc}"
+            _emit(self.dados)
+
+    @contextmanager
+    def etapa(self, nome):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            e = self.dados["etapas_s"]
+            e[nome] = e.get(nome, 0.0) + time.perf_counter() - t0
+
+    def timed_chunks(self, pedacos, etapa="leitura"):
+        """Repassa os pedaços de um leitor, cronometrando a leitura e registrando a entrada."""
+        it = iter(pedacos)
+        while True:
+            with self.etapa(etapa):
+                df = next(it, None)
+            if df is None:
+                return
+            self.input(df)
+            yield df
+
+    def input(self, df):
+        """Acumula linhas e memória da entrada (chame uma vez por pedaço)."""
+        self.dados["linhas"] += len(df)
+        self.dados["pedacos"] += 1
+        self.dados["mem_entrada_bytes"] += frame_bytes(df)
+
+    def result(self, df):
+        self.dados["mem_resultado_bytes"] += frame_bytes(df)
+
+    def export(self, nome, dados):
+        """Tamanho de uma exportação (bytes, str ou BytesIO)."""
+        if isinstance(dados, io.BytesIO):
+            n = dados.getbuffer().nbytes
+        elif isinstance(dados, str):
+            n = len(dados.encode("utf-8"))
+        else:
+            n = len(dados)
+        self.dados["exportacoes_bytes"][nome] = n
+
+    def set_mode(self, modo, motivo=""):
+        self.dados["modo"], self.dados["motivo"] = modo, motivo
+
+    def close(self):
+        if self._amostrador is None:
+            return self.dados
+        pico = self._amostrador.stop()
+        inicio = self._amostrador.inicio
+        self._amostrador = None
+        d = self.dados
+        total = time.perf_counter() - self._t0
+        d["segundos"] = round(total, 4)
+        d["etapas_s"] = {k: round(v, 4) for k, v in d["etapas_s"].items()}
+        cls = d["etapas_s"].get("classificacao")
+        d["linhas_s"] = round(d["linhas"] / cls, 1) if cls else None
+        d["rss_inicio_bytes"] = inicio
+        d["rss_pico_bytes"] = pico or None
+        d["rss_pico_processo_bytes"] = peak_rss()
+        d["ts"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        return d
+
+
+def session_id(state):
+    """Identificador curto da sessão (guardado no session_state do Streamlit)."""
+    return state.setdefault("telemetria_sessao", uuid.uuid4().hex[:8])
+
+
+def _emit(d, evento="job"):
+    with _LOCK:
+        _REGISTRO.append(d)
+    _logger().info(json.dumps({"evento": evento, **d}, ensure_ascii=False, default=str))
+
+
+def publish(tel, state, chave):
+    """
+    Registra o job uma única vez por upload (chave) e sessão: o Streamlit
+    reexecuta o script a cada interação, e só a primeira execução é logada.
+    """
+    jobs = state.setdefault("telemetria_jobs", {})
+    if chave in jobs:
+        return False
+    jobs[chave] = tel.close()
+    _emit(jobs[chave])
+    return True
+
+
+def publish_export(state, chave, nome, dados):
+    """Exportação gerada depois do job (ex.: ZIP de relatórios): soma ao registro e loga."""
+    d = state.get("telemetria_jobs", {}).get(chave)
+    if d is None:
+        return
+    t = JobTelemetry(d["app"], d["sessao"], d["arquivo"], 0)
+    t.export(nome, dados)
+    d["exportacoes_bytes"][nome] = t.dados["exportacoes_bytes"][nome]
+    _logger().info(json.dumps({"evento": "exportacao", "job": d["job"], "sessao": d["sessao"], "nome": nome,
+                               "bytes": d["exportacoes_bytes"][nome]}, ensure_ascii=False))
+
+
+def jobs_frame(jobs=None):
+    """Tabela dos jobs (padrão: todas as sessões do processo), mais recentes primeiro."""
+    if jobs is None:
+        with _LOCK:
+            jobs = list(_REGISTRO)
+    if not jobs:
+        return pd.DataFrame()
+    linhas = []
+    for d in reversed(list(jobs)):
+        r = {k: v for k, v in d.items() if k not in ("etapas_s", "exportacoes_bytes")}
+        for k, v in d.get("etapas_s", {}).items():
+            r[f"{k}_s"] = v
+        r["exportacoes_bytes"] = sum(d.get("exportacoes_bytes", {}).values())
+        for k in [c for c in r if c.endswith("_bytes")]:
+            v = r.pop(k)
+            r[k[:-6] + "_MB"] = round(v / MB, 2) if v is not None else None
+        linhas.append(r)
+    return pd.DataFrame(linhas)
+
+
+# ---------------------------------------------------------------------------
+# Painel (Streamlit)
+# ---------------------------------------------------------------------------
+
+def admin_enabled(query_params, env=None):
+    """Painel visível com SOILCLASS_ADMIN=1, ou com ?admin=<SOILCLASS_ADMIN_TOKEN> na URL."""
+    env = os.environ if env is None else env
+    if env.get("SOILCLASS_ADMIN") == "1":
+        return True
+    token = env.get("SOILCLASS_ADMIN_TOKEN")
+    return bool(token) and query_params.get("admin") == token
+
+
+def show_admin_panel(limites=None):
+    """Painel de telemetria na barra lateral: processo, limites, jobs desta sessão e de todas."""
+    import streamlit as st
+
+    if not admin_enabled(st.query_params):
+        return
+    limites = limites or Limits.from_env()
+    with st.sidebar.expander("Telemetria (admin)"):
+        rss, pico = current_rss(), peak_rss()
+        c1, c2 = st.columns(2)
+        c1.metric("RSS atual", f"{rss / MB:.0f} MB" if rss else "—")
+        c2.metric("Pico do processo", f"{pico / MB:.0f} MB" if pico else "—")
+        st.caption(" · ".join(f"{k}={v}" for k, v in asdict(limites).items()))
+        sessao = session_id(st.session_state)
+        st.markdown("**Esta sessão**")
+        st.dataframe(jobs_frame(st.session_state.get("telemetria_jobs", {}).values()),
+                     use_container_width=True)
+        st.markdown("**Todas as sessões** (últimos jobs do processo)")
+        todos = jobs_frame()
+        st.dataframe(todos, use_container_width=True)
+        if not todos.empty:
+            st.caption(f"sessão atual: {sessao}")
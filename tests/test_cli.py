@@ -0,0 +1,103 @@
+# Linha de comando: nomes de saída, colunas obrigatórias e vigia de pasta.
+
+import json
+import os
+import shutil
+import socket
+
+import pandas as pd
+import pytest
+
+import cli
+from cli import ERROS, PROCESSADOS, PROCESSANDO, REGISTRO, check_columns, output_name, watch
+from synth_core import generate
+
+
+def test_output_name_sem_colisao():
+    assert output_name("dados/lote.csv", "out", "trb", "csv") == os.path.join("out", "lote_trb.csv")
+
+
+def test_output_name_mesmo_nome_com_extensoes_diferentes():
+    usados = set()
+    a = output_name("dados/lote.csv", "out", "trb", "csv", usados)
+    b = output_name("dados/lote.xlsx", "out", "trb", "csv", usados)
+    c = output_name("outra/lote.csv", "out", "trb", "csv", usados)
+    d = output_name("mais/lote.csv", "out", "trb", "csv", usados)
+    assert len({a, b, c, d}) == 4
+    assert b == os.path.join("out", "lote_xlsx_trb.csv")
+    assert d == os.path.join("out", "lote_csv_trb.2.csv")
+
+
+def test_output_name_nao_sobrescreve_saida_existente(tmp_path):
+    (tmp_path / "lote_sucs.csv").write_text("x")
+    assert output_name("lote.csv", str(tmp_path), "sucs", "csv") == str(tmp_path / "lote_sucs.csv")
+    assert output_name("lote.csv", str(tmp_path), "sucs", "csv", sobrescrever=False) == \
+        str(tmp_path / "lote_csv_sucs.csv")
+
+
+# ---------------------------------------------------------------------------
+# Colunas obrigatórias
+# ---------------------------------------------------------------------------
+
+def test_check_columns():
+    check_columns(pd.DataFrame(columns=["pct_retido_200"]), "sucs")
+    check_columns(pd.DataFrame(columns=["P10", "P40", "P200", "NP"]), "trb")  # NP dispensa LL e LP
+    with pytest.raises(ValueError, match="P40"):
+        check_columns(pd.DataFrame(columns=["P10", "P200", "LL", "LP"]), "trb")
+    with pytest.raises(ValueError, match="pct_retido_200"):
+        check_columns(pd.DataFrame(columns=["P10", "P40", "P200", "LL", "LP"]), "ambos")
+
+
+# ---------------------------------------------------------------------------
+# Vigia: reservas, registro e pastas de saída
+# ---------------------------------------------------------------------------
+
+def _vigiar(inbox, saida, sistema="trb"):
+    msgs = []
+    n = watch(str(inbox), str(saida), sistema, uma_vez=True, log=msgs.append)
+    return n, msgs
+
+
+def test_vigia_processa_registra_e_nao_repete(tmp_path):
+    inbox, saida = tmp_path / "entrada", tmp_path / "saida"
+    inbox.mkdir()
+    generate(50, "trb", seed=1).to_csv(inbox / "lote.csv", index=False)
+    n, _ = _vigiar(inbox, saida)
+    assert n == 1
+    assert len(pd.read_csv(saida / "lote_trb.csv")) == 50
+    assert (inbox / PROCESSADOS / "lote.csv").exists() and not (inbox / "lote.csv").exists()
+    registro = [json.loads(l) for l in (saida / REGISTRO).read_text(encoding="utf-8").splitlines()]
+    assert [r["arquivo"] for r in registro] == ["lote.csv"] and registro[0]["linhas"] == 50
+
+    # mesmo conteúdo de novo: ignorado pelo registro, sem nova saída
+    shutil.copy(inbox / PROCESSADOS / "lote.csv", inbox / "lote.csv")
+    n, msgs = _vigiar(inbox, saida)
+    assert n == 0 and any("já processado" in m for m in msgs)
+    assert sorted(os.listdir(saida)) == sorted([REGISTRO, "lote_trb.csv"])
+
+
+def test_vigia_arquivo_de_outro_esquema_vai_para_erros(tmp_path):
+    inbox, saida = tmp_path / "entrada", tmp_path / "saida"
+    inbox.mkdir()
+    generate(20, "sucs", seed=1).to_csv(inbox / "sucs.csv", index=False)
+    n, _ = _vigiar(inbox, saida)
+    assert n == 0
+    assert (inbox / ERROS / "sucs.csv").exists()
+    assert "P10" in (inbox / ERROS / "sucs.csv.erro.txt").read_text(encoding="utf-8")
+
+
+def test_vigia_retoma_so_reservas_orfas_desta_maquina(tmp_path, monkeypatch):
+    inbox, saida = tmp_path / "entrada", tmp_path / "saida"
+    proc = inbox / PROCESSANDO
+    proc.mkdir(parents=True)
+    host = socket.gethostname()
+    lote = generate(10, "trb", seed=2)
+    lote.to_csv(proc / f"111@{host}--orfa.csv", index=False)       # vigia encerrado
+    lote.to_csv(proc / f"222@{host}--ativa.csv", index=False)      # vigia ainda rodando
+    lote.to_csv(proc / "333@outra-maquina--remota.csv", index=False)
+    monkeypatch.setattr(cli, "_vivo", lambda pid: pid == 222)
+    n, _ = _vigiar(inbox, saida)
+    assert n == 1
+    assert (saida / "orfa_trb.csv").exists()
+    assert (inbox / PROCESSADOS / "orfa.csv").exists()
+    assert sorted(os.listdir(proc)) == [f"222@{host}--ativa.csv", "333@outra-maquina--remota.csv"]
@@ -0,0 +1,60 @@
+# Comparação entre campanhas: incluídas, removidas, alteradas e colisão de hash.
+
+import numpy as np
+import pandas as pd
+
+import diff_core
+from diff_core import diff_files, diff_frames
+
+
+def _campanhas():
+    antes = pd.DataFrame({
+        "projeto": ["P", "P", "P", "P"],
+        "amostra": ["a1", "a2", "a3", "a4"],
+        "grupo": ["CL", "SM", "GW", "ML"],
+        "Grupo_TRB": ["A-6", "A-2-4", "A-1-a", "A-4"],
+        "IG": [8, 0, 0, 3],
+    })
+    depois = pd.DataFrame({
+        "projeto": ["P", "P", "P", "P"],
+        "amostra": ["a1", "a2", "a4", "a5"],
+        "grupo": ["CL", "SC", "ML", "CH"],
+        "Grupo_TRB": ["A-6", "A-2-6", "A-4", "A-7-6"],
+        "IG": [8, 0, 5, 20],
+    })
+    return antes, depois
+
+
+def _status(res):
+    return dict(zip(res.changes["amostra"], res.changes["status"]))
+
+
+def test_incluidas_removidas_alteradas():
+    res = diff_frames(*_campanhas())
+    assert _status(res) == {"a2": "alterada", "a3": "removida", "a4": "alterada", "a5": "incluída"}
+    s = res.summary()
+    assert (s["incluída"], s["removida"], s["alterada"]) == (1, 1, 2)
+    assert res.transitions("grupo").loc["SM", "SC"] == 1
+
+
+def test_diff_files_igual_a_diff_frames(tmp_path):
+    antes, depois = _campanhas()
+    antes.to_csv(tmp_path / "a.csv", index=False)
+    depois.to_csv(tmp_path / "b.csv", index=False)
+    r = diff_files(str(tmp_path / "a.csv"), str(tmp_path / "b.csv"), particoes=3, chunk_rows=2)
+    assert _status(r) == _status(diff_frames(antes, depois))
+
+
+def test_colisao_de_hash_nao_junta_amostras_diferentes(monkeypatch):
+    # todas as chaves com o mesmo hash: a junção ainda precisa separar as amostras
+    compact = diff_core._compact
+
+    def colide(df, chave):
+        c = compact(df, chave)
+        c["_h"] = np.uint64(7)
+        return c
+
+    monkeypatch.setattr(diff_core, "_compact", colide)
+    res = diff_frames(*_campanhas())
+    assert _status(res) == {"a2": "alterada", "a3": "removida", "a4": "alterada", "a5": "incluída"}
+    assert res.duplicadas == (0, 0)
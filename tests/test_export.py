@@ -0,0 +1,41 @@
+# Gravação em pedaços: alinhamento de colunas ao cabeçalho do primeiro pedaço.
+
+import pandas as pd
+import pytest
+
+from export_core import ChunkWriter
+
+
+def test_pedacos_alinhados_ao_cabecalho(tmp_path):
+    p = tmp_path / "out.csv"
+    with ChunkWriter(str(p)) as w:
+        w.write(pd.DataFrame({"a": [1], "b": ["x"], "c": [1.5]}))
+        w.write(pd.DataFrame({"c": [2.5], "a": [2]}))  # outra ordem, sem 'b'
+    out = pd.read_csv(p)
+    assert list(out.columns) == ["a", "b", "c"]
+    assert out["a"].tolist() == [1, 2]
+    assert out["c"].tolist() == [1.5, 2.5]
+    assert out["b"].isna().tolist() == [False, True]
+    assert w.rows == 2
+
+
+def test_coluna_fora_do_cabecalho_gera_erro(tmp_path):
+    with ChunkWriter(str(tmp_path / "out.csv")) as w:
+        w.write(pd.DataFrame({"a": [1]}))
+        with pytest.raises(ValueError, match="nova"):
+            w.write(pd.DataFrame({"a": [2], "nova": [3]}))
+
+
+def test_xlsx_alinhado(tmp_path):
+    p = tmp_path / "out.xlsx"
+    with ChunkWriter(str(p)) as w:
+        w.write(pd.DataFrame({"a": [1], "b": ["x"]}))
+        w.write(pd.DataFrame({"b": ["y"], "a": [2]}))
+    out = pd.read_excel(p)
+    assert out.to_dict("list") == {"a": [1, 2], "b": ["x", "y"]}
+
+
+def test_sem_pedacos_cria_arquivo_vazio(tmp_path):
+    p = tmp_path / "vazio.csv"
+    ChunkWriter(str(p)).close()
+    assert p.exists() and p.read_text() == ""
@@ -0,0 +1,65 @@
+# Curva granulométrica: D10/D30/D60, Cu/Cc e planilha de massas.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from gradation_core import characteristic_diameters, gradation_frame, masses_to_inputs
+
+ABERTURAS = [4.75, 2.0, 0.425, 0.075]  # #4, #10, #40, #200
+
+
+def _log_interp(t, d0, p0, d1, p1):
+    return 10 ** (np.log10(d0) + (t - p0) / (p1 - p0) * (np.log10(d1) - np.log10(d0)))
+
+
+def test_interpola_em_log():
+    D = characteristic_diameters(ABERTURAS, [[100, 80, 40, 5]])
+    assert D[0, 0] == pytest.approx(_log_interp(10, 0.075, 5, 0.425, 40))
+    assert D[0, 2] == pytest.approx(_log_interp(60, 0.425, 40, 2.0, 80))
+
+
+def test_peneira_em_branco_no_meio():
+    # #40 em branco: D10/D30/D60 saem da interpolação entre #200 e #10
+    D = characteristic_diameters(ABERTURAS, [[100, 80, np.nan, 5]])
+    esperado = [_log_interp(t, 0.075, 5, 2.0, 80) for t in (10, 30, 60)]
+    assert D[0] == pytest.approx(esperado)
+
+
+def test_igualdade_exata_na_menor_peneira():
+    D = characteristic_diameters(ABERTURAS, [[100, 80, 40, 10]])
+    assert D[0, 0] == pytest.approx(0.075)
+    # menor peneira informada é a #40 (a #200 está em branco)
+    D = characteristic_diameters(ABERTURAS, [[100, 80, 30, np.nan]])
+    assert D[0, 1] == pytest.approx(0.425)
+    assert np.isnan(D[0, 0])
+
+
+def test_alvo_fora_da_curva_sem_extrapolar():
+    D = characteristic_diameters(ABERTURAS, [[100, 90, 70, 20], [50, 40, 30, 20]])
+    assert np.isnan(D[0, 0])     # 20% passa na #200: D10 abaixo da peneira mais fina
+    assert np.isnan(D[1, 2])     # só 50% passa na #4: D60 acima da mais grossa
+    assert not np.isnan(D[1, 1])
+
+
+def test_gradation_frame_cu_cc():
+    df = pd.DataFrame({"#4": [100], "#10": [80], "#40": [40], "#200": [5]})
+    g = gradation_frame(df)
+    assert g["Cu"].iloc[0] == pytest.approx(g["D60"].iloc[0] / g["D10"].iloc[0])
+    assert g["Cc"].iloc[0] == pytest.approx(g["D30"].iloc[0] ** 2 / (g["D10"].iloc[0] * g["D60"].iloc[0]))
+
+
+def test_masses_to_inputs():
+    raw = pd.DataFrame({
+        "projeto": "P", "amostra": ["A"] * 5 + ["B"] * 3,
+        "peneira": ["#4", "#10", "#40", "#200", "fundo", "#10", "#200", "fundo"],
+        "massa_retida": [10, 20, 30, 20, 20, 50, 25, 25],
+    })
+    sucs, trb = masses_to_inputs(raw)
+    a = trb.set_index("amostra")
+    assert a.loc["A", ["P10", "P40", "P200"]].tolist() == pytest.approx([70, 40, 20])
+    assert a.loc["B", "P10"] == pytest.approx(50) and np.isnan(a.loc["B", "P40"])
+    s = sucs.set_index("amostra")
+    assert s.loc["A", "pct_retido_200"] == pytest.approx(80)
+    assert s.loc["A", "pct_pedregulho_coarse"] == pytest.approx(100 * 10 / 80)
+    assert s.loc["A", "pct_areia_coarse"] == pytest.approx(100 * 70 / 80)
@@ -0,0 +1,51 @@
+# Impacto de mudança de limite: só as candidatas são reclassificadas, mas o
+# resultado tem de ser o mesmo de reclassificar o lote inteiro.
+
+import numpy as np
+import pytest
+
+from impact_core import ImpactIndex
+from rules_core import compile_ruleset
+from synth_core import generate
+from trb_defs import IG_TIPICO_MAX
+
+
+def _mudam_no_lote_inteiro(ix, mudancas):
+    novo = compile_ruleset(ix.sistema, {**ix.rs.limites, **mudancas})
+    depois = ix._classificar(novo, np.arange(ix.n))
+    return set(np.flatnonzero(depois != ix.codigos).tolist())
+
+
+@pytest.mark.parametrize("sistema, mudancas", [
+    ("sucs", {"linha_A_incl": 0.75}),
+    ("sucs", {"linha_A_LL0": 18.0, "ll_alto_min": 48.0}),
+    ("sucs", {"finos_limpo_max": 6.0}),
+    ("trb", {"granular_p200_max": 36.0}),
+    ("trb", {"ll_divisor": 42.0, "ip_argila_min": 10.0}),
+])
+def test_impacto_igual_ao_lote_inteiro(sistema, mudancas):
+    ix = ImpactIndex(generate(3000, sistema, seed=5, limitrofes=0.3), sistema)
+    res = ix.impact(mudancas)
+    grupo = res.changes["grupo_antes"] != res.changes["grupo_depois"]
+    assert set(res.changes.loc[grupo, "linha"].tolist()) == _mudam_no_lote_inteiro(ix, mudancas)
+    assert res.n_candidatos < ix.n
+
+
+def test_ig_tipico_max_muda_so_o_aviso():
+    ix = ImpactIndex(generate(3000, "trb", seed=6), "trb")
+    tmax = IG_TIPICO_MAX["A-4"]
+    res = ix.impact(ig_tipico_max={"A-4": tmax - 2})
+    c = res.changes
+    assert (c["grupo_antes"] == c["grupo_depois"]).all()
+    assert (c["grupo_antes"] == "A-4").all()
+    assert not c["aviso_antes"].any() and c["aviso_depois"].all()
+    esperado = (ix.codigos == ix.rs.grupos.index("A-4")) & (ix.ig > tmax - 2) & (ix.ig <= tmax)
+    assert len(c) == int(esperado.sum()) > 0
+
+
+def test_limite_desconhecido():
+    ix = ImpactIndex(generate(10, "sucs", seed=1), "sucs")
+    with pytest.raises(ValueError, match="Limite desconhecido"):
+        ix.impact({"nao_existe": 1.0})
+    with pytest.raises(ValueError, match="só se aplica ao TRB"):
+        ix.impact(ig_tipico_max={"A-4": 10})
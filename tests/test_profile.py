@@ -0,0 +1,60 @@
+# Índice por projeto × estaca: consultas por trecho/profundidade e perfil.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_core import StationIndex, parse_station
+
+
+@pytest.mark.parametrize("v, esperado", [
+    (120, 120.0), ("120", 120.0), ("120+10,00", 120.5), ("E120+10", 120.5), ("est. 7+5.5", 7.275),
+])
+def test_parse_station(v, esperado):
+    assert parse_station(v) == pytest.approx(esperado)
+
+
+@pytest.mark.parametrize("v", [None, "", "km 3", "abc"])
+def test_parse_station_invalida(v):
+    assert np.isnan(parse_station(v))
+
+
+def _res(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    ini = np.round(rng.uniform(0, 3, n), 1)
+    return pd.DataFrame({
+        "projeto": rng.choice(["BR-101", "BR-116"], n),
+        "estaca": np.round(rng.uniform(0, 500, n), 1),
+        "prof_ini": ini,
+        "prof_fim": ini + 0.5,
+        "grupo": rng.choice(["CL", "SM", "GW"], n),
+        "Grupo_TRB": rng.choice(["A-4", "A-6"], n),
+        "IG": rng.integers(0, 12, n),
+    })
+
+
+def test_query_igual_ao_filtro_direto():
+    res = _res()
+    res.loc[[3, 7], "estaca"] = np.nan  # sem local: fora do índice
+    ix = StationIndex(res)
+    assert ix.sem_local == 2 and len(ix) == len(res) - 2
+    q = ix.query(res, 120, 340, 0.5, 1.5, projeto="BR-101")
+    m = (res["projeto"].eq("BR-101") & res["estaca"].between(120, 340)
+         & (res["prof_ini"] <= 1.5) & (res["prof_fim"] >= 0.5))
+    assert sorted(q.index) == sorted(res.index[m])
+    assert q["estaca"].is_monotonic_increasing
+
+
+def test_perfil_conta_todas_as_amostras_do_trecho():
+    res = _res()
+    ix = StationIndex(res)
+    p = ix.profile(segmento=50, camadas=[0, 1, 2, 4], estaca_min=100, estaca_max=400)
+    assert p["n"].sum() == int(res["estaca"].between(100, 400).sum())
+    assert (p["estaca_fim"] - p["estaca_ini"] == 50).all()
+    assert (p[["SUCS_CL", "SUCS_SM", "SUCS_GW"]].sum(axis=1) == p["n"]).all()
+    assert (p["IG_max"] <= 11).all()
+
+
+def test_sem_estaca():
+    with pytest.raises(ValueError, match="estaca"):
+        StationIndex(pd.DataFrame({"grupo": ["CL"]}))
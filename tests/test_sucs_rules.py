@@ -0,0 +1,57 @@
+# Equivalência entre classify_sucs (amostra a amostra, com relatório) e o
+# motor vetorizado: ambos devem sair das mesmas regras (SUCS_PADRAO).
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rules_core import SUCS_PADRAO
+from sucs_core import classify_dataframe, classify_dataframe_vec, classify_sucs
+
+
+def _grade():
+    valores = dict(
+        pct_retido_200=[0, 30, 50, 88, 95, 96, 100, np.nan],
+        pct_pedregulho_coarse=[0, 70],
+        pct_areia_coarse=[0, 30, 70],
+        LL=[np.nan, 35, 49.9, 50, 80],
+        LP=[np.nan, 10, 30],
+        Cu=[np.nan, 5, 7],
+        Cc=[np.nan, 0.5, 2],
+        organico=[False, True],
+        turfa=[False, True],
+    )
+    return pd.DataFrame(list(itertools.product(*valores.values())), columns=list(valores))
+
+
+def test_dataframe_igual_ao_vetorizado():
+    df = _grade()
+    a = classify_dataframe(df)
+    b = classify_dataframe_vec(df)
+    assert (a["grupo"] == b["grupo"]).all()
+    assert (a["regra_SUCS"].to_numpy() == b["regra_SUCS"].to_numpy()).all()
+
+
+def test_grupo_e_regra_coerentes():
+    df = _grade().sample(500, random_state=0)
+    res = classify_dataframe(df)
+    regras = res["regra_SUCS"].to_numpy()
+    assert (res["grupo"].to_numpy() == np.asarray(SUCS_PADRAO.grupos, dtype=object)[
+        SUCS_PADRAO.group_of_rule(regras)]).all()
+
+
+@pytest.mark.parametrize("dados, grupo", [
+    (dict(pct_retido_200=96, pct_pedregulho_coarse=70, pct_areia_coarse=30, Cu=5, Cc=2), "GW"),
+    (dict(pct_retido_200=96, pct_pedregulho_coarse=30, pct_areia_coarse=70, Cu=5, Cc=2), "SP"),
+    (dict(pct_retido_200=96, pct_pedregulho_coarse=30, pct_areia_coarse=70), "S?"),
+    (dict(pct_retido_200=90, pct_pedregulho_coarse=30, pct_areia_coarse=70, LL=40, LP=15), "S-SC"),
+    (dict(pct_retido_200=30, LL=60, LP=20), "CH"),
+    (dict(pct_retido_200=30, LL=40, LP=35), "ML"),
+    (dict(pct_retido_200=30, LL=40, organico=True), "OL"),
+    (dict(pct_retido_200=30), "M?/C?"),
+    (dict(pct_retido_200=80, turfa=True), "Pt"),
+])
+def test_casos_conhecidos(dados, grupo):
+    assert classify_sucs(dados)[0] == grupo
@@ -0,0 +1,35 @@
+# Resumo incremental: fusão de pedaços e contagem de limítrofes.
+
+import pandas as pd
+
+from cli import classify_chunk
+from summary_core import RunningSummary
+from synth_core import generate
+
+
+def _lote():
+    return classify_chunk(generate(3000, "ambos", seed=1, limitrofes=0.3), "ambos")
+
+
+def test_pedacos_fundidos_igual_ao_lote_inteiro():
+    res = _lote()
+    inteiro = RunningSummary().update(res)
+    partes = RunningSummary()
+    for i in range(0, len(res), 700):
+        partes.merge(RunningSummary().update(res.iloc[i:i + 700]))
+    pd.testing.assert_frame_equal(inteiro.sucs_table(), partes.sucs_table())
+    pd.testing.assert_frame_equal(inteiro.trb_table(), partes.trb_table())
+    assert partes.linhas == len(res)
+
+
+def test_limitrofes_contados_com_entradas():
+    s = RunningSummary().update(_lote())
+    assert s.sucs_table()["limitrofes"].sum() > 0
+    assert s.trb_table()["limitrofes"].sum() > 0
+
+
+def test_sem_entradas_nao_ha_limitrofes():
+    res = _lote()[["projeto", "tecnico", "grupo", "Grupo_TRB", "IG"]]
+    s = RunningSummary().update(res)
+    assert s.sucs_table()["limitrofes"].sum() == 0
+    assert s.trb_table()["n"].sum() == len(res)
@@ -0,0 +1,46 @@
+# Gerador sintético: limites de decisão e taxas de ausentes/inválidos.
+
+import numpy as np
+
+from sucs_core import classify_dataframe_vec
+from synth_core import generate
+
+
+def test_limitrofe_grossa_mantem_pedregulho_e_areia():
+    df = generate(20000, "sucs", seed=3, limitrofes=0.5)
+    borda = df[df["pct_retido_200"] == 50.0]
+    assert len(borda) > 0
+    soma = borda["pct_pedregulho_coarse"] + borda["pct_areia_coarse"]
+    assert np.allclose(soma, 100.0, atol=0.15)
+    grupos = classify_dataframe_vec(borda)["grupo"]
+    assert grupos.str.startswith("S").any() and grupos.str.startswith("G").any()
+
+
+def test_fina_sem_fracao_grossa():
+    df = generate(5000, "sucs", seed=1)
+    fina = df["pct_retido_200"] < 50.0
+    assert (df.loc[fina, ["pct_pedregulho_coarse", "pct_areia_coarse"]] == 0).all().all()
+
+
+def test_limitrofes_cobrem_finos_5_e_cortes_trb_em_ambos():
+    df = generate(20000, "ambos", seed=2, limitrofes=1.0)
+    finos = 100 - df["pct_retido_200"]
+    assert (np.abs(finos - 5.0) <= 0.5).mean() > 0.05
+    assert (np.abs(df["P200"] - 35.0) <= 0.5).mean() > 0.05
+    assert (np.abs(df["LL"] - 40.0) <= 0.5).mean() > 0.05
+
+
+def test_taxa_de_ausentes_por_entrada():
+    df = generate(20000, "trb", seed=4, ausentes=0.1)
+    assert abs(df[["P10", "P40", "P200", "LL", "LP"]].isna().mean().mean() - 0.1) < 0.01
+
+
+def test_taxa_de_invalidos_por_esquema():
+    for sistema in ("sucs", "trb", "ambos"):
+        df = generate(20000, sistema, seed=5, invalidos=0.1, ausentes=0.05)
+        inval = df["LP"] > df["LL"]
+        if "P200" in df.columns:
+            inval |= (df["P200"] > df["P40"]) | (df["P200"] < 0) | (df["P200"] > 100)
+        if "pct_retido_200" in df.columns:
+            inval |= (df["pct_retido_200"] < 0) | (df["pct_retido_200"] > 100)
+        assert abs(inval.mean() - 0.1) < 0.01, sistema
@@ -0,0 +1,30 @@
+# Limites por upload: completo, em pedaços ou recusado.
+
+import pytest
+
+from telemetry_core import MB, Limits
+
+
+def test_decide():
+    lim = Limits(max_linhas=100, max_mem_mb=10, rejeitar_linhas=1000, rejeitar_mem_mb=100)
+    assert lim.decide(100, 10 * MB)[0] == "completo"  # no limite ainda é completo
+    assert lim.decide(101, 0)[0] == "pedacos"
+    assert lim.decide(50, 11 * MB)[0] == "pedacos"
+    assert lim.decide(1001, 0)[0] == "rejeitar"
+    assert lim.decide(50, 101 * MB)[0] == "rejeitar"  # rejeição tem precedência
+    modo, motivo = lim.decide(5000, 0)
+    assert modo == "rejeitar" and "5000" in motivo
+
+
+def test_zero_desliga():
+    lim = Limits(max_linhas=0, max_mem_mb=0, rejeitar_linhas=0, rejeitar_mem_mb=0)
+    assert lim.decide(10 ** 9, 10 ** 12) == ("completo", "")
+
+
+def test_from_env():
+    lim = Limits.from_env({"SOILCLASS_MAX_LINHAS": "10", "SOILCLASS_REJEITAR_MEM_MB": "0"})
+    assert lim.max_linhas == 10 and lim.rejeitar_mem_mb == 0 and lim.linhas_pedaco == Limits().linhas_pedaco
+    with pytest.raises(ValueError, match="SOILCLASS_MAX_LINHAS"):
+        Limits.from_env({"SOILCLASS_MAX_LINHAS": "muitas"})
+    with pytest.raises(ValueError, match="LINHAS_PEDACO"):
+        Limits.from_env({"SOILCLASS_LINHAS_PEDACO": "0"})
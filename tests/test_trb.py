@@ -0,0 +1,27 @@
+# TRB em lote: linhas inválidas não derrubam o arquivo.
+
+import pandas as pd
+
+from synth_core import generate
+from trb_core import classify_dataframe_trb, classify_dataframe_trb_safe, classify_dataframe_trb_vec
+
+
+def test_linhas_invalidas_ficam_sem_grupo_e_com_motivo():
+    df = generate(400, "trb", seed=3, invalidos=0.2)
+    res = classify_dataframe_trb_safe(df)
+    vec = classify_dataframe_trb_vec(df)
+    assert len(res) == len(df)
+    invalida = vec["Grupo_TRB"].isna().to_numpy()
+    assert invalida.any() and not invalida.all()
+    assert res["Grupo_TRB"].isna().to_numpy().tolist() == invalida.tolist()
+    assert res.loc[invalida, "relatorio"].str.startswith("Linha inválida").all()
+    pd.testing.assert_series_equal(res.loc[~invalida, "Grupo_TRB"], vec.loc[~invalida, "Grupo_TRB"],
+                                   check_dtype=False)
+
+
+def test_lote_valido_igual_ao_classificador_escalar():
+    df = generate(200, "trb", seed=4)
+    a = classify_dataframe_trb_safe(df)
+    b = classify_dataframe_trb(df)
+    assert a["Grupo_TRB"].tolist() == b["Grupo_TRB"].tolist()
+    assert a["IG"].astype(int).tolist() == b["IG"].astype(int).tolist()
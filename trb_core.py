@@ -2,7 +2,11 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
+import numpy as np
+
 from trb_defs import get_definicao, get_subleito_text, ig_tipico_max, get_materiais
+from rules_defs import TRB_GROUPS, TRB_LIMITES, TRB_TEXTOS
+from rules_core import TRB_PADRAO, trb_fields
 from datetime import datetime
 
 # Rótulo rápido por grupo (para UI)
@@ -54,6 +58,15 @@ class TRBResult:
     relatorio: str
     subleito: str
     aviso_ig: str
+    regra: int = -1     # traço de decisão: índice da regra acionada em TRB_PADRAO
+
+def rationale_for(regra: int, p200: float) -> List[str]:
+    """Regras acionadas (texto do relatório), geradas a partir do traço de decisão."""
+    granular = (p200 <= TRB_LIMITES["granular_p200_max"])
+    R = [f"{'Granular' if granular else 'Silto-argiloso'} por %passante #200 = {p200:.1f}%"]
+    if regra >= 0:
+        R.append(TRB_TEXTOS[TRB_PADRAO.tabela[regra][0]].format(**TRB_LIMITES))
+    return R
 
 def _clamp(x: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, x))
@@ -118,48 +131,20 @@ def _build_relatorio(group: str, ig: int, rationale: List[str],
     return "\n".join(linhas)
 
 def classify_trb(p10: float, p40: float, p200: float, ll: float, lp: float, is_np: bool=False) -> TRBResult:
-    R: List[str] = []
     if is_np:
         ip = 0.0
     else:
         ip = max(0.0, ll - lp)
     if not (0.0 <= p200 <= p40 <= p10 <= 100.0):
         raise ValueError("As peneiras devem obedecer: #200 ≤ #40 ≤ #10 ≤ 100, e todos em 0–100%.")
-    granular = (p200 <= 35.0)
-    R.append(f"{'Granular' if granular else 'Silto-argiloso'} por %passante #200 = {p200:.1f}%")
-    if granular:
-        if (p10 <= 50.0 and p40 <= 30.0 and p200 <= 15.0 and ll <= 40.0 and ip <= 6.0):
-            g = "A-1-a"; R.append("Atende #10≤50, #40≤30, #200≤15, LL≤40, IP≤6")
-        elif (p40 <= 50.0 and p200 <= 25.0 and ll <= 40.0 and ip <= 6.0):
-            g = "A-1-b"; R.append("Atende #40≤50, #200≤25, LL≤40, IP≤6")
-        elif (p40 >= 51.0 and p200 <= 10.0 and ip == 0.0):
-            g = "A-3"; R.append("Areia fina NP: #40≥51, #200≤10, IP=NP")
-        else:
-            if ip <= 10.0 and ll <= 40.0:
-                g = "A-2-4"; R.append("IP≤10 e LL≤40")
-            elif ip <= 10.0 and ll > 40.0:
-                g = "A-2-5"; R.append("IP≤10 e LL>40")
-            elif ip >= 11.0 and ll <= 40.0:
-                g = "A-2-6"; R.append("IP≥11 e LL≤40")
-            else:
-                g = "A-2-7"; R.append("IP≥11 e LL>40")
-    else:
-        if ll <= 40.0 and ip <= 10.0:
-            g = "A-4"; R.append("LL≤40 e IP≤10")
-        elif ll > 40.0 and ip <= 10.0:
-            g = "A-5"; R.append("LL>40 e IP≤10")
-        elif ll <= 40.0 and ip >= 11.0:
-            g = "A-6"; R.append("LL≤40 e IP≥11")
-        else:
-            if ip <= (ll - 30.0):
-                g = "A-7-5"; R.append("LL>40, IP≥11 e IP ≤ LL−30")
-            else:
-                g = "A-7-6"; R.append("LL>40, IP≥11 e IP > LL−30")
+    regra = TRB_PADRAO.trace_one(P10=p10, P40=p40, P200=p200, LL=ll, IP=ip)
+    g = TRB_PADRAO.tabela[regra][0]
     ig = group_index(p200, ll, ip)
     subleito = get_subleito_text(g)
     aviso = _aviso_ig(g, ig)
+    R = rationale_for(regra, p200)
     relatorio = _build_relatorio(g, ig, R, p10, p40, p200, ll, lp, ip, is_np, subleito, aviso)
-    return TRBResult(group=g, ig=ig, rationale=R, relatorio=relatorio, subleito=subleito, aviso_ig=aviso)
+    return TRBResult(group=g, ig=ig, rationale=R, relatorio=relatorio, subleito=subleito, aviso_ig=aviso, regra=regra)
 
 def classify_dataframe_trb(df, cols_map: Optional[dict]=None):
     import pandas as pd
@@ -185,6 +170,126 @@ def classify_dataframe_trb(df, cols_map: Optional[dict]=None):
         r = classify_trb(p10, p40, p200, ll, lp, is_np=np_)
         out.append({**row,
             'IP_calc': max(0.0, ll - lp) if not np_ else 0.0,
-            'Grupo_TRB': r.group, 'IG': r.ig, 'Subleito': r.subleito,
+            'Grupo_TRB': r.group, 'IG': r.ig, 'regra_TRB': r.regra, 'Subleito': r.subleito,
             'relatorio': r.relatorio, 'aviso_ig': r.aviso_ig})
     return pd.DataFrame(out)
+
+
+def classify_dataframe_trb_safe(df, cols_map: Optional[dict]=None):
+    """
+    Como classify_dataframe_trb, mas uma linha inválida não interrompe o lote:
+    classify_trb roda só nas linhas válidas (segundo o motor vetorizado); as
+    inválidas ficam com Grupo_TRB vazio, IG nulo e o motivo no relatório.
+    """
+    out = classify_dataframe_trb_vec(df, cols_map)
+    ok = out['regra_TRB'].to_numpy() >= 0
+    textos = ['Subleito', 'relatorio', 'aviso_ig']
+    for c in textos:
+        out[c] = None
+    if ok.any():
+        out.loc[ok, textos] = classify_dataframe_trb(df[ok], cols_map)[textos].to_numpy()
+    out.loc[~ok, 'relatorio'] = ("Linha inválida: peneiras fora de #200 ≤ #40 ≤ #10 ≤ 100% "
+                                 "ou LL/LP ausentes ou não numéricos.")
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Motor vetorizado (NumPy): mesma tabela de eliminação de classify_trb, sem
+# relatório. Grupos como códigos inteiros (índices em TRB_GROUPS); -1 marca
+# linha inválida (peneiras fora de ordem ou dados ausentes).
+# ---------------------------------------------------------------------------
+
+TRB_CODE = {g: i for i, g in enumerate(TRB_GROUPS)}
+
+_NP_MAP = {"true": True, "false": False, "1": True, "0": False,
+           "sim": True, "não": False, "nao": False, "np": True}
+
+def normalize_np(s):
+    """Normaliza a coluna NP do lote (True/False, 1/0, sim/não, NP) para bool."""
+    if s.dtype == bool:
+        return s
+    return s.astype(str).str.strip().str.lower().map(_NP_MAP).fillna(False).astype(bool)
+
+def group_index_arrays(p200, ll, ip):
+    """Versão vetorizada de group_index (mesmos limitadores e arredondamento)."""
+    a = np.clip(p200, 35.0, 75.0) - 35.0
+    b = np.clip(p200, 15.0, 55.0) - 15.0
+    c = np.clip(ll, 40.0, 60.0) - 40.0
+    d = np.clip(ip, 10.0, 30.0) - 10.0
+    ig = 0.2*a + 0.005*a*c + 0.01*b*d
+    return np.round(np.clip(ig, 0.0, 20.0)).astype(np.int16)
+
+def trb_rule_codes(p10, p40, p200, ll, ip, ruleset=None):
+    """Tabela de eliminação (esquerda → direita) sobre arrays já validados; retorna códigos em TRB_GROUPS."""
+    rs = TRB_PADRAO if ruleset is None else ruleset
+    return rs.classify(trb_fields(p10, p40, p200, ll, ip))
+
+def _trb_eval(p10, p40, p200, ll, lp, is_np, ruleset):
+    p10, p40, p200, ll, lp = np.broadcast_arrays(
+        *[np.asarray(x, dtype=float) for x in (p10, p40, p200, ll, lp)])
+    is_np = np.broadcast_to(np.asarray(is_np, dtype=bool), p10.shape)
+    rs = TRB_PADRAO if ruleset is None else ruleset
+    with np.errstate(invalid="ignore"):
+        ll = np.where(is_np & np.isnan(ll), 0.0, ll)
+        ip = np.where(is_np, 0.0, np.maximum(0.0, ll - lp))
+        valid = ((0.0 <= p200) & (p200 <= p40) & (p40 <= p10) & (p10 <= 100.0)
+                 & ~np.isnan(ll) & ~np.isnan(ip))
+        regra = rs.trace(trb_fields(p10, p40, p200, ll, ip))
+        ig = group_index_arrays(p200, ll, ip)
+    return rs, np.where(valid, regra, -1).astype(np.int16), np.where(valid, ig, 0).astype(np.int16)
+
+def classify_trb_arrays(p10, p40, p200, ll, lp, is_np=False, ruleset=None):
+    """
+    Versão vetorizada de classify_trb. Aceita escalares ou arrays (com broadcast).
+    Retorna (codigos, ig): códigos int16 em TRB_GROUPS (-1 = inválido) e IG int16.
+    ruleset: conjunto compilado (rules_core.compile_ruleset("trb", ...)); padrão = regras vigentes.
+    """
+    rs, regra, ig = _trb_eval(p10, p40, p200, ll, lp, is_np, ruleset)
+    return rs.group_of_rule(regra), ig
+
+def trace_trb_arrays(p10, p40, p200, ll, lp, is_np=False, ruleset=None):
+    """Traço de decisão vetorizado: índice da regra acionada (int16; -1 = linha inválida)."""
+    return _trb_eval(p10, p40, p200, ll, lp, is_np, ruleset)[1]
+
+def trb_group_names(codes):
+    """Converte códigos de classify_trb_arrays em rótulos TRB (None para inválidos)."""
+    names = np.asarray(TRB_GROUPS + (None,), dtype=object)
+    return names[np.asarray(codes, dtype=np.intp)]
+
+def trb_inputs_from_frame(df, cols_map: Optional[dict]=None):
+    """Extrai do DataFrame de lote os arrays de entrada de classify_trb_arrays
+    (mesmas convenções de classify_dataframe_trb: LP ou IP, NP zera LL/LP)."""
+    import pandas as pd
+    c = {'P10':'P10','P40':'P40','P200':'P200','LL':'LL','LP':'LP','IP':'IP','NP':'NP'}
+    if cols_map:
+        c.update(cols_map)
+
+    def num(col):
+        if col not in df.columns:
+            return np.zeros(len(df), dtype=float)
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+    np_ = normalize_np(df[c['NP']]).to_numpy() if c['NP'] in df.columns else np.zeros(len(df), dtype=bool)
+    ll = num(c['LL'])
+    if c['LP'] in df.columns:
+        lp = num(c['LP'])
+    else:
+        lp = np.maximum(0.0, ll - num(c['IP']))
+    ll = np.where(np_, 0.0, ll)
+    lp = np.where(np_, 0.0, lp)
+    return dict(p10=num(c['P10']), p40=num(c['P40']), p200=num(c['P200']), ll=ll, lp=lp, is_np=np_)
+
+def classify_dataframe_trb_vec(df, cols_map: Optional[dict]=None):
+    """Como classify_dataframe_trb, porém vetorizado e sem 'relatorio'.
+    Linhas inválidas ficam com Grupo_TRB vazio e IG nulo, em vez de interromper o lote."""
+    import pandas as pd
+    x = trb_inputs_from_frame(df, cols_map)
+    _, regra, ig = _trb_eval(**x, ruleset=None)
+    codes = TRB_PADRAO.group_of_rule(regra)
+    res = df.copy()
+    res['IP_calc'] = np.where(x['is_np'], 0.0, np.maximum(0.0, x['ll'] - x['lp']))
+    res['Grupo_TRB'] = trb_group_names(codes)
+    res['IG'] = pd.array(ig, dtype="Int16")
+    res.loc[codes < 0, 'IG'] = pd.NA
+    res['regra_TRB'] = regra
+    return res
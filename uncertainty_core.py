@@ -0,0 +1,139 @@
+# uncertainty_core.py
+# Classificação SUCS/TRB sob incerteza de ensaio (Monte Carlo).
+# Cada amostra é perturbada n vezes com ruído gaussiano (desvio-padrão por
+# campo) e as realizações são classificadas pelos motores vetorizados de
+# sucs_core/trb_core. O resultado é a probabilidade de cada grupo por amostra.
+
+import numpy as np
+import pandas as pd
+
+from sucs_core import SUCS_GROUPS, classify_sucs_arrays, sucs_inputs_from_frame
+from trb_core import TRB_GROUPS, classify_trb_arrays, trb_inputs_from_frame
+
+# Desvios-padrão típicos (em pontos percentuais / unidades do ensaio)
+SUCS_SD_PADRAO = {
+    "pct_retido_200": 1.0,
+    "pct_pedregulho_coarse": 1.0,
+    "pct_areia_coarse": 1.0,
+    "LL": 1.5,
+    "LP": 1.5,
+    "Cu": 0.2,
+    "Cc": 0.1,
+}
+TRB_SD_PADRAO = {"P10": 1.0, "P40": 1.0, "P200": 1.0, "LL": 1.5, "LP": 1.5}
+
+# Limite de elementos (amostras × realizações) por bloco, para memória limitada
+_BLOCO_MAX = 2_000_000
+
+_PERCENT_SUCS = ("pct_retido_200", "pct_pedregulho_coarse", "pct_areia_coarse")
+
+
+def _sd_vector(sd, campo, n_linhas):
+    """Desvio-padrão do campo: escalar ou array por amostra (0 se não informado)."""
+    v = np.asarray(sd.get(campo, 0.0), dtype=float)
+    return np.broadcast_to(v, (n_linhas,))
+
+
+def _blocos(n_linhas, n):
+    passo = max(1, _BLOCO_MAX // max(1, n))
+    for i in range(0, n_linhas, passo):
+        yield slice(i, min(n_linhas, i + passo))
+
+
+def _perturbar(rng, x, s, sl, n, lo=None, hi=None):
+    base = x[sl][:, None]
+    y = base + s[sl][:, None] * rng.standard_normal((base.shape[0], n))
+    if lo is not None or hi is not None:
+        y = np.clip(y, lo, hi)
+    return y
+
+
+def _probabilidades(codes, n_grupos):
+    """Matriz (amostras × grupos) de frequências relativas a partir de códigos (m, n)."""
+    m, n = codes.shape
+    flat = (np.arange(m)[:, None] * n_grupos + codes).ravel()
+    return np.bincount(flat, minlength=m * n_grupos).reshape(m, n_grupos) / n
+
+
+def _tabela(prob, rotulos, index):
+    usados = prob.sum(axis=0) > 0
+    out = pd.DataFrame(prob[:, usados], index=index,
+                       columns=[f"P_{g}" for g, u in zip(rotulos, usados) if u])
+    idx = prob.argmax(axis=1)
+    out.insert(0, "prob_max", prob[np.arange(len(prob)), idx])
+    out.insert(0, "grupo_mais_provavel", np.asarray(rotulos, dtype=object)[idx])
+    return out
+
+
+def mc_sucs(df, sd=None, n=2000, seed=None):
+    """
+    Monte Carlo SUCS. df no formato do lote (colunas do CSV-modelo).
+    sd: dict campo -> desvio-padrão (escalar ou array por amostra); padrão SUCS_SD_PADRAO.
+    Retorna DataFrame (mesmo índice de df) com grupo_nominal, grupo_mais_provavel,
+    prob_max e uma coluna P_<grupo> por grupo observado.
+    """
+    sd = SUCS_SD_PADRAO if sd is None else sd
+    x = sucs_inputs_from_frame(df)
+    m = len(df)
+    rng = np.random.default_rng(seed)
+    G = len(SUCS_GROUPS)
+    prob = np.zeros((m, G))
+    for sl in _blocos(m, n):
+        draw = {}
+        for campo in ("pct_retido_200", "pct_pedregulho_coarse", "pct_areia_coarse", "LL", "LP", "Cu", "Cc"):
+            s = _sd_vector(sd, campo, m)
+            lo, hi = (0.0, 100.0) if campo in _PERCENT_SUCS else (0.0, None)
+            draw[campo] = _perturbar(rng, x[campo], s, sl, n, lo, hi)
+        codes = classify_sucs_arrays(**draw,
+                                     organico=x["organico"][sl][:, None],
+                                     turfa=x["turfa"][sl][:, None])
+        prob[sl] = _probabilidades(codes, G)
+    out = _tabela(prob, SUCS_GROUPS, df.index)
+    nominal = classify_sucs_arrays(**x)
+    out.insert(0, "grupo_nominal", np.asarray(SUCS_GROUPS, dtype=object)[nominal])
+    return out
+
+
+def mc_trb(df, sd=None, n=2000, seed=None, cols_map=None, ig_hist=False):
+    """
+    Monte Carlo TRB. df no formato do lote TRB (P10, P40, P200, LL, LP/IP, NP).
+    sd: dict com chaves P10, P40, P200, LL, LP (padrão TRB_SD_PADRAO).
+    As realizações são ajustadas para manter #200 ≤ #40 ≤ #10 (0–100%);
+    amostras NP não têm LL/LP perturbados.
+    Retorna probabilidades por grupo (P_<grupo>, P_invalido se houver) e a
+    distribuição do IG entre as realizações válidas (IG_medio, IG_p05, IG_p50,
+    IG_p95; P_IG_0..20 se ig_hist).
+    """
+    sd = TRB_SD_PADRAO if sd is None else sd
+    x = trb_inputs_from_frame(df, cols_map)
+    m = len(df)
+    rng = np.random.default_rng(seed)
+    G = len(TRB_GROUPS) + 1  # último = inválido
+    prob = np.zeros((m, G))
+    hist = np.zeros((m, 22))  # IG 0..20; último = realização inválida
+    plastico = (~x["is_np"]).astype(float)
+    for sl in _blocos(m, n):
+        p10 = _perturbar(rng, x["p10"], _sd_vector(sd, "P10", m), sl, n, 0.0, 100.0)
+        p40 = np.minimum(_perturbar(rng, x["p40"], _sd_vector(sd, "P40", m), sl, n, 0.0, 100.0), p10)
+        p200 = np.minimum(_perturbar(rng, x["p200"], _sd_vector(sd, "P200", m), sl, n, 0.0, 100.0), p40)
+        ll = _perturbar(rng, x["ll"], _sd_vector(sd, "LL", m) * plastico, sl, n, 0.0, None)
+        lp = _perturbar(rng, x["lp"], _sd_vector(sd, "LP", m) * plastico, sl, n, 0.0, None)
+        codes, ig = classify_trb_arrays(p10, p40, p200, ll, lp, x["is_np"][sl][:, None])
+        prob[sl] = _probabilidades(np.where(codes < 0, G - 1, codes), G)
+        hist[sl] = _probabilidades(np.where(codes < 0, 21, ig), 22)
+    out = _tabela(prob, TRB_GROUPS + ("invalido",), df.index)
+    nominal, _ = classify_trb_arrays(**x)
+    out.insert(0, "grupo_nominal", np.asarray(TRB_GROUPS + (None,), dtype=object)[nominal])
+
+    # IG só das realizações válidas (NaN se nenhuma for válida)
+    validas = hist[:, :21].sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hist = hist[:, :21] / validas
+    cdf = hist.cumsum(axis=1)
+    out["IG_medio"] = hist @ np.arange(21)
+    for q in (0.05, 0.50, 0.95):
+        out[f"IG_p{int(q * 100):02d}"] = np.where(validas[:, 0] > 0, (cdf < q - 1e-12).sum(axis=1), np.nan)
+    if ig_hist:
+        for k in range(21):
+            out[f"P_IG_{k}"] = hist[:, k]
+    return out
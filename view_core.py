@@ -0,0 +1,135 @@
+# view_core.py
+# Visualização paginada dos resultados em lote. O DataFrame completo fica no
+# servidor; o navegador recebe só a página corrente, sem as colunas de texto
+# longo (relatorio), e o relatório é lido/gerado apenas para a linha inspecionada.
+
+import numpy as np
+import pandas as pd
+
+TEXT_COLS = ("relatorio",)
+PAGE_SIZES = (25, 50, 100, 250)
+
+
+class ResultsView:
+    """
+    Filtro, ordenação e paginação sobre um resultado de lote.
+
+    grupo_col: coluna do grupo ('grupo' no SUCS, 'Grupo_TRB' no TRB)
+    ig_col:    coluna do IG (opcional; habilita filtro por faixa)
+    aviso_col: coluna de aviso (opcional; habilita filtro "só com aviso")
+    report_fn: gera o relatório de uma linha (Series) quando não há coluna 'relatorio'
+    """
+
+    def __init__(self, df, grupo_col, ig_col=None, aviso_col=None, report_fn=None):
+        self.df = df.reset_index(drop=True)
+        self.grupo_col = grupo_col
+        self.ig_col = ig_col if ig_col in self.df.columns else None
+        self.aviso_col = aviso_col if aviso_col in self.df.columns else None
+        self.report_fn = report_fn
+        self._grupo = self.df[grupo_col].fillna("?").astype(str).to_numpy()
+        self._ig = (pd.to_numeric(self.df[self.ig_col], errors="coerce").to_numpy(dtype=float)
+                    if self.ig_col else None)
+        self._aviso = (self.df[self.aviso_col].fillna("").astype(str).str.strip().ne("").to_numpy()
+                       if self.aviso_col else None)
+        self._ordens = {}
+        self._ultimo = (None, None)
+
+    @property
+    def columns(self):
+        """Colunas exibidas na grade (sem texto longo)."""
+        return [c for c in self.df.columns if c not in TEXT_COLS]
+
+    def groups(self):
+        return sorted(set(self._grupo))
+
+    def ig_bounds(self):
+        if self._ig is None or np.isnan(self._ig).all():
+            return None
+        return int(np.nanmin(self._ig)), int(np.nanmax(self._ig))
+
+    def _ordem(self, col, asc):
+        chave = (col, asc)
+        if chave not in self._ordens:
+            s = self.df[col]
+            o = s.sort_values(ascending=asc, kind="stable", na_position="last").index.to_numpy()
+            self._ordens[chave] = o
+        return self._ordens[chave]
+
+    def select(self, grupos=None, ig_min=None, ig_max=None, so_aviso=False, ordenar_por=None, asc=True):
+        """Posições (no df completo) das linhas que passam no filtro, já ordenadas."""
+        chave = (tuple(grupos) if grupos else None, ig_min, ig_max, bool(so_aviso), ordenar_por, asc)
+        if self._ultimo[0] == chave:
+            return self._ultimo[1]
+        m = np.ones(len(self.df), dtype=bool)
+        if grupos:
+            m &= np.isin(self._grupo, list(grupos))
+        if self._ig is not None and ig_min is not None:
+            m &= self._ig >= ig_min
+        if self._ig is not None and ig_max is not None:
+            m &= self._ig <= ig_max
+        if so_aviso and self._aviso is not None:
+            m &= self._aviso
+        if ordenar_por:
+            o = self._ordem(ordenar_por, asc)
+            idx = o[m[o]]
+        else:
+            idx = np.flatnonzero(m)
+        self._ultimo = (chave, idx)
+        return idx
+
+    def page(self, idx, pagina, tamanho):
+        """Fatia 'pagina' (0-based) de 'idx', só com as colunas exibidas."""
+        ini = pagina * tamanho
+        return self.df.iloc[idx[ini:ini + tamanho]][self.columns]
+
+    @staticmethod
+    def n_pages(idx, tamanho):
+        return max(1, -(-len(idx) // tamanho))
+
+    def report(self, pos):
+        """Relatório da linha na posição 'pos' do df completo."""
+        row = self.df.iloc[int(pos)]
+        if "relatorio" in self.df.columns and isinstance(row["relatorio"], str):
+            return row["relatorio"]
+        if self.report_fn is not None:
+            return self.report_fn(row)
+        return ""
+
+
+def show_results(view, key, label_rotulo=None):
+    """Grade paginada + inspeção de relatório (Streamlit)."""
+    import streamlit as st
+
+    c1, c2, c3 = st.columns([3, 2, 2])
+    with c1:
+        grupos = st.multiselect("Grupos", view.groups(), key=f"{key}_grupos")
+    ig_min = ig_max = None
+    with c2:
+        faixa = view.ig_bounds()
+        if faixa and faixa[0] < faixa[1]:
+            sel = st.slider("Faixa de IG", faixa[0], faixa[1], faixa, key=f"{key}_ig")
+            if tuple(sel) != faixa:  # faixa completa = sem filtro (mantém linhas sem IG)
+                ig_min, ig_max = sel
+        so_aviso = view.aviso_col is not None and st.checkbox("Só com aviso", key=f"{key}_aviso")
+    with c3:
+        ordenar = st.selectbox("Ordenar por", ["(ordem do arquivo)"] + view.columns, key=f"{key}_ord")
+        asc = st.toggle("Crescente", value=True, key=f"{key}_asc")
+    ordenar = None if ordenar == "(ordem do arquivo)" else ordenar
+
+    idx = view.select(grupos, ig_min, ig_max, so_aviso, ordenar, asc)
+    p1, p2 = st.columns([1, 1])
+    with p1:
+        tamanho = st.selectbox("Linhas por página", PAGE_SIZES, index=1, key=f"{key}_tam")
+    n_pag = view.n_pages(idx, tamanho)
+    with p2:
+        pagina = st.number_input(f"Página (de {n_pag})", 1, n_pag, 1, key=f"{key}_pag") - 1
+    st.caption(f"{len(idx)} de {len(view.df)} linhas")
+    st.dataframe(view.page(idx, pagina, tamanho), use_container_width=True)
+
+    ini = pagina * tamanho
+    na_pagina = idx[ini:ini + tamanho]
+    if len(na_pagina):
+        rotulo = (lambda p: f"{p + 1}: {view.df.iloc[p][label_rotulo]}") if label_rotulo in view.df.columns \
+            else (lambda p: f"linha {p + 1}")
+        pos = st.selectbox("Ver relatório da linha", na_pagina.tolist(), format_func=rotulo, key=f"{key}_rel")
+        st.text_area("Relatório", view.report(pos), height=260, key=f"{key}_rel_txt_{pos}")
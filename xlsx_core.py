@@ -0,0 +1,168 @@
+# xlsx_core.py
+# Leitura de XLSX em modo somente leitura (openpyxl read_only): as linhas de
+# cada planilha são percorridas em fluxo, sem montar o modelo completo da
+# pasta de trabalho. Todas as planilhas são lidas (uma por furo/trecho) e
+# podem ser classificadas em paralelo, cada resultado marcado com o nome da
+# planilha na coluna "planilha".
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+SHEET_COL = "planilha"
+CHUNK_ROWS = 50_000
+
+
+def _open(src):
+    try:
+        import openpyxl  # type: ignore
+    except Exception as e:  # pragma: no cover
+        raise ImportError("Leitura de XLSX requer 'openpyxl' (pip install openpyxl).") from e
+    if isinstance(src, (bytes, bytearray)):
+        src = io.BytesIO(src)
+    elif hasattr(src, "getvalue") and not isinstance(src, io.BytesIO):
+        src = io.BytesIO(src.getvalue())  # UploadedFile do Streamlit
+    return openpyxl.load_workbook(src, read_only=True, data_only=True)
+
+
+def _header(row):
+    cols, vistos = [], {}
+    for i, v in enumerate(row):
+        nome = str(v).strip() if v is not None and str(v).strip() else f"col{i + 1}"
+        if nome in vistos:
+            vistos[nome] += 1
+            nome = f"{nome}.{vistos[nome]}"
+        else:
+            vistos[nome] = 0
+        cols.append(nome)
+    return cols
+
+
+def _frame(linhas, cols):
+    df = pd.DataFrame.from_records(linhas, columns=cols)
+    return df.dropna(how="all")
+
+
+def sheet_names(src):
+    """Nomes das planilhas, sem ler as linhas."""
+    wb = _open(src)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def iter_sheet_chunks(src, sheets=None, chunk_rows=CHUNK_ROWS):
+    """
+    Gera (nome_da_planilha, DataFrame) em pedaços de até chunk_rows linhas.
+    A primeira linha de cada planilha é o cabeçalho; planilhas vazias são puladas.
+    src pode ser uma pasta já aberta (openpyxl), que então não é fechada aqui.
+    """
+    aberta = hasattr(src, "sheetnames")
+    wb = src if aberta else _open(src)
+    try:
+        for nome in (sheets or wb.sheetnames):
+            rows = wb[nome].iter_rows(values_only=True)
+            head = next(rows, None)
+            if head is None:
+                continue
+            cols = _header(head)
+            n = len(cols)
+            buf = []
+            for r in rows:
+                buf.append(r[:n])
+                if len(buf) >= chunk_rows:
+                    yield nome, _frame(buf, cols)
+                    buf = []
+            if buf:
+                yield nome, _frame(buf, cols)
+    finally:
+        if not aberta:
+            wb.close()
+
+
+def read_sheet(src, nome):
+    """Uma planilha inteira como DataFrame (vazio se não houver linhas)."""
+    partes = [df for _, df in iter_sheet_chunks(src, [nome])]
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+
+def read_xlsx(src, sheets=None, tag=True):
+    """Todas as planilhas concatenadas; tag=True adiciona a coluna 'planilha'."""
+    partes = []
+    for nome, df in iter_sheet_chunks(src, sheets):
+        if tag:
+            df.insert(0, SHEET_COL, nome)
+        partes.append(df)
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+
+# ---------------------------------------------------------------------------
+# Classificação por planilha
+# ---------------------------------------------------------------------------
+
+def classify_frame(df, sistema, cols_map=None):
+    """Classifica um lote já lido ('sucs' ou 'trb'), com relatório (linhas TRB inválidas ficam sem grupo)."""
+    if sistema == "sucs":
+        from gradation_core import with_gradation
+        from sucs_core import classify_dataframe
+        return classify_dataframe(with_gradation(df))
+    if sistema == "trb":
+        from trb_core import classify_dataframe_trb_safe, normalize_np
+        col_np = (cols_map or {}).get("NP", "NP")
+        df = df.copy()
+        df[col_np] = normalize_np(df[col_np]) if col_np in df.columns else False
+        return classify_dataframe_trb_safe(df, cols_map)
+    raise ValueError(f"sistema desconhecido: {sistema!r} (use 'sucs' ou 'trb')")
+
+
+_LIVRO = {}  # pasta aberta uma vez por processo (ver _init_livro)
+
+
+def _init_livro(dados):
+    _LIVRO["wb"] = _open(dados)
+
+
+def _classify_sheet(args):
+    nome, sistema, cols_map = args
+    df = read_sheet(_LIVRO["wb"], nome)
+    if df.empty:
+        return nome, df
+    return nome, classify_frame(df, sistema, cols_map)
+
+
+def classify_xlsx(src, sistema, workers=None, cols_map=None):
+    """
+    Classifica todas as planilhas de um XLSX. Com workers > 1 as planilhas são
+    divididas entre processos; cada processo recebe o arquivo uma vez, abre a
+    pasta em modo somente leitura e lê só as planilhas que lhe cabem. Resultado concatenado na ordem das planilhas, com a coluna
+    'planilha' na frente.
+    """
+    if isinstance(src, (str, os.PathLike)):
+        with open(src, "rb") as f:
+            dados = f.read()
+    elif isinstance(src, (bytes, bytearray)):
+        dados = bytes(src)
+    else:
+        dados = src.getvalue() if hasattr(src, "getvalue") else src.read()
+    nomes = sheet_names(dados)
+    tarefas = [(n, sistema, cols_map) for n in nomes]
+    workers = min(workers or 1, len(nomes)) or 1
+    # o arquivo vai uma vez para cada processo (initializer); as tarefas levam só o nome da planilha
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_livro, initargs=(dados,)) as ex:
+            res = list(ex.map(_classify_sheet, tarefas))
+    else:
+        _init_livro(dados)
+        try:
+            res = [_classify_sheet(t) for t in tarefas]
+        finally:
+            _LIVRO.pop("wb").close()
+    partes = []
+    for nome, df in res:
+        if not df.empty:
+            df.insert(0, SHEET_COL, nome)
+            partes.append(df)
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()